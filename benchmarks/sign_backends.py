@@ -0,0 +1,52 @@
+# Benchmark: native libencrypt vs PythonSigningEngine throughput
+#
+# 用法:
+#   python benchmarks/sign_backends.py --body-sizes 256 2048 65536 1048576 --seconds 2
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from aflow_client_python.utils.sign import get_signing_engine  # noqa: E402
+
+_BACKENDS = ("native", "python")
+
+
+def throughput(signer, body: bytes, seconds: float) -> float:
+    """在 seconds 秒内尽量多地签名，返回每秒签名数"""
+    done = 0
+    batch = 1
+    started = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            signer.sign(body)
+        done += batch
+        elapsed = time.perf_counter() - started
+        if elapsed >= seconds:
+            return done / elapsed
+        batch = min(batch * 2, 10000)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="比较加密库与纯 Python 签名实现的吞吐量")
+    parser.add_argument("--body-sizes", type=int, nargs="+", default=[256, 2048, 65536, 1048576],
+                        help="请求体字节数，可以指定多个")
+    parser.add_argument("--seconds", type=float, default=2.0, help="每个组合的运行时间（秒），默认 2")
+    args = parser.parse_args()
+
+    signers = {backend: get_signing_engine(backend).bind("bench_app_id", "bench_enterprise", "bench_app_secret")
+               for backend in _BACKENDS}
+    print(f"{'body':>10} {'native/s':>12} {'python/s':>12} {'python/native':>14}")
+    for size in args.body_sizes:
+        body = (b'{"users":[' + b'{"userId":"u0000001","realName":"n"},' * (size // 36 + 1))[:size]
+        rates = {backend: throughput(signer, body, args.seconds) for backend, signer in signers.items()}
+        print(f"{size:>9}B {rates['native']:>12.0f} {rates['python']:>12.0f} "
+              f"{rates['python'] / rates['native']:>13.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+# Benchmark: serial signing vs CredentialSigner.sign_many
+#
+# 用法:
+#   python benchmarks/sign_batch.py --bodies 20000 --body-size 65536 --workers 1 2 4 8
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from aflow_client_python.utils.sign import get_signing_engine  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="比较逐条签名与批量签名的吞吐量")
+    parser.add_argument("--bodies", type=int, default=20000, help="请求体数量，默认 20000")
+    parser.add_argument("--body-size", type=int, default=65536, help="请求体字节数，默认 65536（约一个千条用户的批次）")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1],
+                        help="sign_many 的线程数，可以指定多个")
+    parser.add_argument("--backend", default=None, help="签名实现 native / python，默认读取 SIGN_BACKEND")
+    parser.add_argument("--rounds", type=int, default=3, help="每种方式运行的轮数，取最快一轮，默认 3")
+    args = parser.parse_args()
+    workers_list = sorted(set(args.workers))
+
+    engine = get_signing_engine(args.backend)
+    signer = engine.bind("bench_app_id", "bench_enterprise", "bench_app_secret")
+    row = b'{"userId":"u0000001","userName":"n","realName":"r","deptId":"d1"},'
+    bodies = [(b'{"users":[' + row * (args.body_size // len(row)))[:args.body_size - 8] + b'%08d' % i
+              for i in range(args.bodies)]
+
+    def best(func) -> float:
+        timings = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    print(f"backend={engine.backend} bodies={args.bodies} body_size={args.body_size}B cpus={os.cpu_count()}")
+    serial = best(lambda: [signer.sign(body) for body in bodies])
+    print(f"{'serial':>14}: {args.bodies / serial:>10.0f} signatures/s  {serial:.2f}s")
+    for workers in workers_list:
+        elapsed = best(lambda: signer.sign_many(bodies, max_workers=workers))
+        print(f"{f'sign_many({workers})':>14}: {args.bodies / elapsed:>10.0f} signatures/s  {elapsed:.2f}s  "
+              f"x{serial / elapsed:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
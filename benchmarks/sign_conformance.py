@@ -0,0 +1,100 @@
+# Conformance check: PythonSigningEngine against the native libencrypt, byte for byte
+#
+# 用法:
+#   python benchmarks/sign_conformance.py --cases 20000
+#   python benchmarks/sign_conformance.py --cases 2000 --seed 42 --max-body-size 1048576
+#
+# 随机生成凭证、时间戳和请求体（空、ASCII、中文及其他多字节字符、业务 JSON、随机字节、含 NUL、大请求体），
+# 两种实现的签名及 hex_to_string 结果必须完全一致；有不一致时输出前几个用例并以非零状态退出
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from aflow_client_python.utils.sign import get_signing_engine  # noqa: E402
+
+_ALPHABETS = [
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-",
+    "人事部研发中心张三李四王五审批流程测试",
+    "àéîõüßøπΩЖжשׁ😀🚀 \t\"\\/{}[]:,",
+]
+
+
+def random_text(rng: random.Random, size: int) -> str:
+    alphabet = rng.choice(_ALPHABETS)
+    return "".join(rng.choice(alphabet) for _ in range(size))
+
+
+def random_body(rng: random.Random, max_size: int) -> bytes:
+    kind = rng.randrange(7)
+    if kind == 0:
+        return b""
+    if kind == 1:
+        return random_text(rng, rng.randint(1, 256)).encode("utf-8")
+    if kind == 2:
+        users = [{"userId": f"u{i}", "userName": random_text(rng, 8), "realName": random_text(rng, 3),
+                  "deptId": f"d{rng.randrange(100)}"} for i in range(rng.randint(1, 50))]
+        return json.dumps({"users": users}, separators=(",", ":"), ensure_ascii=rng.random() < 0.5).encode("utf-8")
+    if kind == 3:
+        # 随机字节，不一定是合法的 UTF-8，但不含 NUL
+        return bytes(rng.randrange(1, 256) for _ in range(rng.randint(1, 512)))
+    if kind == 4:
+        # 含 NUL：两种实现都按 C 字符串截断
+        return random_text(rng, 16).encode("utf-8") + b"\0" + random_text(rng, 16).encode("utf-8")
+    if kind == 5:
+        return random_text(rng, rng.randint(1, 64)).encode("utf-8")
+    return (b'{"users":[' + b'{"userId":"u1","realName":"n"},' * (max_size // 30))[:rng.randint(1, max_size)]
+
+
+def random_timestamp(rng: random.Random) -> int:
+    return rng.choice([
+        int(time.time() * 1000),
+        rng.randrange(1, 10 ** 13),
+        rng.randrange(-(2 ** 63), 2 ** 63),
+        1,
+        -1,
+    ])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="比较纯 Python 签名实现与加密库的输出")
+    parser.add_argument("--cases", type=int, default=20000, help="用例数量，默认 20000")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子，默认随机，复现时指定")
+    parser.add_argument("--max-body-size", type=int, default=262144, help="大请求体的最大字节数，默认 262144")
+    args = parser.parse_args()
+
+    seed = random.randrange(2 ** 32) if args.seed is None else args.seed
+    rng = random.Random(seed)
+    native = get_signing_engine("native")
+    python = get_signing_engine("python")
+
+    mismatches = []
+    for case in range(args.cases):
+        credential = tuple(random_text(rng, rng.randint(0, 40)) for _ in range(3))
+        body = random_body(rng, args.max_body_size)
+        timestamp = random_timestamp(rng)
+        expected = native.sign(*credential, body, timestamp)
+        actual = python.sign(*credential, body, timestamp)
+        if expected != actual or native.hex_to_string(expected) != python.hex_to_string(expected):
+            mismatches.append((case, credential, body[:80], timestamp, expected[:80], actual[:80]))
+
+    # timestamp 为 0 时两种实现都取当前时间（精确到秒），跨秒时重试一次
+    for _ in range(2):
+        if native.sign("a", "e", "s", b"{}", 0) == python.sign("a", "e", "s", b"{}", 0):
+            break
+    else:
+        mismatches.append(("timestamp=0", ("a", "e", "s"), b"{}", 0, "", ""))
+
+    print(f"seed={seed} cases={args.cases} mismatches={len(mismatches)}")
+    for mismatch in mismatches[:10]:
+        print("  case={} credential={!r} body={!r} timestamp={}\n    native={}\n    python={}".format(*mismatch))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
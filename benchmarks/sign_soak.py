@@ -0,0 +1,100 @@
+# Soak benchmark: signature throughput and RSS over millions of signatures
+#
+# 用法:
+#   python benchmarks/sign_soak.py --iterations 2000000 --threads 4
+#   python benchmarks/sign_soak.py --iterations 200000 --leaky   # 对照：按旧方式调用（不释放C端字符串）
+#
+# 正常情况下 RSS 在前几个报告点之后保持平稳；--leaky 时 RSS 随签名次数线性增长
+
+import argparse
+import ctypes
+import os
+import resource
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from aflow_client_python.utils.sign import get_signing_engine  # noqa: E402
+
+_CREDENTIAL = ("soak_app_id", "soak_enterprise", "soak_app_secret")
+
+
+def rss_mb() -> float:
+    """当前常驻内存（MB），不支持 /proc 的系统退化为历史峰值"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def leaky_sign(lib: ctypes.CDLL, body: bytes) -> str:
+    """旧实现的调用方式：返回值按 c_char_p 接收，C 端字符串从不释放"""
+    lib.generate_signature.restype = ctypes.c_char_p
+    result = lib.generate_signature(*(value.encode("utf-8") for value in _CREDENTIAL), body,
+                                    int(time.time() * 1000))
+    return result.decode("utf-8")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="签名引擎长时间压测，观察吞吐量和内存")
+    parser.add_argument("--iterations", type=int, default=2_000_000, help="签名总次数，默认 2000000")
+    parser.add_argument("--threads", type=int, default=4, help="并发线程数，默认 4")
+    parser.add_argument("--body-size", type=int, default=2048, help="请求体字节数，默认 2048")
+    parser.add_argument("--report-every", type=int, default=200_000, help="每签名多少次输出一次，默认 200000")
+    parser.add_argument("--leaky", action="store_true", help="按旧实现的方式调用，作为内存泄漏的对照")
+    args = parser.parse_args()
+
+    # --leaky 直接调用加密库，不受 SIGN_BACKEND 影响
+    engine = get_signing_engine("native" if args.leaky else None)
+    body = (b'{"users":[' + b'{"userId":"u1","realName":"n"},' * (args.body_size // 30))[:args.body_size]
+    if args.leaky:
+        sign = lambda: leaky_sign(engine.lib, body)  # noqa: E731
+    else:
+        sign = lambda: engine.sign(*_CREDENTIAL, body)  # noqa: E731
+
+    counter = {"done": 0}
+    lock = threading.Lock()
+    per_thread = args.iterations // args.threads
+
+    def worker():
+        for start in range(0, per_thread, 1000):
+            for _ in range(min(1000, per_thread - start)):
+                sign()
+            with lock:
+                counter["done"] += min(1000, per_thread - start)
+
+    baseline = rss_mb()
+    print(f"mode={'leaky' if args.leaky else 'engine'} threads={args.threads} body={len(body)}B "
+          f"rss_start={baseline:.1f}MB")
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    next_report = args.report_every
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(0.2)
+        with lock:
+            done = counter["done"]
+        if done >= next_report:
+            elapsed = time.perf_counter() - started
+            print(f"signatures={done:>10} rate={done / elapsed:>10.0f}/s rss={rss_mb():.1f}MB "
+                  f"(+{rss_mb() - baseline:.1f}MB)")
+            next_report = (done // args.report_every + 1) * args.report_every
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.perf_counter() - started
+    growth = rss_mb() - baseline
+    print(f"total={counter['done']} elapsed={elapsed:.1f}s rate={counter['done'] / elapsed:.0f}/s "
+          f"rss_end={rss_mb():.1f}MB growth={growth:.1f}MB "
+          f"({growth * 1024 * 1024 / max(counter['done'], 1):.1f} B/signature)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
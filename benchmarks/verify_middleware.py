@@ -0,0 +1,103 @@
+# Benchmark: per-request overhead of SignatureVerifier and the ASGI / WSGI middleware
+#
+# 用法:
+#   python benchmarks/verify_middleware.py --requests 20000 --body-size 256 1024 16384
+#
+# 每个请求使用不同的签名（防重放缓存会拒绝重复签名），签名在计时前生成；
+# 中间件的开销 = 经过中间件的耗时 - 直接调用应用的耗时
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from aflow_client_python.core.verify import (  # noqa: E402
+    ASGISignatureMiddleware, SignatureVerifier, WSGISignatureMiddleware,
+)
+from aflow_client_python.utils.sign import get_signing_engine  # noqa: E402
+
+_CREDENTIAL = {"app_id": "bench_app_id", "enterprise_code": "bench_enterprise", "app_secret": "bench_app_secret"}
+
+
+def make_signatures(body: bytes, count: int):
+    signer = get_signing_engine().bind(_CREDENTIAL["app_id"], _CREDENTIAL["enterprise_code"],
+                                       _CREDENTIAL["app_secret"])
+    now = int(time.time() * 1000)
+    return [signer.sign(body, now - i) for i in range(count)]
+
+
+def bench_verifier(body: bytes, signatures) -> float:
+    verifier = SignatureVerifier([_CREDENTIAL], window=3600)
+    started = time.perf_counter()
+    for signature in signatures:
+        verifier.verify(body, signature)
+    return time.perf_counter() - started
+
+
+def bench_asgi(body: bytes, signatures) -> float:
+    async def app(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def send(message):
+        pass
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def run(handler, headers_list) -> float:
+        started = time.perf_counter()
+        for headers in headers_list:
+            await handler({"type": "http", "path": "/callback", "headers": headers}, receive, send)
+        return time.perf_counter() - started
+
+    middleware = ASGISignatureMiddleware(app, SignatureVerifier([_CREDENTIAL], window=3600))
+    headers_list = [[(b"content-type", b"application/json"), (b"x-a-signature", signature.encode("latin-1"))]
+                    for signature in signatures]
+    bare = asyncio.run(run(app, headers_list))
+    wrapped = asyncio.run(run(middleware, headers_list))
+    return wrapped - bare
+
+
+def bench_wsgi(body: bytes, signatures) -> float:
+    def app(environ, start_response):
+        environ["wsgi.input"].read(int(environ["CONTENT_LENGTH"]))
+        start_response("200 OK", [])
+        return [b"ok"]
+
+    def start_response(status, headers):
+        pass
+
+    def run(handler) -> float:
+        started = time.perf_counter()
+        for signature in signatures:
+            handler({"PATH_INFO": "/callback", "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body),
+                     "HTTP_X_A_SIGNATURE": signature}, start_response)
+        return time.perf_counter() - started
+
+    middleware = WSGISignatureMiddleware(app, SignatureVerifier([_CREDENTIAL], window=3600))
+    return run(middleware) - run(app)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="入站签名校验的单请求开销")
+    parser.add_argument("--requests", type=int, default=20000, help="请求数，默认 20000")
+    parser.add_argument("--body-size", type=int, nargs="+", default=[256, 1024, 16384], help="请求体字节数，可以指定多个")
+    args = parser.parse_args()
+
+    print(f"verifier_backend={SignatureVerifier([_CREDENTIAL]).signature.engine.backend} requests={args.requests}")
+    print(f"{'body':>8} {'verify':>10} {'asgi':>10} {'wsgi':>10}   (微秒/请求)")
+    for size in args.body_size:
+        body = (b'{"taskId":"t0000001","status":"APPROVED","comment":"ok"},' * (size // 56 + 1))[:size]
+        results = [bench(body, make_signatures(body, args.requests)) for bench in (bench_verifier, bench_asgi, bench_wsgi)]
+        print(f"{size:>7}B " + " ".join(f"{elapsed / args.requests * 1e6:>10.1f}" for elapsed in results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -40,6 +40,17 @@ setup(
     license="MIT",
     python_requires=">=3.7",
     install_requires=install_requires,
+    extras_require={
+        "async": ["aiohttp>=3.8.0"],
+        "orjson": ["orjson>=3.8.0"],
+        "msgspec": ["msgspec>=0.18.0"],
+    },
+    entry_points={
+        "console_scripts": [
+            "aflow-replay=aflow_client_python.cli.replay:main",
+            "aflow-import=aflow_client_python.cli.importer:main",
+        ],
+    },
     include_package_data=True,
     zip_safe=False,
 )
@@ -5,10 +5,31 @@ from .core.decorator import ApiRoute, WithModel
 from .core.scanner import EnhancedInterfaceScanner
 from .core.register import EnhancedServiceRegistrar
 from .core.config import config_manager
-from .utils.sign import ASignature
+from .utils.sign import ASignature, BaseSigningEngine, PythonSigningEngine, SigningEngine, get_signing_engine
+from .utils.codec import JsonCodec, get_codec
 from .core.client import (
     AFlowClient, 
 )
+from .core.async_client import AsyncAFlowClient
+from .core.transport import HttpTransport, get_default_transport
+from .core.retry import RetryPolicy
+from .core.breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitState, get_default_breakers
+from .core.delta import DeltaSyncer, FingerprintStore
+from .core.topology import DepartmentTree
+from .core.producer import TaskSyncProducer
+from .core.outbox import TaskOutbox
+from .core.dedup import TaskSyncDedupCache
+from .core.checkpoint import SyncCheckpoint
+from .core.adaptive import AdaptiveBatchController
+from .core.batch import FailedItem, SyncOutcome
+from .core.response import AFlowResponse
+from .core.clock import ClockSkewEstimator, get_default_clock_skew
+from .core.verify import ASGISignatureMiddleware, ReplayCache, SignatureVerifier, WSGISignatureMiddleware
+from .core.ratelimit import RateLimit, RateLimiter, TokenBucket
+from .core.exceptions import (
+    AFlowError, AFlowRequestError, DeadlineExceededError, CircuitOpenError, DepartmentTopologyError,
+    ProducerQueueFullError, ProducerClosedError, SignatureVerificationError,
+)
 
 __all__ = [
     "ApiRoute",
@@ -17,5 +38,47 @@ __all__ = [
     "EnhancedServiceRegistrar",
     "config_manager",
     "ASignature",
+    "SigningEngine",
+    "PythonSigningEngine",
+    "BaseSigningEngine",
+    "get_signing_engine",
+    "JsonCodec",
+    "get_codec",
     "AFlowClient",
+    "AsyncAFlowClient",
+    "HttpTransport",
+    "get_default_transport",
+    "RetryPolicy",
+    "AFlowError",
+    "AFlowRequestError",
+    "DeadlineExceededError",
+    "CircuitOpenError",
+    "DepartmentTopologyError",
+    "ProducerQueueFullError",
+    "ProducerClosedError",
+    "SignatureVerificationError",
+    "CircuitBreaker",
+    "CircuitBreakerRegistry",
+    "CircuitState",
+    "get_default_breakers",
+    "RateLimit",
+    "RateLimiter",
+    "TokenBucket",
+    "DeltaSyncer",
+    "FingerprintStore",
+    "DepartmentTree",
+    "TaskSyncProducer",
+    "TaskOutbox",
+    "TaskSyncDedupCache",
+    "SyncCheckpoint",
+    "FailedItem",
+    "SyncOutcome",
+    "AdaptiveBatchController",
+    "AFlowResponse",
+    "ClockSkewEstimator",
+    "get_default_clock_skew",
+    "SignatureVerifier",
+    "ReplayCache",
+    "ASGISignatureMiddleware",
+    "WSGISignatureMiddleware",
 ]
\ No newline at end of file
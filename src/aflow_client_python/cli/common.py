@@ -0,0 +1,178 @@
+# Shared helpers for the command line tools
+
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple, Union
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from ..core.client import AFlowClient
+    from ..core.config import config_manager
+    from ..core.transport import HttpTransport
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.client import AFlowClient
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.core.transport import HttpTransport
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """按 --format 或文件扩展名判断输入格式：jsonl / csv"""
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _decode_cell(value: Optional[str]):
+    """CSV 单元格：空字符串视为未填写，以 [ 或 { 开头的按 JSON 解析（tasks、ccUsers 等嵌套字段）"""
+    if not value:
+        return None
+    if value[0] in "[{":
+        return json.loads(value)
+    return value
+
+
+@dataclass
+class MalformedRecord:
+    """无法解析的记录（JSON 格式错误等），line 为输入文件中的行号（从1开始）"""
+
+    line: int
+    raw: Any
+    error: str
+
+    def to_side_record(self, index: int) -> dict:
+        """写入 failed / rejected 文件的内容"""
+        return {"index": index, "line": self.line, "error": self.error, "record": self.raw}
+
+
+def _iter_rows(f, fmt: str) -> Iterator[Union[dict, MalformedRecord]]:
+    """逐条解析，解析失败的记录产出 MalformedRecord 而不是抛出异常，保证序号连续、断点可以越过坏行"""
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                decoded = {k: _decode_cell(v) for k, v in row.items()}
+            except ValueError as e:
+                yield MalformedRecord(reader.line_num, row, f"JSON 解析失败: {e}")
+                continue
+            yield {k: v for k, v in decoded.items() if v is not None}
+    else:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield MalformedRecord(line_no, line.rstrip("\r\n"), f"JSON 解析失败: {e}")
+
+
+def read_records(path: str, fmt: Optional[str] = None,
+                 start: int = 0) -> Iterator[Tuple[int, Union[dict, MalformedRecord]]]:
+    """
+    逐行读取 JSONL / CSV，产出 (记录序号, dict)，序号从0开始，跳过前 start 条
+
+    JSONL 的空行不计入序号；CSV 的表头为字段名（字段名或别名均可）；
+    无法解析的行产出 MalformedRecord，由调用方记入失败文件
+    """
+    fmt = detect_format(path, fmt)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for index, row in enumerate(_iter_rows(f, fmt)):
+            if index >= start:
+                yield index, row
+
+
+class SideFile:
+    """线程安全的 JSONL 输出，记录被拒绝或失败的数据"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class LatencyStats:
+    """统计请求耗时分位数（最近 window 次）和整体吞吐量"""
+
+    def __init__(self, window: int = 10000):
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.started_at = time.monotonic()
+        self.count = 0
+
+    def record(self, elapsed_ms: float, count: int = 1):
+        with self._lock:
+            self._samples.append(elapsed_ms)
+            self.count += count
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.count
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        result = {"count": count, "rate": round(count / elapsed, 1)}
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            result[name] = round(samples[min(len(samples) - 1, int(q * len(samples)))], 1) if samples else 0.0
+        return result
+
+
+class Reporter:
+    """后台线程每隔 interval 秒调用一次 report，stop 时再调用一次"""
+
+    def __init__(self, interval: float, report):
+        self.interval = interval
+        self.report = report
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="aflow-cli-reporter", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.report(final=False)
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.report(final=True)
+
+
+def write_json_atomic(path: str, data: dict):
+    """先写临时文件再替换，进程中断时不会留下半个文件"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def add_client_arguments(parser: argparse.ArgumentParser):
+    """客户端相关参数，签名所需的 APP_ID / APP_SECRET / ENTERPRISE_CODE 从环境变量读取"""
+    parser.add_argument("--base-url", help="AFlow 服务地址，默认读取 AIFLOW_DOMAIN")
+
+
+def build_client(args: argparse.Namespace, concurrency: int, **kwargs) -> AFlowClient:
+    """创建客户端，连接池大小不小于并发数，避免线程等待连接"""
+    transport = HttpTransport(pool_maxsize=max(concurrency, config_manager.get("pool_maxsize")))
+    return AFlowClient(base_url=args.base_url, transport=transport, **kwargs)
@@ -0,0 +1,221 @@
+# Bulk import of users, departments and user bindings from HR exports
+#
+# 用法:
+#   aflow-import users users.csv --chunk-size 1000 --workers 8
+#   aflow-import departments depts.jsonl --tree
+#   aflow-import bindings bindings.csv --workers 16
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .common import (
+        LatencyStats, MalformedRecord, Reporter, SideFile, add_client_arguments, build_client, read_records,
+    )
+    from ..core.batch import ChunkReport, SyncOutcome, chunked, dispatch_bounded, merge_sync_results
+    from ..core.client import AFlowClient
+    from ..models import BindUserReq, DepartmentSyncItem, SyncFailDetail, SyncResult, UserSyncItem
+    from ..utils.logger import get_logger
+except ImportError:
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.cli.common import (
+        LatencyStats, MalformedRecord, Reporter, SideFile, add_client_arguments, build_client, read_records,
+    )
+    from aflow_client_python.core.batch import ChunkReport, SyncOutcome, chunked, dispatch_bounded, merge_sync_results
+    from aflow_client_python.core.client import AFlowClient
+    from aflow_client_python.models import BindUserReq, DepartmentSyncItem, SyncFailDetail, SyncResult, UserSyncItem
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+# 数据类型 -> (模型, 接口路径, 请求体中的列表字段)
+_KINDS = {
+    "users": (UserSyncItem, "/aflow/api/sys/sync/user", "users"),
+    "departments": (DepartmentSyncItem, "/aflow/api/sys/sync/department", "departments"),
+    "bindings": (BindUserReq, "/aflow/api/auth/bind", None),
+}
+
+
+class OrgImporter:
+    """
+    流式导入组织数据：边读取边校验，按批次并行发送，在途批次数有上限，内存占用与文件大小无关
+
+    校验失败的行、服务端返回的 failDetails 以及整批失败的数据写入 rejected 文件
+    """
+
+    def __init__(self, client: AFlowClient, kind: str, rejected: SideFile, chunk_size: int,
+                 workers: int, max_in_flight: int, report_interval: float = 10.0):
+        self.client = client
+        self.kind = kind
+        self.model_cls, path, self.payload_key = _KINDS[kind]
+        self.url = f"{client.base_url}{path}"
+        self.rejected = rejected
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.report_interval = report_interval
+        self.latency = LatencyStats()
+        self.counts = {"read": 0, "invalid": 0, "success": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def _valid_items(self, records) -> Iterator[BaseModel]:
+        """无法解析和校验失败的行写入 rejected 文件，不发送"""
+        for index, row in records:
+            with self._lock:
+                self.counts["read"] += 1
+            if isinstance(row, MalformedRecord):
+                # JSON 格式错误的行与校验失败一样记入 rejected 文件，不中断导入
+                with self._lock:
+                    self.counts["invalid"] += 1
+                self.rejected.write(row.to_side_record(index))
+                continue
+            try:
+                yield self.model_cls.model_validate(row)
+            except (ValidationError, ValueError) as e:
+                with self._lock:
+                    self.counts["invalid"] += 1
+                self.rejected.write({"index": index, "error": str(e), "record": row})
+
+    def _on_chunk(self, report: ChunkReport, items: list):
+        """只更新进度统计；服务端同步失败的数据在 run 结束后按最终结果写入 rejected 文件"""
+        self.latency.record(report.elapsed_ms, report.size)
+        if report.result is not None:
+            success, failed = report.result.success_count, report.result.fail_count
+        elif report.success:
+            success, failed = report.size, 0
+        else:
+            success, failed = 0, report.size
+        with self._lock:
+            self.counts["success"] += success
+            if report.attempt > 1:
+                # 重发的数据上一轮已计为失败，重发成功的从失败数中扣除
+                self.counts["failed"] -= success
+            else:
+                self.counts["failed"] += failed
+
+    def _write_failures(self, outcome: SyncOutcome):
+        """写入最终仍然失败的数据，重发成功的不写入；能映射回原始数据的附带原始数据便于重新导入"""
+        for failed in outcome.failed_items:
+            self.rejected.write({"code": failed.detail.code, "error": failed.detail.message,
+                                 "record": failed.item.model_dump(by_alias=True)})
+        for detail in outcome.unmapped:
+            self.rejected.write({"code": detail.code, "error": detail.message})
+
+    def _bind_chunk(self, index: int, chunk: List[BindUserReq]) -> ChunkReport:
+        """绑定接口每次只接受一条数据，同一批次内由一个线程依次发送"""
+        start = time.perf_counter()
+        details: List[SyncFailDetail] = []
+        for item in chunk:
+            try:
+                response = self.client._make_request(self.url, item, raise_on_error=True)
+                error = None if response.get("status") == 0 else response.get("msg") or str(response)
+            except Exception as e:
+                error = str(e)
+            if error is not None:
+                details.append(SyncFailDetail(code="BIND_FAILED", message=f"{item.custom_user_code}: {error}"))
+                self.rejected.write({"chunk": index, "code": "BIND_FAILED", "error": error,
+                                     "record": item.model_dump(by_alias=True)})
+        report = ChunkReport(
+            index=index,
+            size=len(chunk),
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+            success=not details,
+            result=SyncResult(success_count=len(chunk) - len(details), fail_count=len(details), fail_details=details),
+        )
+        self._on_chunk(report, chunk)
+        return report
+
+    def run(self, records, tree: bool = False) -> dict:
+        reporter = Reporter(self.report_interval, self._report).start()
+        try:
+            items = self._valid_items(records)
+            if self.kind == "bindings":
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    reports = dispatch_bounded(executor, enumerate(chunked(items, self.chunk_size)),
+                                               self._bind_chunk, self.max_in_flight)
+                return merge_sync_results(reports)
+            if tree:
+                # 部门按层级同步需要先读入全部数据
+                return self.client.sync_department_tree(list(items), strict=False, chunk_size=self.chunk_size,
+                                                        max_workers=self.workers)
+            outcome = self.client._sync_stream(self.url, self.payload_key, self.model_cls, items, self.chunk_size,
+                                               self.workers, self.max_in_flight, on_chunk=self._on_chunk)
+            self._write_failures(outcome)
+            return outcome
+        finally:
+            reporter.stop()
+
+    def _report(self, final: bool):
+        with self._lock:
+            counts = dict(self.counts)
+        latency = self.latency.snapshot()
+        logger.info(
+            f"{'导入完成' if final else '导入进度'}: 已读取 {counts['read']} 行，成功 {counts['success']}，"
+            f"失败 {counts['failed']}，校验失败 {counts['invalid']}，{latency['rate']} 条/秒，"
+            f"批次耗时 p50/p95/p99: {latency['p50']}/{latency['p95']}/{latency['p99']} ms"
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="aflow-import",
+        description="从 CSV / JSONL 文件批量导入用户、部门和用户绑定关系",
+    )
+    parser.add_argument("kind", choices=sorted(_KINDS), help="数据类型")
+    parser.add_argument("input", help="输入文件，表头/字段名为模型字段名或别名")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="输入格式，默认按扩展名判断")
+    parser.add_argument("--chunk-size", type=int, help="每批条数，默认读取 SYNC_CHUNK_SIZE")
+    parser.add_argument("--workers", type=int, help="并行线程数，默认读取 SYNC_MAX_WORKERS")
+    parser.add_argument("--max-in-flight", type=int, help="在途批次数上限，默认等于线程数")
+    parser.add_argument("--tree", action="store_true", help="部门按层级同步（上级先于下级），需要将文件全部读入内存")
+    parser.add_argument("--rejected-output", help="校验失败和同步失败的数据输出文件，默认 <input>.rejected.jsonl")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="进度输出间隔（秒），默认 10")
+    add_client_arguments(parser)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.tree and args.kind != "departments":
+        raise SystemExit("--tree 只适用于 departments")
+
+    client = build_client(args, args.workers or 0)
+    workers = args.workers or client.max_workers
+    rejected = SideFile(args.rejected_output or f"{args.input}.rejected.jsonl")
+    importer = OrgImporter(
+        client,
+        args.kind,
+        rejected,
+        chunk_size=args.chunk_size or client.chunk_size,
+        workers=workers,
+        max_in_flight=args.max_in_flight or workers,
+        report_interval=args.report_interval,
+    )
+    try:
+        result = importer.run(read_records(args.input, args.format), tree=args.tree)
+        data = result.get("data") or {}
+        if args.tree:
+            # 按层级同步时逐批回调不可用，失败详情（含孤儿部门、循环引用）在结束后统一写入
+            for detail in data.get("failDetails", []):
+                rejected.write({"code": detail["code"], "error": detail["message"]})
+    finally:
+        rejected.close()
+
+    logger.info(f"成功 {data.get('successCount', 0)} 条，失败 {data.get('failCount', 0)} 条")
+    if rejected.count:
+        logger.warning(f"{rejected.count} 条数据被拒绝或同步失败，详见: {rejected.path}")
+    return 0 if result.get("status") == 0 and not data.get("failCount") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# Partitioned parallel replay of historical task sync records
+#
+# 用法:
+#   aflow-replay orders.jsonl --workers 16
+#   aflow-replay orders.csv --workers 16 --resume
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import List, Optional, Set
+
+from pydantic import ValidationError
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .common import (
+        LatencyStats,
+        MalformedRecord,
+        Reporter,
+        SideFile,
+        add_client_arguments,
+        build_client,
+        read_records,
+        write_json_atomic,
+    )
+    from ..core.client import AFlowClient
+    from ..models import ThirdPartyTaskSyncReq
+    from ..utils.logger import get_logger
+except ImportError:
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.cli.common import (
+        LatencyStats,
+        MalformedRecord,
+        Reporter,
+        SideFile,
+        add_client_arguments,
+        build_client,
+        read_records,
+        write_json_atomic,
+    )
+    from aflow_client_python.core.client import AFlowClient
+    from aflow_client_python.models import ThirdPartyTaskSyncReq
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+# 分区队列中的结束标记
+_STOP = None
+
+
+class _Watermark:
+    """记录已完成的序号，offset 为连续完成的最大前缀，断点续传从 offset 开始"""
+
+    def __init__(self, offset: int):
+        self.offset = offset
+        self._done: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def done(self, index: int):
+        with self._lock:
+            self._done.add(index)
+            while self.offset in self._done:
+                self._done.remove(self.offset)
+                self.offset += 1
+
+
+class TaskReplayer:
+    """
+    按 third_order_id 分区并行重放任务同步：同一订单固定由同一个线程按文件顺序发送，
+    吞吐量随线程数增长；失败的记录写入 failed 文件，进度定期写入 checkpoint 文件
+    """
+
+    def __init__(self, client: AFlowClient, workers: int, queue_size: int,
+                 failed: SideFile, checkpoint_path: str, input_path: str, offset: int = 0,
+                 report_interval: float = 10.0):
+        self.client = client
+        self.workers = workers
+        self.failed = failed
+        self.checkpoint_path = checkpoint_path
+        self.input_path = input_path
+        self.report_interval = report_interval
+        self.watermark = _Watermark(offset)
+        self.latency = LatencyStats()
+        self.counts = {"sent": 0, "skipped": 0, "failed": 0, "invalid": 0}
+        self._counts_lock = threading.Lock()
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._threads = [
+            threading.Thread(target=self._run, args=(q,), name=f"aflow-replay-{index}", daemon=True)
+            for index, q in enumerate(self._queues)
+        ]
+
+    def _count(self, key: str):
+        with self._counts_lock:
+            self.counts[key] += 1
+
+    def _run(self, partition: queue.Queue):
+        while True:
+            item = partition.get()
+            if item is _STOP:
+                return
+            index, request = item
+            start = time.perf_counter()
+            try:
+                response = self.client._send_task(request, raise_on_error=True)
+                error = None if response.get("status") == 0 else response.get("msg") or str(response)
+            except Exception as e:
+                response, error = {}, str(e)
+            self.latency.record((time.perf_counter() - start) * 1000)
+            if error is not None:
+                self._count("failed")
+                self.failed.write({"index": index, "error": error, "record": request.model_dump(by_alias=True)})
+            else:
+                self._count("skipped" if response.get("skipped") else "sent")
+            self.watermark.done(index)
+
+    def run(self, records) -> dict:
+        for thread in self._threads:
+            thread.start()
+        reporter = Reporter(self.report_interval, self._report).start()
+        try:
+            for index, row in records:
+                if isinstance(row, MalformedRecord):
+                    self._count("invalid")
+                    self.failed.write(row.to_side_record(index))
+                    self.watermark.done(index)
+                    continue
+                try:
+                    request = ThirdPartyTaskSyncReq.model_validate(row)
+                except ValidationError as e:
+                    self._count("invalid")
+                    self.failed.write({"index": index, "error": str(e), "record": row})
+                    self.watermark.done(index)
+                    continue
+                self._queues[hash(request.third_order_id) % self.workers].put((index, request))
+        except KeyboardInterrupt:
+            logger.warning("收到中断信号，等待已读取的记录发送完成后退出")
+        finally:
+            for partition in self._queues:
+                partition.put(_STOP)
+            for thread in self._threads:
+                thread.join()
+            reporter.stop()
+        return self.summary()
+
+    def summary(self) -> dict:
+        with self._counts_lock:
+            counts = dict(self.counts)
+        return {**counts, "offset": self.watermark.offset, "latency_ms": self.latency.snapshot()}
+
+    def _report(self, final: bool):
+        summary = self.summary()
+        write_json_atomic(self.checkpoint_path, {
+            "input": os.path.abspath(self.input_path),
+            "offset": summary["offset"],
+            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        latency = summary["latency_ms"]
+        logger.info(
+            f"{'重放完成' if final else '重放进度'}: 已完成 {summary['offset']} 条，"
+            f"成功 {summary['sent']}，跳过 {summary['skipped']}，失败 {summary['failed']}，校验失败 {summary['invalid']}，"
+            f"{latency['rate']} 条/秒，耗时 p50/p95/p99: {latency['p50']}/{latency['p95']}/{latency['p99']} ms"
+        )
+
+
+def _load_offset(checkpoint_path: str, input_path: str) -> int:
+    if not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("input") != os.path.abspath(input_path):
+        raise SystemExit(f"断点文件 {checkpoint_path} 属于其他输入文件: {checkpoint.get('input')}")
+    return int(checkpoint.get("offset", 0))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="aflow-replay",
+        description="按订单分区并行重放 ThirdPartyTaskSyncReq 记录（JSONL / CSV），用于补录历史任务",
+    )
+    parser.add_argument("input", help="输入文件，每行/每条记录为一个 ThirdPartyTaskSyncReq")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="输入格式，默认按扩展名判断")
+    parser.add_argument("--workers", type=int, default=8, help="并行线程数（分区数），默认 8")
+    parser.add_argument("--queue-size", type=int, default=1000, help="每个分区缓冲的记录数，默认 1000")
+    parser.add_argument("--checkpoint", help="断点文件，默认 <input>.checkpoint.json")
+    parser.add_argument("--resume", action="store_true", help="从断点文件记录的位置继续")
+    parser.add_argument("--failed-output", help="失败记录输出文件，默认 <input>.failed.jsonl")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="进度输出和断点保存的间隔（秒），默认 10")
+    add_client_arguments(parser)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    checkpoint_path = args.checkpoint or f"{args.input}.checkpoint.json"
+    offset = _load_offset(checkpoint_path, args.input) if args.resume else 0
+    if offset:
+        logger.info(f"从断点继续，跳过前 {offset} 条记录")
+
+    failed = SideFile(args.failed_output or f"{args.input}.failed.jsonl")
+    replayer = TaskReplayer(
+        build_client(args, args.workers),
+        workers=args.workers,
+        queue_size=args.queue_size,
+        failed=failed,
+        checkpoint_path=checkpoint_path,
+        input_path=args.input,
+        offset=offset,
+        report_interval=args.report_interval,
+    )
+    try:
+        summary = replayer.run(read_records(args.input, args.format, start=offset))
+    finally:
+        failed.close()
+    if failed.count:
+        logger.warning(f"{failed.count} 条记录失败，详见: {failed.path}")
+    return 1 if summary["failed"] or summary["invalid"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,49 @@
 from .register import EnhancedServiceRegistrar
 from .scanner import EnhancedInterfaceScanner
 from .client import AFlowClient
+from .async_client import AsyncAFlowClient
+from .transport import HttpTransport, get_default_transport
+from .retry import RetryPolicy
+from .breaker import CircuitBreaker, CircuitBreakerRegistry, get_default_breakers
+from .ratelimit import RateLimit, RateLimiter
+from .delta import DeltaSyncer, FingerprintStore
+from .topology import DepartmentTree
+from .producer import TaskSyncProducer
+from .outbox import TaskOutbox
+from .dedup import TaskSyncDedupCache
+from .checkpoint import SyncCheckpoint
+from .adaptive import AdaptiveBatchController
+from .batch import FailedItem, SyncOutcome
+from .response import AFlowResponse
+from .clock import ClockSkewEstimator, get_default_clock_skew
+from .verify import ASGISignatureMiddleware, ReplayCache, SignatureVerifier, WSGISignatureMiddleware
 
 __all__ = ['EnhancedServiceRegistrar',
            'EnhancedInterfaceScanner',
-           'AFlowClient']
\ No newline at end of file
+           'AFlowClient',
+           'AsyncAFlowClient',
+           'HttpTransport',
+           'get_default_transport',
+           'RetryPolicy',
+           'CircuitBreaker',
+           'CircuitBreakerRegistry',
+           'get_default_breakers',
+           'RateLimit',
+           'RateLimiter',
+           'DeltaSyncer',
+           'FingerprintStore',
+           'DepartmentTree',
+           'TaskSyncProducer',
+           'TaskOutbox',
+           'TaskSyncDedupCache',
+           'SyncCheckpoint',
+           'FailedItem',
+           'SyncOutcome',
+           'AdaptiveBatchController',
+           'AFlowResponse',
+           'ClockSkewEstimator',
+           'get_default_clock_skew',
+           'SignatureVerifier',
+           'ReplayCache',
+           'ASGISignatureMiddleware',
+           'WSGISignatureMiddleware']
\ No newline at end of file
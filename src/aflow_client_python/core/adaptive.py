@@ -0,0 +1,125 @@
+# Adaptive (AIMD) batch size and concurrency control for bulk sync
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .config import config_manager
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class AdaptiveBatchController:
+    """
+    按加性增、乘性减（AIMD）调整批次大小和在途请求数
+
+    - 请求成功且耗时不超过 target_latency：批次大小增加 step，在途请求数每一轮（in_flight 个请求）增加 1
+    - 请求成功但耗时超过 target_latency：批次大小乘以 decrease_factor
+    - 请求失败（超时、网络错误、429/5xx、熔断）：批次大小和在途请求数都乘以 decrease_factor
+    - 服务端返回 413：批次大小上限降为该批次的一半（最小为 1，可以低于 min_size），由调用方拆分后重发
+
+    同一时刻在途的多个请求往往会同时观察到拥塞，只有在上次减小之后才发出的请求会再次触发减小，
+    避免一次拥塞把批次大小连续减到最小值。
+    """
+
+    def __init__(
+            self,
+            initial_size: Optional[int] = None,
+            min_size: Optional[int] = None,
+            max_size: Optional[int] = None,
+            initial_in_flight: Optional[int] = None,
+            max_in_flight: Optional[int] = None,
+            target_latency: Optional[float] = None,
+            step: Optional[int] = None,
+            decrease_factor: float = 0.5,
+    ):
+        self.min_size: int = min_size or config_manager.get("sync_adaptive_min_size")
+        self.max_size: int = max_size or config_manager.get("sync_adaptive_max_size")
+        self.max_in_flight: int = max_in_flight or config_manager.get("sync_adaptive_max_in_flight")
+        self.target_latency: float = target_latency or config_manager.get("sync_adaptive_target_latency")
+        self.step: int = step or config_manager.get("sync_adaptive_step")
+        if not 0 < decrease_factor < 1:
+            raise ValueError(f"decrease_factor 必须在 0 和 1 之间: {decrease_factor}")
+        self.decrease_factor = decrease_factor
+
+        self._lock = threading.Lock()
+        # 413 之后学到的批次大小上限
+        self._ceiling = self.max_size
+        self._size = float(self._clamp_size(initial_size or config_manager.get("sync_chunk_size")))
+        self._in_flight = float(min(self.max_in_flight,
+                                    max(1, initial_in_flight or config_manager.get("sync_max_workers"))))
+        self._last_decrease = 0.0
+        self._stats = {"increases": 0, "decreases": 0, "splits": 0}
+
+    @property
+    def batch_size(self) -> int:
+        """下一个批次的条数"""
+        return int(self._size)
+
+    @property
+    def in_flight(self) -> int:
+        """当前允许的在途请求数"""
+        return int(self._in_flight)
+
+    def on_success(self, started_at: float, elapsed: float):
+        """记录一次成功的请求，started_at 为发出请求时的 time.monotonic()，elapsed 为耗时（秒）"""
+        with self._lock:
+            if elapsed > self.target_latency:
+                if self._decrease_allowed(started_at):
+                    self._size = float(self._clamp_size(self._size * self.decrease_factor))
+                    self._decreased()
+                return
+            self._size = float(self._clamp_size(self._size + self.step))
+            self._in_flight = min(float(self.max_in_flight), self._in_flight + 1 / self._in_flight)
+            self._stats["increases"] += 1
+
+    def on_error(self, started_at: float):
+        """记录一次因服务端过载或网络原因失败的请求"""
+        with self._lock:
+            if not self._decrease_allowed(started_at):
+                return
+            self._size = float(self._clamp_size(self._size * self.decrease_factor))
+            self._in_flight = max(1.0, self._in_flight * self.decrease_factor)
+            self._decreased()
+
+    def on_too_large(self, size: int):
+        """服务端返回 413：批次大小上限降为 size 的一半；服务端的限制可能低于 min_size，上限只保证不小于 1"""
+        with self._lock:
+            ceiling = max(1, min(self._ceiling, size // 2))
+            lowered, self._ceiling = ceiling < self._ceiling, ceiling
+            self._size = min(self._size, float(ceiling))
+            self._stats["splits"] += 1
+        if lowered:
+            logger.warning(f"批次 {size} 条超过服务端限制，批次大小上限调整为 {ceiling}")
+
+    def snapshot(self) -> Dict[str, int]:
+        """当前的批次大小、在途请求数、批次大小上限，以及累计的增加、减小、拆分次数"""
+        with self._lock:
+            return {"batch_size": self.batch_size, "in_flight": self.in_flight, "ceiling": self._ceiling,
+                    **self._stats}
+
+    def _clamp_size(self, size: float) -> int:
+        """不小于 min_size，但 413 学到的上限优先"""
+        return int(min(self._ceiling, max(self.min_size, size)))
+
+    def _decrease_allowed(self, started_at: float) -> bool:
+        """调用方需持有锁"""
+        return started_at >= self._last_decrease
+
+    def _decreased(self):
+        """调用方需持有锁"""
+        self._last_decrease = time.monotonic()
+        self._stats["decreases"] += 1
+        logger.debug(f"自适应批次调整: 批次大小 {self.batch_size}，在途请求数 {self.in_flight}")
@@ -0,0 +1,433 @@
+import os
+import logging
+import time
+from urllib.parse import urlparse
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type, Union
+
+from pydantic import BaseModel
+
+# aiohttp 为可选依赖: pip install "aflow_client_python[async]"
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from ..models import (
+        DepartmentSyncItem,
+        SyncResult,
+        UserSyncItem,
+        BindUserReq,
+        ThirdPartyFlowBase,
+        ThirdPartyFlowCreateReq,
+        ThirdPartyFlowOnlineReq,
+        ThirdPartyTaskSyncReq,
+    )
+    from ..utils import logger
+    from ..utils.sign import ASignature
+    from ..utils.codec import JsonCodec, get_codec
+    from ..utils.compression import RequestCompressor, get_request_compressor
+    from .config import config_manager
+    from .exceptions import AFlowRequestError
+    from .retry import RetryPolicy, parse_retry_after
+    from .breaker import CircuitBreakerRegistry, get_default_breakers
+    from .ratelimit import RateLimiter, get_default_rate_limiter
+    from .outbox import TaskOutbox, get_default_outbox
+    from .dedup import TaskSyncDedupCache, get_default_dedup_cache
+    from .batch import (
+        ChunkReport,
+        ChunkCallback,
+        FailureCollector,
+        SYNC_KEY_FIELDS,
+        SyncOutcome,
+        chunked,
+        items_to_resend,
+        merge_retry_outcome,
+        parse_sync_result,
+        merge_sync_results,
+        retry_callback,
+    )
+    from .response import AFlowResponse
+    from .clock import ClockSkewEstimator, get_default_clock_skew
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.models import (
+        DepartmentSyncItem,
+        SyncResult,
+        UserSyncItem,
+        BindUserReq,
+        ThirdPartyFlowBase,
+        ThirdPartyFlowCreateReq,
+        ThirdPartyFlowOnlineReq,
+        ThirdPartyTaskSyncReq,
+    )
+    from aflow_client_python.utils import logger
+    from aflow_client_python.utils.sign import ASignature
+    from aflow_client_python.utils.codec import JsonCodec, get_codec
+    from aflow_client_python.utils.compression import RequestCompressor, get_request_compressor
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.core.exceptions import AFlowRequestError
+    from aflow_client_python.core.retry import RetryPolicy, parse_retry_after
+    from aflow_client_python.core.breaker import CircuitBreakerRegistry, get_default_breakers
+    from aflow_client_python.core.ratelimit import RateLimiter, get_default_rate_limiter
+    from aflow_client_python.core.outbox import TaskOutbox, get_default_outbox
+    from aflow_client_python.core.dedup import TaskSyncDedupCache, get_default_dedup_cache
+    from aflow_client_python.core.batch import (
+        ChunkReport,
+        ChunkCallback,
+        FailureCollector,
+        SYNC_KEY_FIELDS,
+        SyncOutcome,
+        chunked,
+        items_to_resend,
+        merge_retry_outcome,
+        parse_sync_result,
+        merge_sync_results,
+        retry_callback,
+    )
+    from aflow_client_python.core.response import AFlowResponse
+    from aflow_client_python.core.clock import ClockSkewEstimator, get_default_clock_skew
+
+
+class AsyncAFlowClient:
+    """
+    AFlowClient 的 asyncio 版本，方法与 AFlowClient 一一对应
+
+    用法:
+        async with AsyncAFlowClient() as client:
+            await client.sync_task(task_data)
+    """
+
+    def __init__(
+            self,
+            base_url: str = None,
+            limit: Optional[int] = None,
+            limit_per_host: Optional[int] = None,
+            max_concurrency: Optional[int] = None,
+            chunk_size: Optional[int] = None,
+            max_workers: Optional[int] = None,
+            codec: Optional[JsonCodec] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            raise_on_error: bool = False,
+            circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            outbox: Optional[TaskOutbox] = None,
+            dedup: Optional[TaskSyncDedupCache] = None,
+            compressor: Optional[RequestCompressor] = None,
+            clock_skew: Optional[ClockSkewEstimator] = None,
+    ):
+        if aiohttp is None:
+            raise ImportError('AsyncAFlowClient 依赖 aiohttp，请执行 pip install "aflow_client_python[async]"')
+
+        self.base_url = base_url or os.getenv("AIFLOW_DOMAIN", "")
+        # 按响应的 Date 头估计与服务端的时钟偏差，签名时间戳按偏差校正；未指定时按 CLOCK_SKEW_COMPENSATION 配置
+        self.clock_skew = clock_skew or get_default_clock_skew()
+        self.sig_generator = ASignature(clock=self.clock_skew.now_ms if self.clock_skew is not None else None)
+        self.logger = logger.get_logger()
+        self.codec = codec or get_codec()
+        self.retry_policy = retry_policy or RetryPolicy()
+        # 为 True 时请求最终失败抛出异常，否则记录日志并返回 {}
+        self.raise_on_error = raise_on_error
+        # 按接口路径熔断，默认使用进程内共享的熔断器；CIRCUIT_BREAKER_ENABLED=false 时关闭
+        if circuit_breakers is None and config_manager.get("breaker_enabled"):
+            circuit_breakers = get_default_breakers()
+        self.circuit_breakers = circuit_breakers
+        # 客户端限速，按接口路径和企业编码分别计数；未指定时按 RATE_LIMIT_RPS / RATE_LIMIT_BPS 配置
+        self.rate_limiter = rate_limiter or get_default_rate_limiter()
+        self.enterprise_code = os.getenv("ENTERPRISE_CODE", "")
+        # 任务同步发件箱，发送前落盘；未指定时按 AFLOW_OUTBOX_PATH 配置
+        self.outbox = outbox or get_default_outbox()
+        # 任务同步去重缓存，过滤重复和过期的订单状态；未指定时按 TASK_DEDUP_ENABLED 配置
+        self.dedup = dedup if dedup is not None else get_default_dedup_cache()
+        # 请求体压缩，未指定时按 REQUEST_COMPRESSION 配置
+        self.compressor = compressor or get_request_compressor()
+
+        self.limit: int = limit or config_manager.get("async_pool_limit")
+        self.limit_per_host: int = limit_per_host or self.limit
+        # gather 默认的最大并发数
+        self.max_concurrency: int = max_concurrency or self.limit
+        # 批量同步时每批的条数，以及同时在途的批次数
+        self.chunk_size: int = chunk_size or config_manager.get("sync_chunk_size")
+        self.max_workers: int = max_workers or config_manager.get("sync_max_workers")
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    async def replay_outbox(self, max_attempts: Optional[int] = None) -> Optional[Dict[str, int]]:
+        """
+        重放发件箱中尚未确认的记录，未启用发件箱时返回 None
+
+        构造函数中无法等待，异步客户端不会自动重放，启用发件箱时需要在启动后调用一次
+        """
+        if self.outbox is None:
+            return None
+        return await self.outbox.replay_async(self, max_attempts)
+
+    async def __aenter__(self) -> "AsyncAFlowClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """懒加载Session，保证在运行中的事件循环内创建"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                force_close=not config_manager.get("keep_alive"),
+            )
+            timeout = aiohttp.ClientTimeout(
+                connect=config_manager.get("connect_timeout"),
+                sock_read=config_manager.get("timeout"),
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    def _timeout_within(self, budget: Optional[float]) -> Optional["aiohttp.ClientTimeout"]:
+        """在 Session 的超时设置（connect / sock_read）基础上，将 total 限制在剩余的时间预算内"""
+        if budget is None:
+            return None
+        timeout = self._get_session().timeout
+        total = budget if timeout.total is None else min(timeout.total, budget)
+        return aiohttp.ClientTimeout(total=total, connect=timeout.connect,
+                                     sock_read=timeout.sock_read, sock_connect=timeout.sock_connect)
+
+    async def close(self):
+        """关闭连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def gather(self, *aws: Awaitable, concurrency: Optional[int] = None,
+                     return_exceptions: bool = False) -> List[Any]:
+        """
+        限制并发数的 asyncio.gather，结果顺序与入参一致
+
+        Args:
+            aws: 待执行的协程，例如 client.sync_task(req)
+            concurrency: 同时执行的最大数量，默认使用 max_concurrency
+            return_exceptions: 同 asyncio.gather
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.max_concurrency)
+
+        async def _run(aw: Awaitable):
+            async with semaphore:
+                return await aw
+
+        return await asyncio.gather(*(_run(aw) for aw in aws), return_exceptions=return_exceptions)
+
+    async def _post(self, url: str, body: bytes, budget: Optional[float]) -> dict:
+        """
+        单次尝试：先经过客户端限速，再经过接口对应的熔断器
+
+        熔断打开时抛出 CircuitOpenError，不再重试
+        """
+        endpoint = urlparse(url).path
+        on_compressed = None
+        if self.rate_limiter is not None:
+            # 压缩发送时字节数按压缩后的大小在发送完成后扣减
+            if self.compressor is not None and self.compressor.should_compress(body):
+                await self.rate_limiter.acquire_async(endpoint, self.enterprise_code, 0)
+                on_compressed = partial(self.rate_limiter.charge, endpoint, self.enterprise_code)
+            else:
+                await self.rate_limiter.acquire_async(endpoint, self.enterprise_code, len(body))
+        if self.circuit_breakers is None:
+            return await self._send(url, body, budget, on_compressed=on_compressed)
+        breaker = self.circuit_breakers.get(endpoint)
+        breaker.allow()
+        start = time.perf_counter()
+        try:
+            result = await self._send(url, body, budget, on_compressed=on_compressed)
+        except Exception as e:
+            # 只有服务端异常（网络错误、超时、429/5xx）计为失败，参数错误等不影响熔断
+            breaker.record(not self.retry_policy.is_retryable(e), time.perf_counter() - start)
+            raise
+        breaker.record(True, time.perf_counter() - start)
+        return result
+
+    async def _send(self, url: str, body: bytes, budget: Optional[float], resign: bool = True,
+                    on_compressed: Optional[Callable[[int], None]] = None) -> dict:
+        """
+        发送一次请求，每次尝试重新签名；非200状态码抛出 AFlowRequestError 交给重试策略判断；
+        请求体压缩发送时，on_compressed 以压缩后的字节数回调
+
+        与 AFlowClient 相同，签名因时钟偏差过期（401 且偏差的估计明显变化）时重新签名并立即重发一次
+        """
+        offset = self.clock_skew.offset if self.clock_skew is not None else 0.0
+        headers = {
+            "Content-Type": "application/json",
+            "X-A-Signature": self.sig_generator.create_signature(body)
+        }
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Headers: {headers}")
+            self.logger.debug(f"Payload: {body.decode('utf-8')}")
+        data = body
+        if self.compressor is not None and self.compressor.should_compress(body):
+            # 签名按未压缩的请求体计算
+            data = self.compressor.stream_async(body, on_compressed)
+            headers.update(self.compressor.headers)
+        timeout = self._timeout_within(budget)
+        sent_at = time.time()
+        async with self._get_session().post(url, data=data, headers=headers, timeout=timeout) as response:
+            resend = False
+            if self.clock_skew is not None:
+                self.clock_skew.observe(response.headers.get("Date"), sent_at, time.time())
+                resend = response.status == 401 and resign and self.clock_skew.shifted(offset)
+            if resend:
+                self.logger.info(f"签名时间戳已按服务端时钟校正（偏差 {self.clock_skew.offset:.1f} 秒），重新签名后重发")
+            elif response.status != 200:
+                raise AFlowRequestError(response.status, await response.text(),
+                                        parse_retry_after(response.headers.get("Retry-After")))
+            else:
+                return self.codec.loads(await response.read())
+        return await self._send(url, body, budget, resign=False, on_compressed=on_compressed)
+
+    async def _make_request(self, url: str, payload: Union[dict, BaseModel],
+                            model: Optional[Type[BaseModel]] = None) -> AFlowResponse:
+        """
+        通用请求方法，处理签名、发送请求和重试
+
+        请求体只序列化一次，签名与发送使用同一份bytes；返回的 data 在访问时按 model 解析；
+        最终失败时返回内容为 {}、带 error 的 AFlowResponse，raise_on_error=True 时抛出异常
+        """
+        body = self.codec.dumps(payload)
+        start = time.perf_counter()
+        try:
+            result = await self.retry_policy.call_async(lambda budget: self._post(url, body, budget))
+        except Exception as e:
+            if self.raise_on_error:
+                raise
+            self.logger.error(f"请求失败！错误信息: {e}")
+            return AFlowResponse(model=model, elapsed_ms=round((time.perf_counter() - start) * 1000, 2), error=e)
+        return AFlowResponse(result, model, round((time.perf_counter() - start) * 1000, 2))
+
+    async def _send_chunk(self, url: str, key: str, index: int, chunk: list,
+                          on_chunk: Optional[ChunkCallback] = None) -> ChunkReport:
+        """发送单个批次并记录耗时，on_chunk 在批次完成后回调"""
+        start = time.perf_counter()
+        response = await self._make_request(url, {key: chunk}, SyncResult)
+        report = ChunkReport(
+            index=index,
+            size=len(chunk),
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+            success=response.get("status") == 0,
+            result=parse_sync_result(response),
+        )
+        self.logger.debug(f"批次 {index} 同步完成，条数: {report.size}，耗时: {report.elapsed_ms}ms，成功: {report.success}")
+        if on_chunk is not None:
+            on_chunk(report, chunk)
+        return report
+
+    async def _sync_in_chunks(self, url: str, key: str, items: list,
+                              chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                              retry_failed: Optional[int] = None, retry_delay: Optional[float] = None,
+                              on_chunk: Optional[ChunkCallback] = None) -> SyncOutcome:
+        """
+        超过 chunk_size 时自动分批并发发送，最终合并为一个结果
+
+        与 AFlowClient 相同，failed_items 为失败并能映射回原始数据的数据，retry_failed 大于0时只重发失败的数据
+        """
+        chunk_size = chunk_size or self.chunk_size
+        collector = FailureCollector(SYNC_KEY_FIELDS[key])
+
+        def record(report: ChunkReport, chunk: list):
+            collector(report, chunk)
+            if on_chunk is not None:
+                on_chunk(report, chunk)
+
+        if len(items) <= chunk_size:
+            start = time.perf_counter()
+            response = await self._make_request(url, {key: items}, SyncResult)
+            record(ChunkReport(index=0, size=len(items), elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+                               success=response.get("status") == 0, result=parse_sync_result(response)), items)
+            outcome = SyncOutcome(response, collector.failed, collector.unmapped)
+        else:
+            reports = await self.gather(
+                *(self._send_chunk(url, key, index, chunk, record)
+                  for index, chunk in enumerate(chunked(items, chunk_size))),
+                concurrency=max_workers or self.max_workers,
+            )
+            outcome = SyncOutcome(merge_sync_results(reports), collector.failed, collector.unmapped)
+        return await self._resubmit_failed(url, key, outcome, retry_failed, retry_delay, chunk_size, max_workers,
+                                           on_chunk)
+
+    async def _resubmit_failed(self, url: str, key: str, outcome: SyncOutcome, retry_failed: Optional[int],
+                               retry_delay: Optional[float], chunk_size: int, max_workers: Optional[int],
+                               on_chunk: Optional[ChunkCallback] = None) -> SyncOutcome:
+        """只重发失败的数据，最多 retry_failed 轮，每轮之前等待 retry_delay 秒，结果合并方式见 merge_retry_outcome"""
+        retry_failed = config_manager.get("sync_retry_failed") if retry_failed is None else retry_failed
+        retry_delay = config_manager.get("sync_retry_delay") if retry_delay is None else retry_delay
+        while outcome.failed_items and outcome.attempts <= retry_failed:
+            items = items_to_resend(outcome)
+            self.logger.info(f"{retry_delay}s 后重发失败的数据，共 {len(items)} 条，第 {outcome.attempts} 轮")
+            await asyncio.sleep(retry_delay)
+            retry = await self._sync_in_chunks(url, key, items, chunk_size, max_workers, retry_failed=0,
+                                               on_chunk=retry_callback(on_chunk, outcome.attempts + 1))
+            outcome = merge_retry_outcome(outcome, retry, len(items))
+        return outcome
+
+    async def sync_department(self, departments: List[DepartmentSyncItem],
+                              chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                              retry_failed: Optional[int] = None, retry_delay: Optional[float] = None) -> SyncOutcome:
+        """
+        同步部门信息，数据量超过 chunk_size 时自动分批并发发送
+
+        retry_failed（默认读取 SYNC_RETRY_FAILED）大于0时，等待 retry_delay 秒后只重发失败的部门
+        """
+        url = f"{self.base_url}/aflow/api/sys/sync/department"
+        return await self._sync_in_chunks(url, "departments", departments, chunk_size, max_workers,
+                                          retry_failed, retry_delay)
+
+    async def sync_user(self, users: List[UserSyncItem],
+                        chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                        retry_failed: Optional[int] = None, retry_delay: Optional[float] = None) -> SyncOutcome:
+        """
+        同步用户信息，数据量超过 chunk_size 时自动分批并发发送
+
+        retry_failed（默认读取 SYNC_RETRY_FAILED）大于0时，等待 retry_delay 秒后只重发失败的用户
+        """
+        url = f"{self.base_url}/aflow/api/sys/sync/user"
+        return await self._sync_in_chunks(url, "users", users, chunk_size, max_workers, retry_failed, retry_delay)
+
+    async def bind_user(self, bind_user_req: BindUserReq) -> AFlowResponse:
+        """绑定用户"""
+        url = f"{self.base_url}/aflow/api/auth/bind"
+        return await self._make_request(url, bind_user_req)
+
+    async def create_third_party(self, flow_data: ThirdPartyFlowCreateReq) -> AFlowResponse[ThirdPartyFlowBase]:
+        """创建第三方流程，data 按 ThirdPartyFlowBase 解析"""
+        url = f"{self.base_url}/aflow/api/flow/create_third_party"
+        return await self._make_request(url, flow_data, ThirdPartyFlowBase)
+
+    async def online_third_party(self, flow_data: ThirdPartyFlowOnlineReq) -> AFlowResponse:
+        """上线第三方流程"""
+        url = f"{self.base_url}/aflow/api/flow/online_third_party"
+        return await self._make_request(url, flow_data)
+
+    async def _send_task(self, task_data: ThirdPartyTaskSyncReq) -> AFlowResponse:
+        """发送一次任务同步，去重缓存判定为重复或过期时不发送，直接返回成功"""
+        reason = self.dedup.admit(task_data) if self.dedup is not None else None
+        if reason is not None:
+            self.logger.debug(f"跳过任务同步，订单: {task_data.third_order_id}，原因: {reason}")
+            return AFlowResponse({"status": 0, "msg": f"skipped: {reason}", "data": None, "skipped": reason})
+        response = await self._make_request(f"{self.base_url}/aflow/api/order/sync/task", task_data)
+        # 服务端确认成功后才登记，失败的数据下次可以重发
+        if self.dedup is not None and response.get("status") == 0:
+            self.dedup.record(task_data)
+        return response
+
+    async def sync_task(self, task_data: ThirdPartyTaskSyncReq) -> AFlowResponse:
+        """同步任务信息，启用发件箱时先落盘（在线程池中等待，不阻塞事件循环），服务端确认成功后再标记完成"""
+        if self.outbox is None:
+            return await self._send_task(task_data)
+        entry_id = await asyncio.get_running_loop().run_in_executor(None, self.outbox.append, task_data)
+        response = await self._send_task(task_data)
+        if response.get("status") == 0:
+            self.outbox.mark_done([entry_id])
+        return response
@@ -0,0 +1,318 @@
+# Chunking helpers for bulk sync requests
+
+import os
+import re
+import threading
+from concurrent.futures import Executor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, asdict
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar, Union
+
+from pydantic import ValidationError
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .response import AFlowResponse
+    from ..models import SyncResult, SyncFailDetail
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.response import AFlowResponse
+    from aflow_client_python.models import SyncResult, SyncFailDetail
+
+T = TypeVar("T")
+
+# 整批请求失败时，写入 failDetails 的错误代码
+CHUNK_FAILED_CODE = "CHUNK_FAILED"
+# 本地数据校验失败时，写入 failDetails 的错误代码
+INVALID_ITEM_CODE = "INVALID_ITEM"
+
+
+@dataclass
+class ChunkReport:
+    """单个批次的执行情况"""
+
+    index: int  # 批次序号，从0开始
+    size: int  # 批次内的数据条数
+    elapsed_ms: float  # 请求耗时（毫秒）
+    success: bool  # 服务端是否返回 status == 0
+    result: Optional[SyncResult] = None  # 服务端返回的同步结果
+    attempt: int = 1  # 发送轮数，只重发失败数据的批次从2开始
+
+    def to_dict(self) -> dict:
+        report = asdict(self)
+        report.pop("result")
+        return report
+
+
+# 批次完成回调: (批次执行情况, 批次内的数据)
+ChunkCallback = Callable[[ChunkReport, list], None]
+
+# 批量同步接口的列表字段 -> 数据主键字段，用于将 failDetails 映射回原始数据
+SYNC_KEY_FIELDS = {"users": "user_id", "departments": "dept_id"}
+
+# 从 failDetails 的 message / code 中拆分出可能是数据主键的片段
+_TOKEN_SPLIT = re.compile(r"[\s,;:，；：、()（）\[\]{}<>\"'=]+")
+
+
+@dataclass
+class FailedItem:
+    """同步失败的数据及对应的失败详情"""
+
+    item: Any  # 原始数据（UserSyncItem / DepartmentSyncItem 等）
+    detail: SyncFailDetail
+
+
+class FailureCollector:
+    """
+    作为 on_chunk 回调收集失败的数据
+
+    - 整批请求失败：批次内全部数据记为失败
+    - 服务端返回 failDetails：按主键（key_field）精确匹配批次内的数据，依次取失败详情中的主键字段
+      （如 userId / deptId）、code、message 开头的第一段；不在 message 中搜索，避免把失败归到消息里提到的其他数据
+      （例如上级部门）上，无法映射的失败详情记入 unmapped
+    """
+
+    def __init__(self, key_field: str):
+        self.key_field = key_field
+        self.failed: List[FailedItem] = []
+        self.unmapped: List[SyncFailDetail] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, report: ChunkReport, items: list):
+        failed: List[FailedItem] = []
+        unmapped: List[SyncFailDetail] = []
+        if report.result is None:
+            if not report.success:
+                detail = SyncFailDetail(code=CHUNK_FAILED_CODE, message=f"第{report.index}批次请求失败，共{report.size}条")
+                failed = [FailedItem(item, detail) for item in items]
+        elif report.result.fail_details:
+            by_key: Dict[str, Any] = {}
+            alias = None
+            for item in items:
+                key = getattr(item, self.key_field, None)
+                if key is not None:
+                    by_key[str(key)] = item
+                    alias = alias or _field_alias(item, self.key_field)
+            for detail in report.result.fail_details:
+                key = next((candidate for candidate in self._candidate_keys(detail, alias) if candidate in by_key), None)
+                if key is not None:
+                    failed.append(FailedItem(by_key[key], detail))
+                else:
+                    unmapped.append(detail)
+        if failed or unmapped:
+            with self._lock:
+                self.failed.extend(failed)
+                self.unmapped.extend(unmapped)
+
+
+    def _candidate_keys(self, detail: SyncFailDetail, alias: Optional[str]) -> Iterator[str]:
+        """失败详情中可能是主键的值，按可信程度排列"""
+        extra = detail.model_extra or {}
+        for name in (alias, self.key_field):
+            if name and extra.get(name) is not None:
+                yield str(extra[name])
+        yield detail.code
+        yield _TOKEN_SPLIT.split(detail.message.strip(), maxsplit=1)[0]
+
+
+def _field_alias(item: Any, field_name: str) -> Optional[str]:
+    fields = getattr(type(item), "model_fields", {})
+    return fields[field_name].alias if field_name in fields else None
+
+
+class SyncOutcome(AFlowResponse[SyncResult]):
+    """
+    批量同步的返回值，保持与原来的 dict 结构兼容（status、msg、data、chunks 等），data 按 SyncResult 解析，另外提供：
+
+    - failed_items: 失败并能映射回原始数据的 FailedItem 列表
+    - unmapped: 无法映射回原始数据的失败详情
+    - attempts: 发送轮数（含失败重发）
+    """
+
+    def __init__(self, response: dict, failed_items: Optional[List[FailedItem]] = None,
+                 unmapped: Optional[List[SyncFailDetail]] = None, attempts: int = 1):
+        super().__init__(response, SyncResult, getattr(response, "elapsed_ms", None), getattr(response, "error", None))
+        self.failed_items: List[FailedItem] = failed_items or []
+        self.unmapped: List[SyncFailDetail] = unmapped or []
+        self.attempts = attempts
+
+    @property
+    def result(self) -> Optional[SyncResult]:
+        """同 data"""
+        return self.data
+
+    @property
+    def succeeded(self) -> bool:
+        """请求全部成功且没有失败的数据"""
+        result = self.result
+        return self.get("status") == 0 and (result is None or result.fail_count == 0)
+
+
+def chunked(items: Iterable[T], size: Union[int, Callable[[], int]]) -> Iterator[List[T]]:
+    """按固定大小切分，最后一批可能不足 size 条；size 为函数时每切一批之前重新读取（自适应批次）"""
+    next_size = size if callable(size) else lambda: size
+    iterator = iter(items)
+    while True:
+        current = next_size()
+        if current <= 0:
+            raise ValueError(f"chunk size 必须大于0: {current}")
+        chunk = list(islice(iterator, current))
+        if not chunk:
+            return
+        yield chunk
+
+
+def dispatch_bounded(
+        executor: Executor,
+        windows: Iterable[Tuple[int, list]],
+        send: Callable[[int, list], ChunkReport],
+        max_in_flight: Union[int, Callable[[], int]],
+) -> List[ChunkReport]:
+    """
+    将批次提交到线程池，在途批次达到 max_in_flight 时暂停读取 windows
+
+    windows 可以是惰性生成器，内存占用只与 max_in_flight * 批次大小 相关；
+    max_in_flight 为函数时每次提交前重新读取（自适应并发），线程池大小需要不小于它的最大值
+    """
+    limit = max_in_flight if callable(max_in_flight) else lambda: max_in_flight
+    reports: List[ChunkReport] = []
+    in_flight: Set[Future] = set()
+    for index, window in windows:
+        while in_flight and len(in_flight) >= limit():
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            reports.extend(future.result() for future in done)
+        in_flight.add(executor.submit(send, index, window))
+    done, _ = wait(in_flight)
+    reports.extend(future.result() for future in done)
+    return reports
+
+
+def parse_sync_result(response: dict) -> Optional[SyncResult]:
+    """从接口返回中解析 SyncResult，返回格式不符时为 None；按 SyncResult 解析的 AFlowResponse 直接使用缓存的结果"""
+    if isinstance(response, AFlowResponse) and response.model is SyncResult:
+        return response.data
+    data = response.get("data") if isinstance(response, dict) else None
+    if not isinstance(data, dict):
+        return None
+    try:
+        return SyncResult.model_validate(data)
+    except ValidationError:
+        return None
+
+
+def combine_chunk_reports(index: int, pieces: List[ChunkReport]) -> ChunkReport:
+    """将拆分后分别发送的各部分合并为一个批次的执行情况，整体失败的部分按条数计入 failCount"""
+    if len(pieces) == 1:
+        return pieces[0]
+    success_count = 0
+    fail_count = 0
+    fail_details: List[SyncFailDetail] = []
+    for piece in pieces:
+        if piece.result is not None:
+            success_count += piece.result.success_count
+            fail_count += piece.result.fail_count
+            fail_details.extend(piece.result.fail_details)
+        elif piece.success:
+            success_count += piece.size
+        else:
+            fail_count += piece.size
+            fail_details.append(SyncFailDetail(
+                code=CHUNK_FAILED_CODE,
+                message=f"第{index}批次拆分后的部分请求失败，共{piece.size}条",
+            ))
+    return ChunkReport(
+        index=index,
+        size=sum(piece.size for piece in pieces),
+        elapsed_ms=round(sum(piece.elapsed_ms for piece in pieces), 2),
+        success=all(piece.success for piece in pieces),
+        result=SyncResult(success_count=success_count, fail_count=fail_count, fail_details=fail_details),
+    )
+
+
+def _merged_status(requests_succeeded: bool, fail_count: int) -> dict:
+    """合并结果的 status / msg：请求失败或存在失败的数据（含本地校验失败）时 status 为 -1"""
+    if not requests_succeeded:
+        return {"status": -1, "msg": "部分批次请求失败"}
+    if fail_count:
+        return {"status": -1, "msg": f"{fail_count} 条数据同步失败"}
+    return {"status": 0, "msg": "success"}
+
+
+def merge_sync_results(reports: List[ChunkReport], rejected: Optional[List[SyncFailDetail]] = None) -> dict:
+    """
+    合并各批次结果，返回与单次请求相同结构的数据，并附带每个批次的执行情况
+
+    请求整体失败的批次，按批次内条数计入 failCount；rejected 为本地校验未通过、未发送的数据；
+    只有全部请求成功且 failCount 为 0 时 status 为 0
+    """
+    success_count = 0
+    fail_count = len(rejected or [])
+    fail_details: List[SyncFailDetail] = list(rejected or [])
+    for report in sorted(reports, key=lambda r: r.index):
+        if report.result is not None:
+            success_count += report.result.success_count
+            fail_count += report.result.fail_count
+            fail_details.extend(report.result.fail_details)
+        elif not report.success:
+            fail_count += report.size
+            fail_details.append(SyncFailDetail(
+                code=CHUNK_FAILED_CODE,
+                message=f"第{report.index}批次请求失败，共{report.size}条",
+            ))
+
+    merged = SyncResult(success_count=success_count, fail_count=fail_count, fail_details=fail_details)
+    return {
+        **_merged_status(all(report.success for report in reports), fail_count),
+        "data": merged.model_dump(by_alias=True),
+        "chunks": [report.to_dict() for report in sorted(reports, key=lambda r: r.index)],
+    }
+
+
+def retry_callback(on_chunk: Optional[ChunkCallback], attempt: int) -> Optional[ChunkCallback]:
+    """重发的批次回调前标记发送轮数，调用方据此区分首次发送和重发"""
+    if on_chunk is None:
+        return None
+
+    def callback(report: ChunkReport, items: list):
+        report.attempt = attempt
+        on_chunk(report, items)
+
+    return callback
+
+
+def items_to_resend(outcome: SyncOutcome) -> list:
+    """失败并能映射回原始数据的数据；同一条数据可能对应多条失败详情，只发送一次"""
+    return list({id(failed.item): failed.item for failed in outcome.failed_items}.values())
+
+
+def merge_retry_outcome(outcome: SyncOutcome, retry: SyncOutcome, size: int) -> SyncOutcome:
+    """
+    将一轮重发（size 条）的结果合并到上一轮结果中
+
+    合并后的 successCount / failCount 为最终结果；本地校验失败和无法映射回原始数据的失败详情保留，
+    重发数据的失败详情替换为本轮的结果，每轮的情况记录在 retries 中
+    """
+    previous, current = outcome.result, retry.result
+    retry_success = current.success_count if current else 0
+    retry_fail = current.fail_count if current else size
+    success_count = (previous.success_count if previous else 0) + retry_success
+    fail_count = max(0, (previous.fail_count if previous else size) - size) + retry_fail
+    kept = [d for d in (previous.fail_details if previous else []) if d.code == INVALID_ITEM_CODE]
+    details = kept + outcome.unmapped + (current.fail_details if current else [])
+
+    response = dict(outcome)
+    # 分批重发时以各批次的请求结果为准，retry 的 status 已经包含数据失败
+    chunks = retry.get("chunks")
+    requests_succeeded = all(chunk["success"] for chunk in chunks) if chunks is not None else retry.get("status") == 0
+    response.update(_merged_status(requests_succeeded, fail_count))
+    response["data"] = SyncResult(success_count=success_count, fail_count=fail_count,
+                                  fail_details=details).model_dump(by_alias=True)
+    response["retries"] = outcome.get("retries", []) + [
+        {"attempt": outcome.attempts, "size": size, "successCount": retry_success, "failCount": retry_fail}
+    ]
+    return SyncOutcome(response, retry.failed_items, outcome.unmapped + retry.unmapped,
+                       attempts=outcome.attempts + 1)
@@ -0,0 +1,190 @@
+# Circuit breakers keyed per AFlow endpoint
+
+import os
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .config import config_manager
+    from .exceptions import CircuitOpenError
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.core.exceptions import CircuitOpenError
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+# 状态变化回调: (熔断器名称, 原状态, 新状态)
+StateChangeCallback = Callable[[str, "CircuitState", "CircuitState"], None]
+
+
+class CircuitState(Enum):
+    """熔断器状态"""
+
+    CLOSED = "CLOSED"  # 正常放行
+    OPEN = "OPEN"  # 直接拒绝
+    HALF_OPEN = "HALF_OPEN"  # 放行少量试探请求
+
+
+class CircuitBreaker:
+    """
+    基于滑动窗口（按调用次数）的熔断器
+
+    - CLOSED: 窗口内调用数达到 minimum_calls 后，失败率或慢调用率超过阈值则打开
+    - OPEN: 拒绝所有请求，open_duration 秒后进入半开
+    - HALF_OPEN: 最多放行 half_open_max_calls 个试探请求，全部成功则关闭，任一失败重新打开
+    """
+
+    def __init__(
+            self,
+            name: str,
+            failure_rate_threshold: Optional[float] = None,
+            slow_call_rate_threshold: Optional[float] = None,
+            slow_call_duration: Optional[float] = None,
+            window_size: Optional[int] = None,
+            minimum_calls: Optional[int] = None,
+            open_duration: Optional[float] = None,
+            half_open_max_calls: Optional[int] = None,
+            on_state_change: Optional[StateChangeCallback] = None,
+    ):
+        self.name = name
+        self.failure_rate_threshold: float = failure_rate_threshold or config_manager.get("breaker_failure_rate")
+        self.slow_call_rate_threshold: float = slow_call_rate_threshold or config_manager.get("breaker_slow_call_rate")
+        self.slow_call_duration: float = slow_call_duration or config_manager.get("breaker_slow_call_duration")
+        self.window_size: int = window_size or config_manager.get("breaker_window_size")
+        self.minimum_calls: int = min(minimum_calls or config_manager.get("breaker_minimum_calls"), self.window_size)
+        self.open_duration: float = open_duration or config_manager.get("breaker_open_duration")
+        self.half_open_max_calls: int = half_open_max_calls or config_manager.get("breaker_half_open_calls")
+        self.on_state_change = on_state_change
+
+        # 回调中可能再次读取状态，使用可重入锁
+        self._lock = threading.RLock()
+        self._state = CircuitState.CLOSED
+        # 窗口内每次调用的 (是否失败, 是否慢调用)
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=self.window_size)
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _transition(self, new_state: CircuitState):
+        """切换状态，调用方需持有锁"""
+        old_state = self._state
+        if old_state == new_state:
+            return
+        self._state = new_state
+        self._window.clear()
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        if new_state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        logger.warning(f"熔断器 {self.name} 状态变化: {old_state.value} -> {new_state.value}")
+        if self.on_state_change is not None:
+            try:
+                self.on_state_change(self.name, old_state, new_state)
+            except Exception as e:
+                logger.error(f"熔断器状态回调执行失败: {e}")
+
+    def _maybe_half_open(self):
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.open_duration:
+            self._transition(CircuitState.HALF_OPEN)
+
+    def allow(self):
+        """
+        申请一次调用许可，必须在调用结束后调用 record
+
+        Raises:
+            CircuitOpenError: 熔断器打开，或半开状态下试探请求已满
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CircuitState.CLOSED:
+                return
+            if self._state == CircuitState.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return
+            retry_after = max(0.0, self.open_duration - (time.monotonic() - self._opened_at))
+            raise CircuitOpenError(self.name, retry_after)
+
+    def record(self, success: bool, duration: float):
+        """记录一次调用结果，duration 为耗时（秒）"""
+        slow = duration >= self.slow_call_duration
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                if not success or slow:
+                    self._transition(CircuitState.OPEN)
+                    return
+                self._half_open_successes += 1
+                if self._half_open_successes >= self.half_open_max_calls:
+                    self._transition(CircuitState.CLOSED)
+                return
+            if self._state == CircuitState.OPEN:
+                # 打开前已放行的请求，结果不再计入
+                return
+
+            self._window.append((not success, slow))
+            calls = len(self._window)
+            if calls < self.minimum_calls:
+                return
+            failure_rate = sum(1 for failed, _ in self._window if failed) / calls
+            slow_rate = sum(1 for _, is_slow in self._window if is_slow) / calls
+            if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                self._transition(CircuitState.OPEN)
+
+
+class CircuitBreakerRegistry:
+    """按名称（接口路径）管理熔断器，首次使用时按默认参数创建"""
+
+    def __init__(self, on_state_change: Optional[StateChangeCallback] = None, **breaker_kwargs):
+        self.on_state_change = on_state_change
+        self.breaker_kwargs = breaker_kwargs
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    breaker = CircuitBreaker(name, on_state_change=self._notify, **self.breaker_kwargs)
+                    self._breakers[name] = breaker
+        return breaker
+
+    def _notify(self, name: str, old_state: CircuitState, new_state: CircuitState):
+        if self.on_state_change is not None:
+            self.on_state_change(name, old_state, new_state)
+
+    def states(self) -> Dict[str, CircuitState]:
+        """所有熔断器的当前状态"""
+        return {name: breaker.state for name, breaker in list(self._breakers.items())}
+
+
+_default_registry: Optional[CircuitBreakerRegistry] = None
+_default_lock = threading.Lock()
+
+
+def get_default_breakers() -> CircuitBreakerRegistry:
+    """获取进程内共享的熔断器，保证每次新建 AFlowClient 时熔断状态不丢失"""
+    global _default_registry
+    if _default_registry is None:
+        with _default_lock:
+            if _default_registry is None:
+                _default_registry = CircuitBreakerRegistry()
+    return _default_registry
@@ -0,0 +1,111 @@
+# Chunk-level checkpoints for resumable sync jobs
+
+import json
+import os
+import threading
+import time
+from typing import Dict
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .batch import ChunkReport
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.batch import ChunkReport
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+# 批次状态
+DONE = "done"
+FAILED = "failed"
+
+
+class SyncCheckpoint:
+    """
+    同步任务的断点文件，记录每个批次的状态和数据源偏移量
+
+    - 服务端确认（status == 0）的批次记为 done，续传时不再发送，也不再校验
+    - offset 为从头开始连续 done 的批次覆盖的数据源条数，数据源支持按偏移读取时（例如数据库分页）可以直接跳过；
+      这部分批次只记录数量（acked），不再逐个保存，断点文件大小与数据总量无关
+    - 续传要求数据源顺序和 chunk_size 与上次一致，chunk_size 或数据类型不一致时抛出 ValueError
+    - 全部批次成功后删除断点文件
+
+    用法:
+        client.sync_user(users, checkpoint="users.checkpoint.json")
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state: dict = {"key": None, "chunk_size": None, "acked": 0, "offset": 0, "chunks": {}}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+            logger.info(f"加载断点文件 {path}，已完成 {self.done_count} 个批次，偏移量 {self.offset}")
+
+    @property
+    def chunks(self) -> Dict[str, dict]:
+        return self.state["chunks"]
+
+    @property
+    def offset(self) -> int:
+        return self.state["offset"]
+
+    @property
+    def done_count(self) -> int:
+        return self.state["acked"] + sum(1 for chunk in self.chunks.values() if chunk["status"] == DONE)
+
+    def bind(self, key: str, chunk_size: int):
+        """绑定到一次同步任务，与已有断点的数据类型或 chunk_size 不一致时抛出 ValueError"""
+        with self._lock:
+            if self.state["key"] is None:
+                self.state["key"] = key
+                self.state["chunk_size"] = chunk_size
+                return
+            if self.state["key"] != key or self.state["chunk_size"] != chunk_size:
+                raise ValueError(
+                    f"断点文件 {self.path} 记录的是 {self.state['key']}（chunk_size={self.state['chunk_size']}），"
+                    f"与本次同步 {key}（chunk_size={chunk_size}）不一致"
+                )
+
+    def is_done(self, index: int) -> bool:
+        if index < self.state["acked"]:
+            return True
+        chunk = self.chunks.get(str(index))
+        return chunk is not None and chunk["status"] == DONE
+
+    def record(self, report: ChunkReport):
+        """记录批次结果并写入文件"""
+        chunk = {"status": DONE if report.success else FAILED, "size": report.size}
+        if report.result is not None:
+            chunk["successCount"] = report.result.success_count
+            chunk["failCount"] = report.result.fail_count
+        with self._lock:
+            self.chunks[str(report.index)] = chunk
+            acked = self.state["acked"]
+            while self.is_done(acked):
+                self.chunks.pop(str(acked), None)
+                acked += 1
+            self.state["acked"] = acked
+            self.state["offset"] = acked * self.state["chunk_size"]
+            self.state["updated_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            self._save()
+
+    def clear(self):
+        """同步全部完成后删除断点文件"""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _save(self):
+        """先写临时文件再替换，进程中断时不会留下半个文件"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -1,9 +1,15 @@
 import os
 # os.environ["LOG_LEVEL"] = "DEBUG"
 
-import requests
-import json
-from typing import List
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
 
 # 尝试相对导入，如果失败则使用绝对导入
 try:
@@ -24,6 +30,37 @@ try:
     )
     from ..utils import logger
     from ..utils.sign import ASignature
+    from ..utils.codec import JsonCodec, get_codec
+    from .transport import HttpTransport, get_default_transport
+    from .config import config_manager
+    from .exceptions import AFlowRequestError, CircuitOpenError, DeadlineExceededError, DepartmentTopologyError
+    from .topology import PARENT_FAILED_CODE, DepartmentTree
+    from .retry import RetryPolicy, parse_retry_after
+    from .breaker import CircuitBreakerRegistry, get_default_breakers
+    from .ratelimit import RateLimiter, get_default_rate_limiter
+    from .outbox import TaskOutbox, get_default_outbox
+    from .dedup import TaskSyncDedupCache, get_default_dedup_cache
+    from .checkpoint import SyncCheckpoint
+    from .adaptive import AdaptiveBatchController
+    from .response import AFlowResponse
+    from .clock import ClockSkewEstimator, get_default_clock_skew
+    from .batch import (
+        ChunkReport,
+        ChunkCallback,
+        FailedItem,
+        FailureCollector,
+        INVALID_ITEM_CODE,
+        SYNC_KEY_FIELDS,
+        SyncOutcome,
+        chunked,
+        combine_chunk_reports,
+        dispatch_bounded,
+        items_to_resend,
+        merge_retry_outcome,
+        parse_sync_result,
+        merge_sync_results,
+        retry_callback,
+    )
 except ImportError:
     import sys
     import os
@@ -48,68 +85,604 @@ except ImportError:
     )
     from aflow_client_python.utils import logger
     from aflow_client_python.utils.sign import ASignature
+    from aflow_client_python.utils.codec import JsonCodec, get_codec
+    from aflow_client_python.core.transport import HttpTransport, get_default_transport
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.core.exceptions import (
+        AFlowRequestError, CircuitOpenError, DeadlineExceededError, DepartmentTopologyError,
+    )
+    from aflow_client_python.core.topology import PARENT_FAILED_CODE, DepartmentTree
+    from aflow_client_python.core.retry import RetryPolicy, parse_retry_after
+    from aflow_client_python.core.breaker import CircuitBreakerRegistry, get_default_breakers
+    from aflow_client_python.core.ratelimit import RateLimiter, get_default_rate_limiter
+    from aflow_client_python.core.outbox import TaskOutbox, get_default_outbox
+    from aflow_client_python.core.dedup import TaskSyncDedupCache, get_default_dedup_cache
+    from aflow_client_python.core.checkpoint import SyncCheckpoint
+    from aflow_client_python.core.adaptive import AdaptiveBatchController
+    from aflow_client_python.core.response import AFlowResponse
+    from aflow_client_python.core.clock import ClockSkewEstimator, get_default_clock_skew
+    from aflow_client_python.core.batch import (
+        ChunkReport,
+        ChunkCallback,
+        FailedItem,
+        FailureCollector,
+        INVALID_ITEM_CODE,
+        SYNC_KEY_FIELDS,
+        SyncOutcome,
+        chunked,
+        combine_chunk_reports,
+        dispatch_bounded,
+        items_to_resend,
+        merge_retry_outcome,
+        parse_sync_result,
+        merge_sync_results,
+        retry_callback,
+    )
 
 
 class AFlowClient:
-    def __init__(self, base_url: str = None):
+    def __init__(
+            self,
+            base_url: str = None,
+            transport: Optional[HttpTransport] = None,
+            chunk_size: Optional[int] = None,
+            max_workers: Optional[int] = None,
+            codec: Optional[JsonCodec] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            raise_on_error: bool = False,
+            circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            outbox: Optional[TaskOutbox] = None,
+            dedup: Optional[TaskSyncDedupCache] = None,
+            adaptive: Optional[bool] = None,
+            clock_skew: Optional[ClockSkewEstimator] = None,
+            replay_on_start: Optional[bool] = None,
+    ):
         self.base_url = base_url or os.getenv("AIFLOW_DOMAIN", "")
-        self.sig_generator = ASignature()
+        # 按响应的 Date 头估计与服务端的时钟偏差，签名时间戳按偏差校正；未指定时按 CLOCK_SKEW_COMPENSATION 配置
+        self.clock_skew = clock_skew or get_default_clock_skew()
+        self.sig_generator = ASignature(clock=self.clock_skew.now_ms if self.clock_skew is not None else None)
         self.logger = logger.get_logger()
+        self.codec = codec or get_codec()
+        self.retry_policy = retry_policy or RetryPolicy()
+        # 为 True 时请求最终失败抛出异常，否则记录日志并返回 {}
+        self.raise_on_error = raise_on_error
+        # 按接口路径熔断，默认使用进程内共享的熔断器；CIRCUIT_BREAKER_ENABLED=false 时关闭
+        if circuit_breakers is None and config_manager.get("breaker_enabled"):
+            circuit_breakers = get_default_breakers()
+        self.circuit_breakers = circuit_breakers
+        # 客户端限速，按接口路径和企业编码分别计数；未指定时按 RATE_LIMIT_RPS / RATE_LIMIT_BPS 配置
+        self.rate_limiter = rate_limiter or get_default_rate_limiter()
+        self.enterprise_code = os.getenv("ENTERPRISE_CODE", "")
+        # 任务同步发件箱，发送前落盘；未指定时按 AFLOW_OUTBOX_PATH 配置
+        self.outbox = outbox or get_default_outbox()
+        # 任务同步去重缓存，过滤重复和过期的订单状态；未指定时按 TASK_DEDUP_ENABLED 配置
+        self.dedup = dedup if dedup is not None else get_default_dedup_cache()
+        # 默认使用进程内共享的连接池；也可以传入只实现 post(url, data, headers, timeout) 的自定义 transport
+        self.transport = transport or get_default_transport()
+        # 批量同步时每批的条数，以及并行发送的线程数
+        self.chunk_size: int = chunk_size or config_manager.get("sync_chunk_size")
+        self.max_workers: int = max_workers or config_manager.get("sync_max_workers")
+        # 批量同步未指定 chunk_size 时按耗时和错误自动调整批次大小和并发（AIMD）；未指定时按 SYNC_ADAPTIVE 配置
+        self.adaptive: bool = config_manager.get("sync_adaptive") if adaptive is None else adaptive
+        self._controllers: Dict[str, AdaptiveBatchController] = {}
+        self._controllers_lock = threading.Lock()
+        # 启用发件箱时重放上次未完成的记录（每个发件箱在进程内只重放一次）；未指定时按 AFLOW_OUTBOX_REPLAY_ON_START 配置
+        if replay_on_start is None:
+            replay_on_start = config_manager.get("outbox_replay_on_start")
+        if self.outbox is not None and replay_on_start:
+            self.outbox.replay_once(self, config_manager.get("outbox_replay_max_attempts") or None)
+
+    def replay_outbox(self, max_attempts: Optional[int] = None) -> Optional[Dict[str, int]]:
+        """
+        重放发件箱中尚未确认的记录，未启用发件箱时返回 None
+
+        创建客户端时已自动重放一次，进程运行期间可以定期调用，补发此前发送失败的记录
+        """
+        if self.outbox is None:
+            return None
+        return self.outbox.replay(self, max_attempts)
+
+    def warm_up(self, connections: Optional[int] = None) -> int:
+        """预热到AIFLOW_DOMAIN的连接，返回成功建立的连接数"""
+        return self.transport.warm_up(self.base_url or None, connections)
+
+    def probe_clock_skew(self) -> Optional[float]:
+        """发送一次 HEAD 请求估计与服务端的时钟偏差（秒），在第一次签名前校正；未启用偏差校正时返回 None"""
+        if self.clock_skew is None:
+            return None
+        return self.clock_skew.probe(self.transport, self.base_url or None)
+
+    def _will_compress(self, body: bytes) -> bool:
+        """transport 是否会压缩发送 body；自定义 transport 未实现 will_compress 时按不压缩处理"""
+        will_compress = getattr(self.transport, "will_compress", None)
+        return will_compress is not None and will_compress(body)
+
+    def _timeout_within(self, budget: Optional[float]):
+        """剩余时间预算内的超时；自定义 transport 未实现 timeout_within 时直接使用 budget（None 时由 transport 决定）"""
+        timeout_within = getattr(self.transport, "timeout_within", None)
+        return timeout_within(budget) if timeout_within is not None else budget
+
+    def _post(self, url: str, body: bytes, budget: Optional[float]) -> dict:
+        """
+        单次尝试：先经过客户端限速，再经过接口对应的熔断器
+
+        熔断打开时抛出 CircuitOpenError，不再重试
+        """
+        endpoint = urlparse(url).path
+        on_compressed = None
+        if self.rate_limiter is not None:
+            # 压缩发送时字节数按压缩后的大小在发送完成后扣减
+            if self._will_compress(body):
+                self.rate_limiter.acquire(endpoint, self.enterprise_code, 0)
+                on_compressed = partial(self.rate_limiter.charge, endpoint, self.enterprise_code)
+            else:
+                self.rate_limiter.acquire(endpoint, self.enterprise_code, len(body))
+        if self.circuit_breakers is None:
+            return self._send(url, body, budget, on_compressed=on_compressed)
+        breaker = self.circuit_breakers.get(endpoint)
+        breaker.allow()
+        start = time.perf_counter()
+        try:
+            result = self._send(url, body, budget, on_compressed=on_compressed)
+        except Exception as e:
+            # 只有服务端异常（网络错误、超时、429/5xx）计为失败，参数错误等不影响熔断
+            breaker.record(not self.retry_policy.is_retryable(e), time.perf_counter() - start)
+            raise
+        breaker.record(True, time.perf_counter() - start)
+        return result
 
-    def _make_request(self, url: str, payload: dict) -> dict:
-        """通用请求方法，处理签名和发送请求"""
+    def _send(self, url: str, body: bytes, budget: Optional[float], resign: bool = True,
+              on_compressed: Optional[Callable[[int], None]] = None) -> dict:
+        """
+        发送一次请求，每次尝试重新签名；非200状态码抛出 AFlowRequestError 交给重试策略判断；
+        请求体压缩发送时，on_compressed 以压缩后的字节数回调
+
+        返回 401 且响应的 Date 头使时钟偏差的估计明显变化时，说明签名按错误的时间生成（签名过期），
+        按校正后的时间重新签名并立即重发一次，不消耗重试次数
+        """
+        offset = self.clock_skew.offset if self.clock_skew is not None else 0.0
         headers = {
             "Content-Type": "application/json",
-            "X-A-Signature": self.sig_generator.create_signature(json.dumps(payload))
+            "X-A-Signature": self.sig_generator.create_signature(body)
         }
-        self.logger.debug(f"Headers: {headers}")  # 添加这一行用于调试
-        self.logger.debug(f"Payload: {payload}")  # 添加这一行用于调试
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Headers: {headers}")
+            self.logger.debug(f"Payload: {body.decode('utf-8')}")
+        sent_at = time.time()
+        # 只在需要时传入 on_compressed，兼容只实现了 post(url, data, headers, timeout) 的自定义 transport
+        extra = {"on_compressed": on_compressed} if on_compressed is not None else {}
+        response = self.transport.post(url, data=body, headers=headers, timeout=self._timeout_within(budget),
+                                       **extra)
+        if self.clock_skew is not None:
+            self.clock_skew.observe(response.headers.get("Date"), sent_at, time.time())
+            if response.status_code == 401 and resign and self.clock_skew.shifted(offset):
+                self.logger.info(f"签名时间戳已按服务端时钟校正（偏差 {self.clock_skew.offset:.1f} 秒），重新签名后重发")
+                return self._send(url, body, budget, resign=False, on_compressed=on_compressed)
+        if response.status_code != 200:
+            raise AFlowRequestError(response.status_code, response.text,
+                                    parse_retry_after(response.headers.get("Retry-After")))
+        return self.codec.loads(response.content)
+
+    def _make_request(self, url: str, payload: Union[dict, BaseModel], raise_on_error: Optional[bool] = None,
+                      model: Optional[Type[BaseModel]] = None) -> AFlowResponse:
+        """
+        通用请求方法，处理签名、发送请求和重试
+
+        请求体只序列化一次，签名与发送使用同一份bytes；返回的 data 在访问时按 model 解析；
+        最终失败时返回内容为 {}、带 error 的 AFlowResponse，raise_on_error=True 时抛出异常
+        （raise_on_error 未指定时使用客户端的设置）
+        """
+        body = self.codec.dumps(payload)
+        start = time.perf_counter()
         try:
-            response = requests.post(url, json=payload, headers=headers)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                self.logger.error(f"请求失败，状态码: {response.status_code}， 响应内容: {response.text}")
-                return {}
+            result = self.retry_policy.call(lambda budget: self._post(url, body, budget))
         except Exception as e:
+            if self.raise_on_error if raise_on_error is None else raise_on_error:
+                raise
             self.logger.error(f"请求失败！错误信息: {e}")
-            return {}
+            return AFlowResponse(model=model, elapsed_ms=round((time.perf_counter() - start) * 1000, 2), error=e)
+        return AFlowResponse(result, model, round((time.perf_counter() - start) * 1000, 2))
+
+    def _send_chunk(self, url: str, key: str, index: int, chunk: list,
+                    on_chunk: Optional[ChunkCallback] = None) -> ChunkReport:
+        """发送单个批次并记录耗时，on_chunk 在批次完成后（工作线程中）回调"""
+        start = time.perf_counter()
+        response = self._make_request(url, {key: chunk}, model=SyncResult)
+        report = ChunkReport(
+            index=index,
+            size=len(chunk),
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+            success=response.get("status") == 0,
+            result=parse_sync_result(response),
+        )
+        self.logger.debug(f"批次 {index} 同步完成，条数: {report.size}，耗时: {report.elapsed_ms}ms，成功: {report.success}")
+        if on_chunk is not None:
+            on_chunk(report, chunk)
+        return report
+
+    def adaptive_controller(self, key: str) -> AdaptiveBatchController:
+        """批量同步接口（users / departments）各自的自适应控制器，调整结果在同一客户端的多次同步之间保留"""
+        with self._controllers_lock:
+            if key not in self._controllers:
+                self._controllers[key] = AdaptiveBatchController(initial_size=self.chunk_size,
+                                                                 initial_in_flight=self.max_workers)
+            return self._controllers[key]
+
+    def _controller_for(self, key: str, chunk_size: Optional[int]) -> Optional[AdaptiveBatchController]:
+        """显式指定 chunk_size 时使用固定批次"""
+        if not self.adaptive or chunk_size is not None:
+            return None
+        return self.adaptive_controller(key)
+
+    def _send_adaptive_chunk(self, url: str, key: str, index: int, chunk: list,
+                             controller: AdaptiveBatchController,
+                             on_chunk: Optional[ChunkCallback] = None) -> ChunkReport:
+        """
+        发送单个批次并将耗时和错误反馈给自适应控制器
+
+        服务端返回 413 时将批次对半拆分后依次重发，直到单条数据；on_chunk 按实际发送的每一部分回调
+        """
+        pieces: List[ChunkReport] = []
+        pending = [chunk]
+        while pending:
+            piece = pending.pop(0)
+            started_at = time.monotonic()
+            try:
+                response = self._make_request(url, {key: piece}, raise_on_error=True, model=SyncResult)
+            except AFlowRequestError as e:
+                if e.status_code == 413 and len(piece) > 1:
+                    controller.on_too_large(len(piece))
+                    middle = len(piece) // 2
+                    pending[:0] = [piece[:middle], piece[middle:]]
+                    continue
+                response = self._chunk_failed(e, controller, started_at)
+            except Exception as e:
+                response = self._chunk_failed(e, controller, started_at)
+            else:
+                controller.on_success(started_at, time.monotonic() - started_at)
+            report = ChunkReport(
+                index=index,
+                size=len(piece),
+                elapsed_ms=round((time.monotonic() - started_at) * 1000, 2),
+                success=response.get("status") == 0,
+                result=parse_sync_result(response),
+            )
+            if on_chunk is not None:
+                on_chunk(report, piece)
+            pieces.append(report)
+        report = combine_chunk_reports(index, pieces)
+        self.logger.debug(f"批次 {index} 同步完成，条数: {report.size}，发送次数: {len(pieces)}，"
+                          f"耗时: {report.elapsed_ms}ms，成功: {report.success}")
+        return report
+
+    def _chunk_failed(self, error: Exception, controller: AdaptiveBatchController,
+                      started_at: float) -> AFlowResponse:
+        """服务端过载或网络原因的失败反馈给控制器；与 _make_request 一致，raise_on_error 时抛出，否则返回带 error 的空结果"""
+        if self.retry_policy.is_retryable(error) or isinstance(error, (DeadlineExceededError, CircuitOpenError)):
+            controller.on_error(started_at)
+        if self.raise_on_error:
+            raise error
+        self.logger.error(f"请求失败！错误信息: {error}")
+        return AFlowResponse(model=SyncResult, error=error)
+
+    def _sync_in_chunks(self, url: str, key: str, items: list,
+                        chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                        retry_failed: Optional[int] = None, retry_delay: Optional[float] = None,
+                        on_chunk: Optional[ChunkCallback] = None) -> SyncOutcome:
+        """
+        超过 chunk_size 时自动分批，并在线程池中并行发送，最终合并为一个结果
+
+        未超过 chunk_size 时返回内容与单次请求一致；分批时返回结构见 merge_sync_results；
+        retry_failed 大于0时只重发失败的数据，见 _resubmit_failed；启用自适应批次时批次大小和并发由控制器决定；
+        on_chunk(report, items) 在每个批次（包括重发的批次）完成后回调
+        """
+        controller = self._controller_for(key, chunk_size)
+        chunk_size = chunk_size or self.chunk_size
+        collector = FailureCollector(SYNC_KEY_FIELDS[key])
+
+        def record(report: ChunkReport, chunk: list):
+            collector(report, chunk)
+            if on_chunk is not None:
+                on_chunk(report, chunk)
 
-    def sync_department(self, departments: List[DepartmentSyncItem]) -> dict:
-        """同步部门信息"""
+        if controller is not None:
+            reports = self._dispatch(url, key, enumerate(chunked(items, lambda: controller.batch_size)),
+                                     on_chunk=record, controller=controller)
+            outcome = SyncOutcome(merge_sync_results(reports), collector.failed, collector.unmapped)
+            outcome["adaptive"] = controller.snapshot()
+        elif len(items) <= chunk_size:
+            start = time.perf_counter()
+            response = self._make_request(url, {key: items}, model=SyncResult)
+            record(ChunkReport(index=0, size=len(items), elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+                               success=response.get("status") == 0, result=parse_sync_result(response)), items)
+            outcome = SyncOutcome(response, collector.failed, collector.unmapped)
+        else:
+            reports = self._dispatch(url, key, enumerate(chunked(items, chunk_size)), max_workers,
+                                     on_chunk=record)
+            outcome = SyncOutcome(merge_sync_results(reports), collector.failed, collector.unmapped)
+        return self._resubmit_failed(url, key, outcome, retry_failed, retry_delay, chunk_size, max_workers,
+                                     on_chunk)
+
+    def _resubmit_failed(self, url: str, key: str, outcome: SyncOutcome, retry_failed: Optional[int],
+                         retry_delay: Optional[float], chunk_size: int,
+                         max_workers: Optional[int], on_chunk: Optional[ChunkCallback] = None) -> SyncOutcome:
+        """
+        只重发失败的数据，最多 retry_failed 轮，每轮之前等待 retry_delay 秒
+
+        结果合并方式见 merge_retry_outcome；重发的批次同样回调 on_chunk（report.attempt 为发送轮数），
+        增量同步等场景据此确认重发成功的数据
+        """
+        retry_failed = config_manager.get("sync_retry_failed") if retry_failed is None else retry_failed
+        retry_delay = config_manager.get("sync_retry_delay") if retry_delay is None else retry_delay
+        while outcome.failed_items and outcome.attempts <= retry_failed:
+            items = items_to_resend(outcome)
+            self.logger.info(f"{retry_delay}s 后重发失败的数据，共 {len(items)} 条，第 {outcome.attempts} 轮")
+            time.sleep(retry_delay)
+            retry = self._sync_in_chunks(url, key, items, chunk_size, max_workers, retry_failed=0,
+                                         on_chunk=retry_callback(on_chunk, outcome.attempts + 1))
+            outcome = merge_retry_outcome(outcome, retry, len(items))
+        return outcome
+
+    def _dispatch(self, url: str, key: str, windows: Iterable[Tuple[int, list]],
+                  max_workers: Optional[int] = None, max_in_flight: Optional[int] = None,
+                  on_chunk: Optional[ChunkCallback] = None,
+                  controller: Optional[AdaptiveBatchController] = None) -> List[ChunkReport]:
+        """
+        在线程池中并行发送批次，在途批次数不超过 max_in_flight（默认等于线程数）
+
+        指定 controller 时在途批次数由控制器决定，max_workers / max_in_flight 不生效
+        """
+        if controller is not None:
+            with ThreadPoolExecutor(max_workers=controller.max_in_flight) as executor:
+                return dispatch_bounded(
+                    executor,
+                    windows,
+                    lambda index, chunk: self._send_adaptive_chunk(url, key, index, chunk, controller, on_chunk),
+                    max_in_flight=lambda: controller.in_flight,
+                )
+        workers = max_workers or self.max_workers
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dispatch_bounded(
+                executor,
+                windows,
+                lambda index, chunk: self._send_chunk(url, key, index, chunk, on_chunk),
+                max_in_flight=max_in_flight or workers,
+            )
+
+    def _validated_windows(self, model_cls: Type[BaseModel], source: Iterable,
+                           chunk_size: Union[int, Callable[[], int]],
+                           rejected: List[SyncFailDetail],
+                           skip: Optional[Callable[[int], bool]] = None) -> Iterator[Tuple[int, list]]:
+        """从数据源按批次读取并校验，dict 转为对应模型，校验失败的数据记录到 rejected；skip(index) 为真的批次直接跳过"""
+        for index, window in enumerate(chunked(source, chunk_size)):
+            if skip is not None and skip(index):
+                continue
+            items = []
+            for row in window:
+                try:
+                    items.append(row if isinstance(row, model_cls) else model_cls.model_validate(row))
+                except ValidationError as e:
+                    rejected.append(SyncFailDetail(code=INVALID_ITEM_CODE, message=f"数据校验失败: {row}, {e}"))
+            if items:
+                yield index, items
+
+    def _sync_stream(self, url: str, key: str, model_cls: Type[BaseModel], source: Iterable,
+                     chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                     max_in_flight: Optional[int] = None, on_chunk: Optional[ChunkCallback] = None,
+                     checkpoint: Optional[Union[str, SyncCheckpoint]] = None,
+                     retry_failed: Optional[int] = None, retry_delay: Optional[float] = None) -> SyncOutcome:
+        """
+        流式分批同步：边读取边校验、序列化、签名、发送
+
+        在途批次达到 max_in_flight 时暂停读取数据源，内存占用与批次大小成正比，与数据总量无关；
+        on_chunk(report, items) 在每个批次完成后回调，用于增量同步等场景确认结果；
+        指定 checkpoint（断点文件路径或 SyncCheckpoint）时，跳过上次已被服务端确认的批次，全部成功后删除断点文件；
+        retry_failed 大于0时只重发失败的数据，见 _resubmit_failed；
+        启用自适应批次且未指定 chunk_size、checkpoint 时，批次大小和并发由控制器决定
+        """
+        # 断点续传按批次序号记录进度，要求批次大小固定
+        controller = self._controller_for(key, chunk_size) if checkpoint is None else None
+        chunk_size = chunk_size or self.chunk_size
+        rejected: List[SyncFailDetail] = []
+        collector = FailureCollector(SYNC_KEY_FIELDS[key])
+        if isinstance(checkpoint, str):
+            checkpoint = SyncCheckpoint(checkpoint)
+
+        def record(report: ChunkReport, items: list):
+            collector(report, items)
+            if checkpoint is not None:
+                checkpoint.record(report)
+            if on_chunk is not None:
+                on_chunk(report, items)
+
+        if checkpoint is None:
+            size = chunk_size if controller is None else lambda: controller.batch_size
+            reports = self._dispatch(url, key, self._validated_windows(model_cls, source, size, rejected),
+                                     max_workers, max_in_flight, record, controller)
+            outcome = SyncOutcome(merge_sync_results(reports, rejected), collector.failed, collector.unmapped)
+            if controller is not None:
+                outcome["adaptive"] = controller.snapshot()
+            return self._resubmit_failed(url, key, outcome, retry_failed, retry_delay, chunk_size, max_workers,
+                                         on_chunk)
+
+        checkpoint.bind(key, chunk_size)
+        skipped = checkpoint.done_count
+
+        def windows() -> Iterator[Tuple[int, list]]:
+            # 全部数据校验失败的批次不会发送，直接记为完成，保证 offset 可以继续推进
+            expected = 0
+            for index, items in self._validated_windows(model_cls, source, chunk_size, rejected,
+                                                        skip=checkpoint.is_done):
+                for empty in range(expected, index):
+                    if not checkpoint.is_done(empty):
+                        checkpoint.record(ChunkReport(index=empty, size=0, elapsed_ms=0.0, success=True))
+                expected = index + 1
+                yield index, items
+
+        reports = self._dispatch(url, key, windows(), max_workers, max_in_flight, record)
+        outcome = SyncOutcome(merge_sync_results(reports, rejected), collector.failed, collector.unmapped)
+        outcome["checkpoint"] = {"path": checkpoint.path, "skipped_chunks": skipped, "offset": checkpoint.offset}
+        # 重发的批次序号从0重新开始，不写入断点，只回调调用方的 on_chunk
+        outcome = self._resubmit_failed(url, key, outcome, retry_failed, retry_delay, chunk_size, max_workers,
+                                        on_chunk)
+        # 失败的批次重发成功后同样视为全部完成
+        if outcome["status"] == 0:
+            checkpoint.clear()
+        return outcome
+
+    def sync_department(self, departments: List[DepartmentSyncItem],
+                        chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                        checkpoint: Optional[Union[str, SyncCheckpoint]] = None,
+                        retry_failed: Optional[int] = None, retry_delay: Optional[float] = None) -> SyncOutcome:
+        """
+        同步部门信息，数据量超过 chunk_size 时自动分批并行发送；指定 checkpoint 时可以断点续传
+
+        返回值兼容原来的 dict 结构，failed_items 为失败并能映射回原始数据的部门；
+        retry_failed（默认读取 SYNC_RETRY_FAILED）大于0时，等待 retry_delay 秒后只重发失败的部门
+        """
         url = f"{self.base_url}/aflow/api/sys/sync/department"
-        payload = {"departments": [dept.model_dump(by_alias=True) for dept in departments]}
-        return self._make_request(url, payload)
+        if checkpoint is not None:
+            return self._sync_stream(url, "departments", DepartmentSyncItem, departments, chunk_size, max_workers,
+                                     checkpoint=checkpoint, retry_failed=retry_failed, retry_delay=retry_delay)
+        return self._sync_in_chunks(url, "departments", departments, chunk_size, max_workers,
+                                    retry_failed, retry_delay)
+
+    def sync_user(self, users: List[UserSyncItem],
+                  chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                  checkpoint: Optional[Union[str, SyncCheckpoint]] = None,
+                  retry_failed: Optional[int] = None, retry_delay: Optional[float] = None) -> SyncOutcome:
+        """
+        同步用户信息，数据量超过 chunk_size 时自动分批并行发送；指定 checkpoint 时可以断点续传
 
-    def sync_user(self, users: List[UserSyncItem]) -> dict:
-        """同步用户信息"""
+        返回值兼容原来的 dict 结构，failed_items 为失败并能映射回原始数据的用户；
+        retry_failed（默认读取 SYNC_RETRY_FAILED）大于0时，等待 retry_delay 秒后只重发失败的用户
+        """
         url = f"{self.base_url}/aflow/api/sys/sync/user"
-        payload = {"users": [user.model_dump(by_alias=True) for user in users]}
-        return self._make_request(url, payload)
+        if checkpoint is not None:
+            return self._sync_stream(url, "users", UserSyncItem, users, chunk_size, max_workers,
+                                     checkpoint=checkpoint, retry_failed=retry_failed, retry_delay=retry_delay)
+        return self._sync_in_chunks(url, "users", users, chunk_size, max_workers, retry_failed, retry_delay)
 
-    def bind_user(self, bind_user_req: BindUserReq) -> dict:
+    def sync_department_stream(self, departments: Iterable[Union[DepartmentSyncItem, dict]],
+                               chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                               max_in_flight: Optional[int] = None,
+                               checkpoint: Optional[Union[str, SyncCheckpoint]] = None,
+                               retry_failed: Optional[int] = None,
+                               retry_delay: Optional[float] = None) -> SyncOutcome:
+        """
+        从任意可迭代对象（生成器、数据库游标、csv.DictReader等）流式同步部门信息
+
+        dict 数据按 DepartmentSyncItem 校验（字段名或别名均可），校验失败的数据计入 failDetails；
+        指定 checkpoint 时可以断点续传，数据源顺序需要与上次一致；retry_failed 大于0时只重发失败的数据
+        """
+        url = f"{self.base_url}/aflow/api/sys/sync/department"
+        return self._sync_stream(url, "departments", DepartmentSyncItem, departments, chunk_size, max_workers, max_in_flight,
+                                 checkpoint=checkpoint, retry_failed=retry_failed, retry_delay=retry_delay)
+
+    def sync_user_stream(self, users: Iterable[Union[UserSyncItem, dict]],
+                         chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                         max_in_flight: Optional[int] = None,
+                         checkpoint: Optional[Union[str, SyncCheckpoint]] = None,
+                         retry_failed: Optional[int] = None,
+                         retry_delay: Optional[float] = None) -> SyncOutcome:
+        """
+        从任意可迭代对象（生成器、数据库游标、csv.DictReader等）流式同步用户信息
+
+        dict 数据按 UserSyncItem 校验（字段名或别名均可），校验失败的数据计入 failDetails；
+        指定 checkpoint 时可以断点续传，数据源顺序需要与上次一致；retry_failed 大于0时只重发失败的数据
+        """
+        url = f"{self.base_url}/aflow/api/sys/sync/user"
+        return self._sync_stream(url, "users", UserSyncItem, users, chunk_size, max_workers, max_in_flight,
+                                 checkpoint=checkpoint, retry_failed=retry_failed, retry_delay=retry_delay)
+
+    def sync_department_tree(self, departments: Iterable[DepartmentSyncItem],
+                             known_parent_ids: Optional[Iterable[str]] = None, strict: bool = True,
+                             chunk_size: Optional[int] = None, max_workers: Optional[int] = None) -> SyncOutcome:
+        """
+        按部门树层级同步：先同步上级，再同步下级，同一层级内分批并行发送，每层全部完成后才开始下一层
+
+        Args:
+            departments: 待同步的部门
+            known_parent_ids: 已经存在于 AFlow 中的部门ID，以这些部门为上级的部门视为根部门
+            strict: 为 True 时存在孤儿部门或循环引用直接抛出 DepartmentTopologyError，不发送任何请求；
+                    为 False 时跳过这些部门并计入 failDetails
+
+        Returns:
+            结构同 merge_sync_results，额外包含 levels（每层的部门数）；failed_items 为同步失败的部门，
+            以及因上级部门同步失败而未发送的下级部门（PARENT_SYNC_FAILED）
+        """
+        tree = DepartmentTree.build(departments, known_parent_ids)
+        if strict and not tree.valid:
+            raise DepartmentTopologyError([dept.dept_id for dept in tree.orphans + tree.blocked], tree.cycles)
+
+        url = f"{self.base_url}/aflow/api/sys/sync/department"
+        chunk_size = chunk_size or self.chunk_size
+        reports: List[ChunkReport] = []
+        collector = FailureCollector(SYNC_KEY_FIELDS["departments"])
+        # 同步失败或未发送的部门ID，其下级部门不再发送
+        failed_ids: Set[str] = set()
+        blocked: List[FailedItem] = []
+        for depth, level in enumerate(tree.levels):
+            sendable = []
+            for dept in level:
+                if dept.parent_id in failed_ids:
+                    failed_ids.add(dept.dept_id)
+                    blocked.append(FailedItem(dept, SyncFailDetail(
+                        code=PARENT_FAILED_CODE, message=f"上级部门同步失败，未发送: {dept.dept_id} -> {dept.parent_id}")))
+                else:
+                    sendable.append(dept)
+            level_reports = self._dispatch(url, "departments",
+                                           enumerate(chunked(sendable, chunk_size), start=len(reports)), max_workers,
+                                           on_chunk=collector)
+            reports.extend(level_reports)
+            failed_ids.update(failed.item.dept_id for failed in collector.failed)
+            self.logger.debug(f"第 {depth} 层部门同步完成，部门数: {len(sendable)}，批次数: {len(level_reports)}，"
+                              f"因上级失败未发送: {len(level) - len(sendable)}")
+
+        if blocked:
+            self.logger.warning(f"{len(blocked)} 个部门因上级部门同步失败未发送")
+        rejected = tree.fail_details() + [failed.detail for failed in blocked]
+        result = SyncOutcome(merge_sync_results(reports, rejected), collector.failed + blocked, collector.unmapped)
+        result["levels"] = [len(level) for level in tree.levels]
+        return result
+
+    def bind_user(self, bind_user_req: BindUserReq) -> AFlowResponse:
         """绑定用户"""
         url = f"{self.base_url}/aflow/api/auth/bind"
-        payload = bind_user_req.model_dump(by_alias=True)
-        return self._make_request(url, payload)
+        return self._make_request(url, bind_user_req)
 
-    def create_third_party(self, flow_data: ThirdPartyFlowCreateReq) -> dict:
-        """创建第三方流程"""
+    def create_third_party(self, flow_data: ThirdPartyFlowCreateReq) -> AFlowResponse[ThirdPartyFlowBase]:
+        """创建第三方流程，data 按 ThirdPartyFlowBase 解析"""
         url = f"{self.base_url}/aflow/api/flow/create_third_party"
-        payload = flow_data.model_dump(by_alias=True)
-        return self._make_request(url, payload)
+        return self._make_request(url, flow_data, model=ThirdPartyFlowBase)
 
-    def online_third_party(self, flow_data: ThirdPartyFlowOnlineReq) -> dict:
+    def online_third_party(self, flow_data: ThirdPartyFlowOnlineReq) -> AFlowResponse:
         """上线第三方流程"""
         url = f"{self.base_url}/aflow/api/flow/online_third_party"
-        payload = flow_data.model_dump(by_alias=True)
-        return self._make_request(url, payload)
-
-    def sync_task(self, task_data: ThirdPartyTaskSyncReq) -> dict:
-        """同步任务信息"""
-        url = f"{self.base_url}/aflow/api/order/sync/task"
-        payload = task_data.model_dump(by_alias=True)
-        return self._make_request(url, payload)
+        return self._make_request(url, flow_data)
+
+    def _send_task(self, task_data: ThirdPartyTaskSyncReq, raise_on_error: Optional[bool] = None) -> AFlowResponse:
+        """发送一次任务同步，去重缓存判定为重复或过期时不发送，直接返回成功"""
+        reason = self.dedup.admit(task_data) if self.dedup is not None else None
+        if reason is not None:
+            self.logger.debug(f"跳过任务同步，订单: {task_data.third_order_id}，原因: {reason}")
+            return AFlowResponse({"status": 0, "msg": f"skipped: {reason}", "data": None, "skipped": reason})
+        response = self._make_request(f"{self.base_url}/aflow/api/order/sync/task", task_data, raise_on_error)
+        # 服务端确认成功后才登记，失败的数据下次可以重发
+        if self.dedup is not None and response.get("status") == 0:
+            self.dedup.record(task_data)
+        return response
+
+    def sync_task(self, task_data: ThirdPartyTaskSyncReq) -> AFlowResponse:
+        """同步任务信息，启用发件箱时先落盘，服务端确认成功后再标记完成"""
+        if self.outbox is None:
+            return self._send_task(task_data)
+        entry_id = self.outbox.append(task_data)
+        response = self._send_task(task_data)
+        if response.get("status") == 0:
+            self.outbox.mark_done([entry_id])
+        return response
 
 
 if __name__ == '__main__':
@@ -0,0 +1,141 @@
+# Estimate of the local clock's offset from the AFlow server, applied to signature timestamps
+
+import os
+import threading
+import time
+from collections import deque
+from email.utils import mktime_tz, parsedate_tz
+from typing import Deque, Dict, Optional, Tuple
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .config import config_manager
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class ClockSkewEstimator:
+    """
+    根据响应的 Date 头估计本地时钟与服务端的偏差（服务端时间 - 本地时间），签名时间戳按偏差校正
+
+    Date 精确到秒：请求在本地 sent_at 发出、received_at 收到，服务端时间为 D 时，
+    偏差一定在 [D - received_at, D + 1 - sent_at] 之间。取最近 max_samples 个区间的交集，
+    多个样本后误差可以缩小到亚秒级；交集为空（本地时钟被调整）时只保留最新的样本重新累积。
+
+    区间包含 0 时认为本地时钟准确，不做校正（offset 为 0），只校正能确认存在的偏差；
+    偏差超过 warn_threshold 秒时记录一次警告。
+    """
+
+    def __init__(self, max_samples: Optional[int] = None, warn_threshold: Optional[float] = None):
+        self.max_samples: int = max_samples or config_manager.get("clock_skew_samples")
+        self.warn_threshold: float = warn_threshold or config_manager.get("clock_skew_warn_threshold")
+        self._lock = threading.Lock()
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=self.max_samples)
+        self._bounds: Optional[Tuple[float, float]] = None
+        self._offset = 0.0
+        self._warned = False
+        self._observed = 0
+        self._resets = 0
+
+    @property
+    def offset(self) -> float:
+        """当前使用的偏差（秒），服务端时间 = 本地时间 + offset"""
+        return self._offset
+
+    def shifted(self, offset: float, tolerance: float = 1.0) -> bool:
+        """当前偏差与 offset（例如签名时使用的偏差）相差超过 tolerance 秒"""
+        return abs(self._offset - offset) >= tolerance
+
+    def now_ms(self) -> int:
+        """按偏差校正后的当前时间（毫秒），用作签名时间戳"""
+        return int((time.time() + self._offset) * 1000)
+
+    def observe(self, date_header: Optional[str], sent_at: float, received_at: float) -> Optional[float]:
+        """
+        记录一次响应的 Date 头，返回更新后的偏差；没有 Date 头或无法解析时忽略
+
+        Args:
+            sent_at / received_at: 发出请求和收到响应时的本地时间（time.time()）
+        """
+        if not date_header:
+            return None
+        parsed = parsedate_tz(date_header)
+        if parsed is None:
+            return None
+        server_time = mktime_tz(parsed)
+        low, high = server_time - received_at, server_time + 1 - sent_at
+
+        with self._lock:
+            self._observed += 1
+            self._samples.append((low, high))
+            bounds = self._intersect()
+            if bounds is None:
+                self._resets += 1
+                self._samples.clear()
+                self._samples.append((low, high))
+                bounds = (low, high)
+            self._bounds = bounds
+            self._offset = 0.0 if bounds[0] <= 0 <= bounds[1] else (bounds[0] + bounds[1]) / 2
+            offset = self._offset
+
+        if abs(offset) >= self.warn_threshold and not self._warned:
+            self._warned = True
+            logger.warning(f"本地时钟与 AFlow 服务端相差约 {offset:.1f} 秒，签名时间戳已按偏差校正，请检查主机的时间同步")
+        elif abs(offset) < self.warn_threshold:
+            self._warned = False
+        return offset
+
+    def _intersect(self) -> Optional[Tuple[float, float]]:
+        """重新计算所有样本区间的交集，调用方需持有锁"""
+        low = max(sample[0] for sample in self._samples)
+        high = min(sample[1] for sample in self._samples)
+        return (low, high) if low <= high else None
+
+    def probe(self, transport, url: Optional[str] = None) -> Optional[float]:
+        """向 AIFLOW_DOMAIN 发送一次 HEAD 请求，用响应的 Date 头更新偏差"""
+        url = (url or config_manager.get("aiflow_domain")).strip().rstrip("/")
+        sent_at = time.time()
+        response = transport.session.head(url, timeout=transport.timeout, allow_redirects=False)
+        received_at = time.time()
+        response.close()
+        return self.observe(response.headers.get("Date"), sent_at, received_at)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        偏差指标：offset_ms 为当前使用的偏差，uncertainty_ms 为估计区间的宽度，
+        samples 为参与估计的样本数，observed 为累计收到的 Date 头数，resets 为本地时钟跳变导致重新估计的次数
+        """
+        with self._lock:
+            bounds = self._bounds
+            return {
+                "offset_ms": round(self._offset * 1000, 1),
+                "uncertainty_ms": round((bounds[1] - bounds[0]) * 1000, 1) if bounds else None,
+                "samples": len(self._samples),
+                "observed": self._observed,
+                "resets": self._resets,
+            }
+
+
+_default_estimator: Optional[ClockSkewEstimator] = None
+_default_lock = threading.Lock()
+
+
+def get_default_clock_skew() -> Optional[ClockSkewEstimator]:
+    """进程内共享的时钟偏差估计，CLOCK_SKEW_COMPENSATION=false 时返回 None"""
+    global _default_estimator
+    if not config_manager.get("clock_skew_enabled"):
+        return None
+    if _default_estimator is None:
+        with _default_lock:
+            if _default_estimator is None:
+                _default_estimator = ClockSkewEstimator()
+    return _default_estimator
@@ -19,6 +19,72 @@ class Config:
             "enterprise_code": os.getenv("ENTERPRISE_CODE", ""),
             "timeout": int(os.getenv("TIMEOUT", "30")),
             "service_domain": os.getenv("SERVICE_DOMAIN", ""),
+            # 连接池配置
+            "pool_connections": int(os.getenv("POOL_CONNECTIONS", "10")),
+            "pool_maxsize": int(os.getenv("POOL_MAXSIZE", "20")),
+            "keep_alive": os.getenv("HTTP_KEEP_ALIVE", "true").lower() != "false",
+            "connect_timeout": float(os.getenv("CONNECT_TIMEOUT", "5")),
+            "async_pool_limit": int(os.getenv("ASYNC_POOL_LIMIT", "100")),
+            # 请求体压缩: none / gzip / deflate，请求体不小于 min_size 字节时压缩
+            "request_compression": os.getenv("REQUEST_COMPRESSION", "none"),
+            "request_compression_min_size": int(os.getenv("REQUEST_COMPRESSION_MIN_SIZE", "8192")),
+            "request_compression_level": int(os.getenv("REQUEST_COMPRESSION_LEVEL", "6")),
+            # 批量同步配置
+            "sync_chunk_size": int(os.getenv("SYNC_CHUNK_SIZE", "1000")),
+            "sync_max_workers": int(os.getenv("SYNC_MAX_WORKERS", "4")),
+            # 批量同步失败的数据自动重发的轮数（0 表示不重发），以及每轮之前等待的秒数
+            "sync_retry_failed": int(os.getenv("SYNC_RETRY_FAILED", "0")),
+            "sync_retry_delay": float(os.getenv("SYNC_RETRY_DELAY", "5")),
+            # 自适应批次（AIMD）：按请求耗时和错误调整批次大小与在途请求数，sync_chunk_size / sync_max_workers 为初始值
+            "sync_adaptive": os.getenv("SYNC_ADAPTIVE", "false").lower() == "true",
+            "sync_adaptive_min_size": int(os.getenv("SYNC_ADAPTIVE_MIN_SIZE", "50")),
+            "sync_adaptive_max_size": int(os.getenv("SYNC_ADAPTIVE_MAX_SIZE", "10000")),
+            "sync_adaptive_max_in_flight": int(os.getenv("SYNC_ADAPTIVE_MAX_IN_FLIGHT", "16")),
+            "sync_adaptive_target_latency": float(os.getenv("SYNC_ADAPTIVE_TARGET_LATENCY", "2")),
+            "sync_adaptive_step": int(os.getenv("SYNC_ADAPTIVE_STEP", "100")),
+            # 签名实现: auto / native / python，auto 时加密库加载失败则使用纯 Python 实现
+            "sign_backend": os.getenv("SIGN_BACKEND", "auto"),
+            # 请求体序列化使用的JSON库: auto / json / orjson / msgspec
+            "json_codec": os.getenv("JSON_CODEC", "auto"),
+            # 重试配置，request_deadline 为单次调用含重试的总耗时上限（秒）
+            "retry_max_attempts": int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+            "retry_backoff_base": float(os.getenv("RETRY_BACKOFF_BASE", "0.5")),
+            "retry_backoff_max": float(os.getenv("RETRY_BACKOFF_MAX", "10")),
+            "request_deadline": float(os.getenv("REQUEST_DEADLINE", "60")),
+            # 熔断配置，按接口路径分别统计
+            "breaker_enabled": os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() != "false",
+            "breaker_failure_rate": float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5")),
+            "breaker_slow_call_rate": float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", "1.0")),
+            "breaker_slow_call_duration": float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_DURATION", "10")),
+            "breaker_window_size": int(os.getenv("CIRCUIT_BREAKER_WINDOW_SIZE", "20")),
+            "breaker_minimum_calls": int(os.getenv("CIRCUIT_BREAKER_MINIMUM_CALLS", "10")),
+            "breaker_open_duration": float(os.getenv("CIRCUIT_BREAKER_OPEN_DURATION", "30")),
+            "breaker_half_open_calls": int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_CALLS", "3")),
+            # 客户端限速，每个接口每秒的请求数/字节数，0 表示不限制
+            "rate_limit_rps": float(os.getenv("RATE_LIMIT_RPS", "0")),
+            "rate_limit_bps": float(os.getenv("RATE_LIMIT_BPS", "0")),
+            # 任务同步生产者：后台线程数、每次发送的最大条数、攒批等待时间（毫秒）、缓冲区上限和缓冲区满时的策略（block / drop）
+            "producer_workers": int(os.getenv("TASK_PRODUCER_WORKERS", "4")),
+            "producer_batch_size": int(os.getenv("TASK_PRODUCER_BATCH_SIZE", "100")),
+            "producer_linger_ms": float(os.getenv("TASK_PRODUCER_LINGER_MS", "50")),
+            "producer_max_queue_size": int(os.getenv("TASK_PRODUCER_MAX_QUEUE_SIZE", "10000")),
+            "producer_full_policy": os.getenv("TASK_PRODUCER_FULL_POLICY", "block"),
+            # 任务同步发件箱（SQLite 文件路径），为空时不启用
+            "outbox_path": os.getenv("AFLOW_OUTBOX_PATH", ""),
+            # 创建 AFlowClient 时重放发件箱中未完成的记录，失败次数达到上限的订单不再重放（0 表示不限制）
+            "outbox_replay_on_start": os.getenv("AFLOW_OUTBOX_REPLAY_ON_START", "true").lower() != "false",
+            "outbox_replay_max_attempts": int(os.getenv("AFLOW_OUTBOX_REPLAY_MAX_ATTEMPTS", "10")),
+            # 任务同步去重缓存：过滤重复和过期的订单状态，按 LRU 淘汰，超过 ttl 秒未更新的条目失效
+            "task_dedup_enabled": os.getenv("TASK_DEDUP_ENABLED", "false").lower() == "true",
+            "task_dedup_max_entries": int(os.getenv("TASK_DEDUP_MAX_ENTRIES", "1000000")),
+            "task_dedup_ttl": float(os.getenv("TASK_DEDUP_TTL", "86400")),
+            # 按响应的 Date 头估计与服务端的时钟偏差并校正签名时间戳：参与估计的样本数，偏差超过多少秒时告警
+            "clock_skew_enabled": os.getenv("CLOCK_SKEW_COMPENSATION", "true").lower() != "false",
+            "clock_skew_samples": int(os.getenv("CLOCK_SKEW_SAMPLES", "16")),
+            "clock_skew_warn_threshold": float(os.getenv("CLOCK_SKEW_WARN_THRESHOLD", "5")),
+            # 入站请求签名校验：允许的时间戳偏差（秒），以及防重放缓存的最大条目数
+            "verify_window": float(os.getenv("SIGNATURE_VERIFY_WINDOW", "300")),
+            "verify_replay_max_entries": int(os.getenv("SIGNATURE_REPLAY_MAX_ENTRIES", "100000")),
         }
 
     def get(self, key: str, default: Optional[Any] = None) -> Any:
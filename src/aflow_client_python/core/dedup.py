@@ -0,0 +1,127 @@
+# Client-side suppression of duplicate and stale task sync updates
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .config import config_manager
+    from ..models import ThirdPartyTaskSyncReq
+    from ..utils.codec import fingerprint
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.models import ThirdPartyTaskSyncReq
+    from aflow_client_python.utils.codec import fingerprint
+
+# 与上次发送的内容完全相同
+DUPLICATE = "duplicate"
+# 版本（或更新时间）比上次发送的旧
+STALE = "stale"
+
+# (version, update_time, 指纹, 过期时间)
+_Entry = Tuple[Optional[int], Optional[str], str, float]
+
+
+class TaskSyncDedupCache:
+    """
+    按 third_order_id 记录最近一次发送的 version / update_time 和内容指纹，在发送前过滤：
+
+    - 内容与上次发送的完全相同：DUPLICATE
+    - version 小于上次发送的版本（双方都没有 version 时比较 update_time）：STALE
+
+    admit 只做检查，服务端确认成功后调用 record 登记，发送失败、超时或仍在发送中的数据不会被当作已发送过滤掉。
+    条目按 LRU 淘汰，最多 max_entries 个，超过 ttl 秒未更新的条目视为不存在。
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries: int = max_entries or config_manager.get("task_dedup_max_entries")
+        self.ttl: float = ttl or config_manager.get("task_dedup_ttl")
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._stats = {DUPLICATE: 0, STALE: 0, "admitted": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def admit(self, request: ThirdPartyTaskSyncReq) -> Optional[str]:
+        """检查是否需要发送，需要时返回 None，否则返回 DUPLICATE / STALE；检查通过不登记"""
+        with self._lock:
+            reason = self._check(request, fingerprint(request), time.monotonic())
+            if reason is None:
+                self._stats["admitted"] += 1
+            else:
+                self._stats[reason] += 1
+        return reason
+
+    def record(self, request: ThirdPartyTaskSyncReq):
+        """服务端确认发送成功后登记（期间已登记了更新的状态时不覆盖）"""
+        digest = fingerprint(request)
+        now = time.monotonic()
+        order_id = request.third_order_id
+        with self._lock:
+            if self._check(request, digest, now) == STALE:
+                return
+            self._entries[order_id] = (request.version, request.update_time, digest, now + self.ttl)
+            self._entries.move_to_end(order_id)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """累计的放行、重复、过期条数，以及当前的条目数"""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+    def _check(self, request: ThirdPartyTaskSyncReq, digest: str, now: float) -> Optional[str]:
+        """与已登记的条目比较，调用方需持有锁"""
+        self._evict_expired(now)
+        entry = self._entries.get(request.third_order_id)
+        if entry is None:
+            return None
+        version, update_time, last_digest, _ = entry
+        return self._compare(request, version, update_time, digest, last_digest)
+
+    @staticmethod
+    def _compare(request: ThirdPartyTaskSyncReq, version: Optional[int], update_time: Optional[str],
+                 digest: str, last_digest: str) -> Optional[str]:
+        if request.version is not None and version is not None:
+            if request.version < version:
+                return STALE
+        elif request.update_time and update_time:
+            # yyyy-MM-dd HH:mm:ss 格式可以直接按字符串比较
+            if request.update_time < update_time:
+                return STALE
+        if digest == last_digest:
+            return DUPLICATE
+        return None
+
+    def _evict_expired(self, now: float):
+        """按最近更新顺序排列，从最旧的一端清理过期条目，调用方需持有锁"""
+        while self._entries:
+            order_id, entry = next(iter(self._entries.items()))
+            if entry[3] > now:
+                return
+            del self._entries[order_id]
+
+
+_default_cache: Optional[TaskSyncDedupCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_dedup_cache() -> Optional[TaskSyncDedupCache]:
+    """TASK_DEDUP_ENABLED=true 时返回进程内共享的去重缓存，否则返回 None"""
+    global _default_cache
+    if not config_manager.get("task_dedup_enabled"):
+        return None
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = TaskSyncDedupCache()
+    return _default_cache
@@ -0,0 +1,68 @@
+# Exceptions raised by the aflow client
+
+from typing import List, Optional
+
+
+class AFlowError(Exception):
+    """AFlow 客户端异常基类"""
+
+
+class AFlowRequestError(AFlowError):
+    """AFlow 接口返回非200状态码"""
+
+    def __init__(self, status_code: int, body: str = "", retry_after: Optional[float] = None):
+        self.status_code = status_code
+        self.body = body
+        # 服务端通过 Retry-After 头要求的等待秒数
+        self.retry_after = retry_after
+        super().__init__(f"请求失败，状态码: {status_code}， 响应内容: {body}")
+
+
+class DeadlineExceededError(AFlowError):
+    """单次调用（含重试）超出了总耗时预算"""
+
+    def __init__(self, deadline: float, attempts: int, last_error: Optional[BaseException] = None):
+        self.deadline = deadline
+        self.attempts = attempts
+        self.last_error = last_error
+        super().__init__(f"请求超出总耗时预算 {deadline}s，已尝试 {attempts} 次，最后一次错误: {last_error}")
+
+
+class CircuitOpenError(AFlowError):
+    """熔断器处于打开状态，请求被直接拒绝"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        # 距离熔断器进入半开状态的秒数
+        self.retry_after = retry_after
+        super().__init__(f"熔断器已打开，请求被拒绝: {name}，{retry_after:.1f}s 后允许试探请求")
+
+
+class DepartmentTopologyError(AFlowError):
+    """部门树存在孤儿部门或循环引用"""
+
+    def __init__(self, orphans: List[str], cycles: List[List[str]]):
+        self.orphans = orphans
+        self.cycles = cycles
+        super().__init__(f"部门树校验失败，上级不存在的部门: {orphans}，循环引用: {cycles}")
+
+
+class ProducerQueueFullError(AFlowError):
+    """生产者缓冲区已满，且在等待时间内没有空出位置（或策略为丢弃）"""
+
+    def __init__(self, max_queue_size: int):
+        self.max_queue_size = max_queue_size
+        super().__init__(f"任务同步缓冲区已满: {max_queue_size}")
+
+
+class ProducerClosedError(AFlowError):
+    """生产者已关闭，不再接受新的数据"""
+
+
+class SignatureVerificationError(AFlowError):
+    """入站请求的 X-A-Signature 校验失败，reason 为 missing / malformed / unknown_app / expired / mismatch / replayed"""
+
+    def __init__(self, reason: str, detail: str = ""):
+        self.reason = reason
+        self.detail = detail
+        super().__init__(f"签名校验失败({reason}){': ' + detail if detail else ''}")
@@ -0,0 +1,302 @@
+# Durable outbox journal for task sync
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .config import config_manager
+    from .exceptions import AFlowError
+    from ..models import ThirdPartyTaskSyncReq
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.core.exceptions import AFlowError
+    from aflow_client_python.models import ThirdPartyTaskSyncReq
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+# 提交失败后重试之前等待的秒数
+_COMMIT_RETRY_DELAY = 1.0
+
+
+@dataclass
+class OutboxEntry:
+    """发件箱中一条尚未确认的任务同步请求"""
+
+    id: int
+    order_id: int
+    payload: str  # 请求的 JSON（按别名输出）
+    attempts: int  # 重放失败的次数
+    created_at: float
+
+    def request(self) -> ThirdPartyTaskSyncReq:
+        return ThirdPartyTaskSyncReq.model_validate_json(self.payload)
+
+
+class TaskOutbox:
+    """
+    基于 SQLite 的任务同步发件箱：发送前先落盘，服务端确认成功后删除，进程重启后重放未完成的记录
+
+    - append 返回时记录已经 fsync 到磁盘（synchronous=FULL）
+    - 后台线程合并提交（group commit）：多个线程同时 append 时，一次事务、一次 fsync 写入全部记录，
+      mark_done 的删除也合并到下一次提交中，不单独等待落盘
+    - 删除丢失最多导致重复发送；任务同步请求是订单的完整快照，重复发送不影响结果
+    - AFlowClient 创建时自动重放上次未完成的记录（每个发件箱在进程内只重放一次，
+      AFLOW_OUTBOX_REPLAY_ON_START=false 或 AFlowClient(replay_outbox=False) 时关闭）；
+      AsyncAFlowClient 无法在构造函数中等待，需要启动时调用 await client.replay_outbox()
+
+    用法:
+        outbox = TaskOutbox("aflow_outbox.db")
+        client = AFlowClient(outbox=outbox)  # 创建时重放上次未完成的记录
+        client.sync_task(task_req)
+    """
+
+    def __init__(self, path: str, max_batch: int = 1000):
+        self.path = path
+        # 单次事务最多写入的记录数
+        self.max_batch = max_batch
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, order_id INTEGER NOT NULL, payload TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL)"
+        )
+
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._appends: List[Tuple[int, str, float, Future]] = []
+        self._dones: List[int] = []
+        # 等待下一次提交完成的 flush 调用
+        self._waiters: List[Future] = []
+        self._closed = False
+        self._committer = threading.Thread(target=self._run, name="aflow-outbox-committer", daemon=True)
+        self._committer.start()
+        self._replay_lock = threading.Lock()
+        self._replayed = False
+
+    def append(self, request: ThirdPartyTaskSyncReq) -> int:
+        """写入一条记录并等待落盘，返回记录ID"""
+        return self.append_many([request])[0]
+
+    def append_many(self, requests: List[ThirdPartyTaskSyncReq]) -> List[int]:
+        """批量写入并等待落盘，返回的记录ID与 requests 一一对应"""
+        now = time.time()
+        futures: List[Future] = []
+        with self._lock:
+            if self._closed:
+                raise AFlowError("发件箱已关闭")
+            for request in requests:
+                future: Future = Future()
+                self._appends.append((request.third_order_id, request.model_dump_json(by_alias=True), now, future))
+                futures.append(future)
+            self._work.notify()
+        return [future.result() for future in futures]
+
+    def mark_done(self, ids: List[int]):
+        """标记记录已发送成功，在下一次提交时删除"""
+        if not ids:
+            return
+        with self._lock:
+            self._dones.extend(ids)
+            self._work.notify()
+
+    def pending(self, limit: Optional[int] = None) -> List[OutboxEntry]:
+        """按写入顺序返回尚未确认的记录"""
+        sql = "SELECT id, order_id, payload, attempts, created_at FROM outbox ORDER BY id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._db_lock:
+            return [OutboxEntry(*row) for row in self._conn.execute(sql).fetchall()]
+
+    def record_failure(self, ids: List[int]):
+        with self._db_lock:
+            self._conn.executemany("UPDATE outbox SET attempts = attempts + 1 WHERE id = ?", [(i,) for i in ids])
+
+    def replay(self, client, max_attempts: Optional[int] = None) -> Dict[str, int]:
+        """
+        重放尚未确认的记录，同一订单只发送最后一条
+
+        Args:
+            client: AFlowClient
+            max_attempts: 重放失败次数达到该值的订单不再发送（保留在发件箱中，需要人工处理）
+
+        Returns:
+            {"pending": 待确认记录数, "sent": 发送成功的订单数, "failed": 发送失败的订单数, "skipped": 跳过的订单数}
+        """
+        stats, orders = self._replay_plan(max_attempts)
+        for order_id, (ids, latest) in orders.items():
+            try:
+                response = client._send_task(latest.request(), raise_on_error=True)
+            except ValidationError as e:
+                logger.error(f"发件箱记录无法解析，跳过: {latest.id}, {e}")
+                stats["skipped"] += 1
+                continue
+            except Exception as e:
+                logger.error(f"发件箱重放失败，订单: {order_id}，错误信息: {e}")
+                response = {}
+            self._settle(ids, response, stats)
+        self.flush()
+        logger.info(f"发件箱重放完成: {stats}")
+        return stats
+
+    async def replay_async(self, client, max_attempts: Optional[int] = None) -> Dict[str, int]:
+        """replay 的异步版本，client 为 AsyncAFlowClient；读写数据库在线程池中进行，不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        stats, orders = await loop.run_in_executor(None, self._replay_plan, max_attempts)
+        for order_id, (ids, latest) in orders.items():
+            try:
+                response = await client._send_task(latest.request())
+            except ValidationError as e:
+                logger.error(f"发件箱记录无法解析，跳过: {latest.id}, {e}")
+                stats["skipped"] += 1
+                continue
+            except Exception as e:
+                logger.error(f"发件箱重放失败，订单: {order_id}，错误信息: {e}")
+                response = {}
+            await loop.run_in_executor(None, self._settle, ids, response, stats)
+        await loop.run_in_executor(None, self.flush)
+        logger.info(f"发件箱重放完成: {stats}")
+        return stats
+
+    def replay_once(self, client, max_attempts: Optional[int] = None) -> Optional[Dict[str, int]]:
+        """同一发件箱在进程内只重放一次（多个客户端共享发件箱时由第一个触发），已重放过时返回 None"""
+        with self._replay_lock:
+            if self._replayed:
+                return None
+            self._replayed = True
+        return self.replay(client, max_attempts)
+
+    def _replay_plan(self, max_attempts: Optional[int]) -> Tuple[Dict[str, int], Dict[int, Tuple[List[int], OutboxEntry]]]:
+        """按订单分组，返回初始统计和 {订单号: (全部记录ID, 最后一条记录)}，失败次数达到上限的订单计入 skipped"""
+        groups: Dict[int, List[OutboxEntry]] = {}
+        entries = self.pending()
+        for entry in entries:
+            groups.setdefault(entry.order_id, []).append(entry)
+
+        stats = {"pending": len(entries), "sent": 0, "failed": 0, "skipped": 0}
+        orders: Dict[int, Tuple[List[int], OutboxEntry]] = {}
+        for order_id, group in groups.items():
+            latest = group[-1]
+            if max_attempts is not None and latest.attempts >= max_attempts:
+                stats["skipped"] += 1
+                continue
+            orders[order_id] = ([entry.id for entry in group], latest)
+        return stats, orders
+
+    def _settle(self, ids: List[int], response: dict, stats: Dict[str, int]):
+        if response.get("status") == 0:
+            self.mark_done(ids)
+            stats["sent"] += 1
+        else:
+            self.record_failure(ids)
+            stats["failed"] += 1
+
+    def flush(self):
+        """等待此前的 mark_done 写入数据库，写入失败时抛出异常"""
+        with self._lock:
+            if self._closed:
+                return
+            future: Future = Future()
+            self._waiters.append(future)
+            self._work.notify()
+        future.result()
+
+    def close(self):
+        """写入剩余的记录后关闭数据库"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._work.notify()
+        self._committer.join()
+        with self._db_lock:
+            self._conn.close()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._work.wait_for(lambda: self._appends or self._dones or self._waiters or self._closed)
+                if not self._appends and not self._dones and not self._waiters:
+                    return
+                appends, self._appends = self._appends[:self.max_batch], self._appends[self.max_batch:]
+                dones, self._dones = self._dones, []
+                waiters, self._waiters = self._waiters, []
+            try:
+                ids = self._commit(appends, dones)
+            except Exception as e:
+                logger.error(f"发件箱写入失败: {e}")
+                for *_, future in appends:
+                    future.set_exception(e)
+                for future in waiters:
+                    future.set_exception(e)
+                if not dones:
+                    continue
+                with self._lock:
+                    if self._closed:
+                        logger.warning(f"发件箱已关闭，{len(dones)} 条已完成的记录未删除，重放时会再次发送")
+                    else:
+                        # 删除失败的记录放回队列，等待一段时间后随下一次提交重试
+                        self._dones[:0] = dones
+                        self._work.wait_for(lambda: self._closed, _COMMIT_RETRY_DELAY)
+                continue
+            for row_id, (*_, future) in zip(ids, appends):
+                future.set_result(row_id)
+            for future in waiters:
+                future.set_result(None)
+
+    def _commit(self, appends: List[Tuple[int, str, float, Future]], dones: List[int]) -> List[int]:
+        """一次事务写入新增记录、删除已完成的记录"""
+        ids: List[int] = []
+        if not appends and not dones:
+            return ids
+        with self._db_lock:
+            self._conn.execute("BEGIN")
+            try:
+                for order_id, payload, created_at, _ in appends:
+                    cursor = self._conn.execute(
+                        "INSERT INTO outbox (order_id, payload, created_at) VALUES (?, ?, ?)",
+                        (order_id, payload, created_at),
+                    )
+                    ids.append(cursor.lastrowid)
+                if dones:
+                    self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in dones])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ids
+
+
+_default_outbox: Optional[TaskOutbox] = None
+_default_lock = threading.Lock()
+
+
+def get_default_outbox() -> Optional[TaskOutbox]:
+    """根据 AFLOW_OUTBOX_PATH 创建进程内共享的发件箱，未配置时返回 None"""
+    global _default_outbox
+    path = config_manager.get("outbox_path")
+    if not path:
+        return None
+    if _default_outbox is None:
+        with _default_lock:
+            if _default_outbox is None:
+                _default_outbox = TaskOutbox(path)
+    return _default_outbox
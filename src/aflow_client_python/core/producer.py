@@ -0,0 +1,268 @@
+# Background batching producer for task sync
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .client import AFlowClient
+    from .config import config_manager
+    from .exceptions import ProducerClosedError, ProducerQueueFullError
+    from ..models import ThirdPartyTaskSyncReq
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.client import AFlowClient
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.core.exceptions import ProducerClosedError, ProducerQueueFullError
+    from aflow_client_python.models import ThirdPartyTaskSyncReq
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+# 缓冲区满时阻塞等待
+BLOCK = "block"
+# 缓冲区满时丢弃新数据，返回的 Future 带 ProducerQueueFullError（启用发件箱时数据仍保留在发件箱中，重放时补发）
+DROP = "drop"
+
+
+@dataclass
+class _Record:
+    request: ThirdPartyTaskSyncReq
+    future: Future
+    outbox_id: Optional[int] = None  # 发件箱中的记录ID
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class TaskSyncProducer:
+    """
+    任务同步生产者：enqueue 立即返回，由后台线程攒批后调用 sync_task
+
+    - 按 third_order_id 分区，同一订单固定由同一个线程按入队顺序发送，保证单订单内的顺序
+    - 分区内攒够 batch_size 条，或最早一条等待超过 linger_ms 时发送
+    - coalesce=True 时同一批次内同一订单只发送最后一次状态（任务同步请求是订单的完整快照），
+      被合并的 Future 与最终发送的那次得到相同结果
+    - 缓冲区（含发送中的数据）最多 max_queue_size 条，满时按 full_policy 阻塞或丢弃
+    - 退出前调用 flush() / close()，或使用 with 语句，确保缓冲区内的数据发送完成
+    - 客户端启用发件箱（AFlowClient(outbox=...)）时，enqueue 先落盘再返回，发送成功后标记完成，
+      进程崩溃时缓冲区内的数据在重启后创建 AFlowClient 时重放补发
+
+    用法:
+        producer = TaskSyncProducer(AFlowClient())
+        producer.enqueue(task_req)
+        ...
+        producer.close()
+    """
+
+    def __init__(
+            self,
+            client: Optional[AFlowClient] = None,
+            workers: Optional[int] = None,
+            batch_size: Optional[int] = None,
+            linger_ms: Optional[float] = None,
+            max_queue_size: Optional[int] = None,
+            full_policy: Optional[str] = None,
+            block_timeout: Optional[float] = None,
+            coalesce: bool = True,
+    ):
+        self.client = client or AFlowClient()
+        self.workers: int = workers or config_manager.get("producer_workers")
+        self.batch_size: int = batch_size or config_manager.get("producer_batch_size")
+        linger_ms = config_manager.get("producer_linger_ms") if linger_ms is None else linger_ms
+        self.linger: float = linger_ms / 1000
+        self.max_queue_size: int = max_queue_size or config_manager.get("producer_max_queue_size")
+        self.full_policy: str = full_policy or config_manager.get("producer_full_policy")
+        if self.full_policy not in (BLOCK, DROP):
+            raise ValueError(f"不支持的缓冲区满策略: {self.full_policy}，可选: {BLOCK} / {DROP}")
+        # 阻塞策略下最多等待的秒数，None 表示一直等待
+        self.block_timeout = block_timeout
+        self.coalesce = coalesce
+
+        self._lock = threading.Lock()
+        self._partitions: List[Deque[_Record]] = [deque() for _ in range(self.workers)]
+        self._ready = [threading.Condition(self._lock) for _ in range(self.workers)]
+        self._space = threading.Condition(self._lock)
+        self._drained = threading.Condition(self._lock)
+        # 已入队但尚未发送完成的条数
+        self._pending = 0
+        self._flushing = 0
+        self._closed = False
+        self._stats = {"enqueued": 0, "sent": 0, "coalesced": 0, "dropped": 0, "failed": 0, "cancelled": 0}
+        self._threads = [
+            threading.Thread(target=self._run, args=(index,), name=f"aflow-task-producer-{index}", daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def enqueue(self, request: ThirdPartyTaskSyncReq) -> Future:
+        """
+        放入缓冲区并立即返回 Future，发送完成后结果为 sync_task 的响应
+
+        Raises:
+            ProducerClosedError: 生产者已关闭
+            ProducerQueueFullError: 阻塞策略下等待 block_timeout 后缓冲区仍然是满的
+
+        抛出异常时数据不会发送，也不会保留在发件箱中
+        """
+        future: Future = Future()
+        partition = hash(request.third_order_id) % self.workers
+        with self._lock:
+            if self._closed:
+                raise ProducerClosedError("任务同步生产者已关闭")
+        # 落盘在锁外进行，多个线程的写入由发件箱合并提交
+        outbox_id = self.client.outbox.append(request) if self.client.outbox is not None else None
+        try:
+            with self._lock:
+                if self._closed:
+                    raise ProducerClosedError("任务同步生产者已关闭")
+                if self._pending >= self.max_queue_size:
+                    if self.full_policy == DROP:
+                        self._stats["dropped"] += 1
+                        logger.warning(f"任务同步缓冲区已满，丢弃订单: {request.third_order_id}")
+                        future.set_exception(ProducerQueueFullError(self.max_queue_size))
+                        return future
+                    if not self._space.wait_for(lambda: self._pending < self.max_queue_size or self._closed,
+                                                self.block_timeout):
+                        raise ProducerQueueFullError(self.max_queue_size)
+                    if self._closed:
+                        raise ProducerClosedError("任务同步生产者已关闭")
+                self._partitions[partition].append(_Record(request, future, outbox_id))
+                self._pending += 1
+                self._stats["enqueued"] += 1
+                self._ready[partition].notify()
+        except (ProducerClosedError, ProducerQueueFullError):
+            # 抛出异常即告知调用方数据未被接收，同时删除发件箱中的记录，避免重放时补发
+            if outbox_id is not None:
+                self.client.outbox.mark_done([outbox_id])
+            raise
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """立即发送缓冲区内的全部数据并等待完成，超时返回 False"""
+        with self._lock:
+            self._flushing += 1
+            for ready in self._ready:
+                ready.notify()
+            try:
+                return self._drained.wait_for(lambda: self._pending == 0, timeout)
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: Optional[float] = None):
+        """停止接受新数据，发送完缓冲区内的数据后停止后台线程"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for ready in self._ready:
+                ready.notify()
+            self._space.notify_all()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if self._pending:
+            logger.warning(f"任务同步生产者关闭时仍有 {self._pending} 条数据未发送")
+
+    def stats(self) -> Dict[str, int]:
+        """累计的入队、发送、合并、丢弃、失败、取消条数，以及当前缓冲区内的条数"""
+        with self._lock:
+            return {**self._stats, "pending": self._pending}
+
+    def _next_batch(self, index: int) -> Optional[List[_Record]]:
+        """等待分区满足发送条件后取出一批，生产者关闭且分区为空时返回 None"""
+        queue = self._partitions[index]
+        with self._lock:
+            while True:
+                if queue:
+                    if self._closed or self._flushing or len(queue) >= self.batch_size:
+                        break
+                    waited = time.monotonic() - queue[0].enqueued_at
+                    if waited >= self.linger:
+                        break
+                    self._ready[index].wait(self.linger - waited)
+                elif self._closed:
+                    return None
+                else:
+                    self._ready[index].wait()
+            return [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+
+    def _run(self, index: int):
+        while True:
+            batch = self._next_batch(index)
+            if batch is None:
+                return
+            try:
+                self._send_batch(batch)
+            except Exception as e:
+                # 单条数据出错不能导致后台线程退出，否则该分区后续的数据永远不会发送
+                logger.error(f"任务同步批次处理失败: {e}")
+                for record in batch:
+                    if not record.future.done():
+                        record.future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._pending -= len(batch)
+                    self._space.notify_all()
+                    if self._pending == 0:
+                        self._drained.notify_all()
+
+    def _send_batch(self, batch: List[_Record]):
+        """
+        按入队顺序发送；合并时同一订单只保留最后一条，位置取最后一次出现的位置
+
+        调用方已取消 Future 的数据不发送，同时从发件箱中删除
+        """
+        live: List[_Record] = []
+        cancelled: List[_Record] = []
+        for record in batch:
+            (live if record.future.set_running_or_notify_cancel() else cancelled).append(record)
+        if cancelled:
+            with self._lock:
+                self._stats["cancelled"] += len(cancelled)
+            if self.client.outbox is not None:
+                self.client.outbox.mark_done([r.outbox_id for r in cancelled if r.outbox_id is not None])
+        batch = live
+
+        if self.coalesce:
+            groups: Dict[int, List[_Record]] = {}
+            for record in batch:
+                order_id = record.request.third_order_id
+                groups[order_id] = groups.pop(order_id, []) + [record]
+        else:
+            groups = {index: [record] for index, record in enumerate(batch)}
+
+        for records in groups.values():
+            latest = records[-1]
+            try:
+                response = self.client._send_task(latest.request, raise_on_error=True)
+            except Exception as e:
+                logger.error(f"任务同步失败，订单: {latest.request.third_order_id}，错误信息: {e}")
+                outcome, failed = e, True
+            else:
+                outcome, failed = response, False
+                if self.client.outbox is not None and response.get("status") == 0:
+                    self.client.outbox.mark_done([r.outbox_id for r in records if r.outbox_id is not None])
+            with self._lock:
+                self._stats["failed" if failed else "sent"] += 1
+                self._stats["coalesced"] += len(records) - 1
+            for record in records:
+                if failed:
+                    record.future.set_exception(outcome)
+                else:
+                    record.future.set_result(outcome)
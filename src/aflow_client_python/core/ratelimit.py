@@ -0,0 +1,161 @@
+# Client-side token bucket rate limiting per endpoint and per tenant
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .config import config_manager
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class TokenBucket:
+    """
+    令牌桶，rate 为每秒补充的令牌数，capacity 为桶容量（允许的突发量）
+
+    采用预约方式：reserve 立即扣减令牌（可以扣成负数）并返回需要等待的秒数，
+    同步和异步调用方分别用 time.sleep / asyncio.sleep 等待，单次请求超过容量时按比例等待
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"rate 必须大于0: {rate}")
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """预约 tokens 个令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+@dataclass
+class RateLimit:
+    """限速配置，None 表示该维度不限制"""
+
+    requests_per_second: Optional[float] = None
+    bytes_per_second: Optional[float] = None
+    # 请求数的突发容量，默认等于 requests_per_second
+    burst: Optional[float] = None
+
+    def buckets(self) -> List[Tuple[TokenBucket, bool]]:
+        """返回 (令牌桶, 是否按字节计数) 列表"""
+        buckets = []
+        if self.requests_per_second:
+            buckets.append((TokenBucket(self.requests_per_second, self.burst), False))
+        if self.bytes_per_second:
+            buckets.append((TokenBucket(self.bytes_per_second), True))
+        return buckets
+
+
+class RateLimiter:
+    """
+    按接口路径和企业编码（租户）分别限速，请求需要同时满足两者
+
+    字节数按实际发送的请求体计算：压缩发送的请求在发送前只预约请求数，压缩完成后再按压缩后的字节数扣减（charge）
+
+    Args:
+        default: 未单独配置的接口使用的限速，每个接口各自一个令牌桶
+        endpoints: 接口路径 -> 限速，例如 {"/aflow/api/sys/sync/user": RateLimit(5, 5 * 1024 * 1024)}
+        tenants: 企业编码 -> 限速，同一企业的所有接口共享
+    """
+
+    def __init__(
+            self,
+            default: Optional[RateLimit] = None,
+            endpoints: Optional[Dict[str, RateLimit]] = None,
+            tenants: Optional[Dict[str, RateLimit]] = None,
+    ):
+        self.default = default
+        self.endpoints = endpoints or {}
+        self.tenants = tenants or {}
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str], List[Tuple[TokenBucket, bool]]] = {}
+
+    def _get_buckets(self, kind: str, key: str) -> List[Tuple[TokenBucket, bool]]:
+        buckets = self._buckets.get((kind, key))
+        if buckets is None:
+            with self._lock:
+                buckets = self._buckets.get((kind, key))
+                if buckets is None:
+                    if kind == "endpoint":
+                        limit = self.endpoints.get(key, self.default)
+                    else:
+                        limit = self.tenants.get(key)
+                    buckets = limit.buckets() if limit is not None else []
+                    self._buckets[(kind, key)] = buckets
+        return buckets
+
+    def reserve(self, endpoint: str, tenant: str = "", size: int = 0) -> float:
+        """为一次请求预约令牌，返回需要等待的秒数"""
+        wait = 0.0
+        for bucket, by_bytes in self._get_buckets("endpoint", endpoint) + self._get_buckets("tenant", tenant):
+            wait = max(wait, bucket.reserve(size if by_bytes else 1))
+        if wait > 0:
+            logger.debug(f"触发客户端限速: {endpoint}, 租户: {tenant}, 等待 {wait:.3f}s")
+        return wait
+
+    def charge(self, endpoint: str, tenant: str = "", size: int = 0):
+        """
+        请求发出后按实际发送的字节数扣减按字节计数的令牌，不等待
+
+        用于发送前无法得知大小的请求（流式压缩），超出的部分由之后的请求等待补足
+        """
+        for bucket, by_bytes in self._get_buckets("endpoint", endpoint) + self._get_buckets("tenant", tenant):
+            if by_bytes:
+                bucket.reserve(size)
+
+    def acquire(self, endpoint: str, tenant: str = "", size: int = 0):
+        """阻塞直到可以发送请求"""
+        wait = self.reserve(endpoint, tenant, size)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, endpoint: str, tenant: str = "", size: int = 0):
+        """acquire 的异步版本，等待期间不阻塞事件循环"""
+        wait = self.reserve(endpoint, tenant, size)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_default_rate_limiter() -> Optional[RateLimiter]:
+    """
+    根据 RATE_LIMIT_RPS / RATE_LIMIT_BPS 创建进程内共享的限速器（每个接口独立计数），均未配置时返回 None
+    """
+    global _default_limiter
+    rps = config_manager.get("rate_limit_rps")
+    bps = config_manager.get("rate_limit_bps")
+    if not rps and not bps:
+        return None
+    if _default_limiter is None:
+        with _default_lock:
+            if _default_limiter is None:
+                _default_limiter = RateLimiter(default=RateLimit(rps or None, bps or None))
+    return _default_limiter
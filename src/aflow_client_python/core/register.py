@@ -14,6 +14,10 @@ try:
     from ..utils.logger import get_logger
     from .config import config_manager, AServiceRouteContext, AServiceType
     from .scanner import EnhancedInterfaceScanner
+    from .transport import HttpTransport, get_default_transport
+    from .exceptions import AFlowError, AFlowRequestError
+    from .retry import RetryPolicy, parse_retry_after
+    from .clock import get_default_clock_skew
 except ImportError:
     import sys
     import os
@@ -25,6 +29,10 @@ except ImportError:
     from aflow_client_python.utils.logger import get_logger
     from aflow_client_python.core.config import config_manager, AServiceRouteContext, AServiceType
     from aflow_client_python.core.scanner import EnhancedInterfaceScanner
+    from aflow_client_python.core.transport import HttpTransport, get_default_transport
+    from aflow_client_python.core.exceptions import AFlowError, AFlowRequestError
+    from aflow_client_python.core.retry import RetryPolicy, parse_retry_after
+    from aflow_client_python.core.clock import get_default_clock_skew
 
 logger = get_logger()
 
@@ -87,7 +95,9 @@ class EnhancedServiceRegistrar:
             package_list: Optional[List[str]] = None,
             async_register: bool = True,
             max_retries: int = 3,
-            retry_delay: int = 5
+            retry_delay: int = 5,
+            transport: Optional[HttpTransport] = None,
+            retry_policy: Optional[RetryPolicy] = None,
     ):
         # 没有提供那么使用线上地址
         self.base_domain: str = config_manager.get("aiflow_domain").strip().rstrip("/")
@@ -107,10 +117,15 @@ class EnhancedServiceRegistrar:
         self.host_name = self._get_host_name()
         # self.port = config_manager.get("port") # 端口不使用，且可能存在相同服务端口不一致的情况，忽略配置
 
-        self.a_signature = ASignature()
+        # 与 AFlowClient 共享时钟偏差估计，签名时间戳按偏差校正
+        self.clock_skew = get_default_clock_skew()
+        self.a_signature = ASignature(clock=self.clock_skew.now_ms if self.clock_skew is not None else None)
+        self.transport = transport or get_default_transport()
         self.async_register = async_register
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        # 未指定重试策略时，max_retries 为最大尝试次数，retry_delay 为退避基数
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries, backoff_base=retry_delay)
 
         # 异步执行注册
         if async_register:
@@ -140,23 +155,11 @@ class EnhancedServiceRegistrar:
             logger.error(f"同步注册过程中发生严重错误: {e}")
 
     def _async_register(self, package_list: Optional[List[str]]):
-        """异步执行注册，包含重试机制"""
+        """异步执行注册，重试由 retry_policy 控制"""
         for package in package_list or []:
             try:
                 scanner = EnhancedInterfaceScanner()
-                interfaces = scanner.scan(package)
-
-                # 重试机制
-                for attempt in range(self.max_retries):
-                    try:
-                        self.register(interfaces)
-                        break
-                    except Exception as e:
-                        if attempt == self.max_retries - 1:
-                            logger.error(f"服务注册最终失败 after {self.max_retries} attempts: {e}")
-                        else:
-                            logger.warning(f"服务注册尝试 #{attempt + 1} 失败: {e}, {self.retry_delay}s后重试")
-                            time.sleep(self.retry_delay)
+                self.register(scanner.scan(package))
             except Exception as e:
                 logger.error(f"扫描包 {package} 时发生错误: {e}")
 
@@ -211,46 +214,54 @@ class EnhancedServiceRegistrar:
             payload.update(base_payload)
             final_payload.append(payload)
 
-        str_final_payload = json.dumps(final_payload, separators=(',', ':'), ensure_ascii=False)
+        # 只编码一次，签名与发送使用同一份bytes
+        str_final_payload = json.dumps(final_payload, separators=(',', ':'), ensure_ascii=False).encode("utf-8")
         # 批量调用
         try:
-            # 生成签名
-            signature = self.a_signature.generate_signature(
-                self.credential,
-                str_final_payload,
+            self.retry_policy.call(
+                lambda budget: self._register_to_custom_registry(self._signed_headers(str_final_payload),
+                                                                 str_final_payload, budget)
             )
-            headers = {
-                "Content-Type": "application/json",
-                "X-A-Signature": signature,
-            }
-
-            self._register_to_custom_registry(headers, str_final_payload)
-        except requests.exceptions.RequestException as e:
+        except requests.exceptions.Timeout:
+            logger.error(f"服务注册超时: {self.base_url}")
+        except requests.exceptions.ConnectionError:
+            logger.error(f"无法连接到注册中心: {self.base_url}")
+        except AFlowRequestError as e:
+            logger.error(
+                f"服务 {self.app_name} 注册到自定义注册中心失败，状态码: {e.status_code}, 错误信息: {e.body}"
+            )
+        except (requests.exceptions.RequestException, AFlowError) as e:
             logger.error(f"连接注册中心失败: {e}, payload: {final_payload}")
 
-    def _register_to_custom_registry(self, headers, payload: str):
-        """注册到自定义注册中心"""
+    def _signed_headers(self, payload: bytes) -> Dict[str, str]:
+        """生成请求头，每次请求重新签名"""
+        return {
+            "Content-Type": "application/json",
+            "X-A-Signature": self.a_signature.generate_signature(self.credential, payload),
+        }
+
+    def _register_to_custom_registry(self, headers, payload: bytes, budget: Optional[float] = None):
+        """
+        注册到自定义注册中心
+
+        网络异常和非200状态码直接抛出，由重试策略判断是否重试；业务失败(status != 0)不重试
+        """
         logger.debug(f'''
 url: {self.base_url}
 header: {headers}
-payload: {payload}''')
-        try:
-            response = requests.post(self.base_url, data=payload, headers=headers, timeout=self.timeout)
-            if response.status_code == 200:
-                if response.json().get("status") == 0:
-                    logger.info(f"服务 {self.app_name} 成功注册到自定义注册中心。")
-                else:
-                    logger.error(f"服务 {self.app_name} 注册失败，错误信息: {response.text}")
-            else:
-                logger.error(
-                    f"服务 {self.app_name} 注册到自定义注册中心失败，状态码: {response.status_code}, 错误信息: {response.text}"
-                )
-        except requests.exceptions.Timeout:
-            logger.error(f"服务注册超时: {self.base_url}")
-        except requests.exceptions.ConnectionError:
-            logger.error(f"无法连接到注册中心: {self.base_url}")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"服务注册请求异常: {e}")
+payload: {payload.decode('utf-8')}''')
+        sent_at = time.time()
+        response = self.transport.post(self.base_url, data=payload, headers=headers,
+                                       timeout=self.transport.timeout_within(budget))
+        if self.clock_skew is not None:
+            self.clock_skew.observe(response.headers.get("Date"), sent_at, time.time())
+        if response.status_code != 200:
+            raise AFlowRequestError(response.status_code, response.text,
+                                    parse_retry_after(response.headers.get("Retry-After")))
+        if response.json().get("status") == 0:
+            logger.info(f"服务 {self.app_name} 成功注册到自定义注册中心。")
+        else:
+            logger.error(f"服务 {self.app_name} 注册失败，错误信息: {response.text}")
 
     def _get_host_name(self) -> str:
         """获取主机名"""
@@ -0,0 +1,89 @@
+# Typed, lazily parsed responses returned by the aflow client
+
+import os
+from typing import Any, Generic, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+M = TypeVar("M", bound=BaseModel)
+
+# 尚未解析的标记，区别于解析结果为 None
+_UNPARSED = object()
+
+
+class AFlowResponse(dict, Generic[M]):
+    """
+    接口返回，保持与原来的 dict 完全兼容（response["status"]、response.get("data") 等写法不变），另外提供：
+
+    - ok / status / msg: 不解析 data 即可判断结果
+    - error: 请求最终失败时的异常（此时内容为 {}，可以与成功但没有数据的返回区分）
+    - elapsed_ms: 请求耗时（毫秒，含重试）
+    - data: 按接口对应的模型（SyncResult、ThirdPartyFlowBase 等）解析 data 字段，第一次访问时才解析，结果缓存
+
+    只检查状态的调用方不会产生模型校验的开销。
+    """
+
+    def __init__(self, body: Optional[dict] = None, model: Optional[Type[M]] = None,
+                 elapsed_ms: Optional[float] = None, error: Optional[BaseException] = None):
+        super().__init__(body or {})
+        self.model = model
+        self.elapsed_ms = elapsed_ms
+        self.error = error
+        self._data: Any = _UNPARSED
+
+    @property
+    def status(self) -> Optional[int]:
+        return self.get("status")
+
+    @property
+    def msg(self) -> str:
+        return self.get("msg") or ("" if self.error is None else str(self.error))
+
+    @property
+    def ok(self) -> bool:
+        """请求成功且服务端返回 status == 0"""
+        return self.error is None and self.get("status") == 0
+
+    @property
+    def data(self) -> Optional[M]:
+        """
+        按 model 解析的 data 字段；没有指定模型时返回原始值，data 为空或格式不符时返回 None
+
+        data 内容被修改后（例如合并分批结果）需要调用 invalidate 重新解析
+        """
+        if self._data is _UNPARSED:
+            self._data = self._parse(dict.get(self, "data"))
+        return self._data
+
+    def invalidate(self):
+        """丢弃缓存的解析结果"""
+        self._data = _UNPARSED
+
+    def _parse(self, raw: Any) -> Any:
+        if self.model is None:
+            return raw
+        if not isinstance(raw, dict):
+            return None
+        try:
+            return self.model.model_validate(raw)
+        except ValidationError as e:
+            logger.debug(f"接口返回的 data 无法解析为 {self.model.__name__}: {e}")
+            return None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key == "data":
+            self.invalidate()
@@ -0,0 +1,154 @@
+# Retry policy with exponential backoff, jitter and per-call deadlines
+
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, FrozenSet, Optional, Tuple, Type, TypeVar
+
+import requests
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .config import config_manager
+    from .exceptions import AFlowRequestError, DeadlineExceededError
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.core.exceptions import AFlowRequestError, DeadlineExceededError
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+# 可重试的网络异常：连接失败、超时
+_RETRYABLE_EXCEPTIONS: Tuple[Type[BaseException], ...] = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+)
+try:
+    import aiohttp
+
+    _RETRYABLE_EXCEPTIONS += (aiohttp.ClientConnectionError, aiohttp.ServerTimeoutError)
+except ImportError:
+    pass
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头，支持秒数和 HTTP 日期两种格式"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    重试策略，AFlowClient、AsyncAFlowClient 与 EnhancedServiceRegistrar 共用
+
+    - 连接错误、超时、429/5xx 视为可重试，其余错误直接抛出
+    - 指数退避 + 随机抖动，服务端返回 Retry-After 时优先使用
+    - deadline 为单次调用（含所有重试和等待）的总耗时上限，None 表示不限制
+    """
+
+    max_attempts: int = field(default_factory=lambda: config_manager.get("retry_max_attempts"))
+    backoff_base: float = field(default_factory=lambda: config_manager.get("retry_backoff_base"))
+    backoff_max: float = field(default_factory=lambda: config_manager.get("retry_backoff_max"))
+    # 抖动比例，0 为不抖动，1 为完全随机(0, delay)
+    jitter: float = 1.0
+    deadline: Optional[float] = field(default_factory=lambda: config_manager.get("request_deadline"))
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    respect_retry_after: bool = True
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """判断异常是否可重试"""
+        if isinstance(error, AFlowRequestError):
+            return error.status_code in self.retry_statuses
+        return isinstance(error, _RETRYABLE_EXCEPTIONS)
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """第 attempt 次失败后的等待秒数"""
+        retry_after = getattr(error, "retry_after", None)
+        if self.respect_retry_after and retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter) + random.uniform(0, delay * self.jitter)
+
+    def _remaining(self, start: float) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - (time.monotonic() - start)
+
+    def _next_delay(self, start: float, attempt: int, error: BaseException) -> Optional[float]:
+        """返回下次重试前的等待时间，不应再重试时返回 None"""
+        if not self.is_retryable(error) or attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt, error)
+        remaining = self._remaining(start)
+        if remaining is not None and delay >= remaining:
+            # 等待之后已经没有预算，不再重试
+            return None
+        logger.warning(f"请求第 {attempt} 次失败: {error}，{delay:.2f}s 后重试")
+        return delay
+
+    def call(self, func: Callable[[Optional[float]], T]) -> T:
+        """
+        按策略执行 func，func 的参数为本次尝试剩余的时间预算（秒），可用于设置请求超时
+
+        Raises:
+            DeadlineExceededError: 总耗时预算已用完
+            最后一次尝试的异常: 不可重试或已达到最大次数
+        """
+        start = time.monotonic()
+        attempt = 0
+        last_error: Optional[BaseException] = None
+        while True:
+            remaining = self._remaining(start)
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceededError(self.deadline, attempt, last_error)
+            attempt += 1
+            try:
+                return func(remaining)
+            except Exception as e:
+                last_error = e
+                delay = self._next_delay(start, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def call_async(self, func: Callable[[Optional[float]], Awaitable[T]]) -> T:
+        """call 的异步版本"""
+        start = time.monotonic()
+        attempt = 0
+        last_error: Optional[BaseException] = None
+        while True:
+            remaining = self._remaining(start)
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceededError(self.deadline, attempt, last_error)
+            attempt += 1
+            try:
+                return await func(remaining)
+            except Exception as e:
+                last_error = e
+                delay = self._next_delay(start, attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
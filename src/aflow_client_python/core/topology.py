@@ -0,0 +1,129 @@
+# Department tree ordering for topology-aware sync
+
+import os
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from ..models import DepartmentSyncItem, SyncFailDetail
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.models import DepartmentSyncItem, SyncFailDetail
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+# 上级部门不存在时，写入 failDetails 的错误代码
+ORPHAN_CODE = "ORPHAN_DEPARTMENT"
+# 部门之间存在循环引用时，写入 failDetails 的错误代码
+CYCLE_CODE = "DEPARTMENT_CYCLE"
+# 上级部门同步失败、下级部门未发送时，写入 failDetails 的错误代码
+PARENT_FAILED_CODE = "PARENT_SYNC_FAILED"
+
+
+@dataclass
+class DepartmentTree:
+    """
+    按层级排序后的部门树
+
+    levels[0] 为根部门（无上级，或上级在 known_parent_ids 中），levels[n] 的上级都在 levels[n-1]；
+    orphans 为上级部门不存在的部门及其所有下级，cycles 为循环引用的部门ID链，
+    blocked 为挂在循环引用下的部门
+    """
+
+    levels: List[List[DepartmentSyncItem]] = field(default_factory=list)
+    orphans: List[DepartmentSyncItem] = field(default_factory=list)
+    cycles: List[List[str]] = field(default_factory=list)
+    blocked: List[DepartmentSyncItem] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return not self.orphans and not self.cycles
+
+    @classmethod
+    def build(cls, departments: Iterable[DepartmentSyncItem],
+              known_parent_ids: Optional[Iterable[str]] = None) -> "DepartmentTree":
+        """
+        构建父子索引并按层级拓扑排序
+
+        Args:
+            departments: 待同步的部门
+            known_parent_ids: 已经存在于 AFlow 中的部门ID，以这些部门为上级的部门视为根部门
+        """
+        known = set(known_parent_ids or [])
+        by_id: Dict[str, DepartmentSyncItem] = {}
+        for dept in departments:
+            if dept.dept_id in by_id:
+                logger.warning(f"部门ID重复，使用最后一条: {dept.dept_id}")
+            by_id[dept.dept_id] = dept
+
+        children: Dict[str, List[str]] = defaultdict(list)
+        roots: List[str] = []
+        orphan_roots: List[str] = []
+        for dept_id, dept in by_id.items():
+            parent_id = dept.parent_id
+            if not parent_id or parent_id in known:
+                roots.append(dept_id)
+            elif parent_id in by_id:
+                children[parent_id].append(dept_id)
+            else:
+                orphan_roots.append(dept_id)
+
+        tree = cls()
+        visited: Set[str] = set()
+        level = roots
+        while level:
+            tree.levels.append([by_id[dept_id] for dept_id in level])
+            visited.update(level)
+            level = [child for dept_id in level for child in children.get(dept_id, [])]
+
+        # 上级不存在的部门，连同其下级都无法同步
+        queue = deque(orphan_roots)
+        while queue:
+            dept_id = queue.popleft()
+            visited.add(dept_id)
+            tree.orphans.append(by_id[dept_id])
+            queue.extend(children.get(dept_id, []))
+
+        # 剩余未访问的部门都处于环上或挂在环下
+        remaining = [dept_id for dept_id in by_id if dept_id not in visited]
+        for start in remaining:
+            if start in visited:
+                continue
+            path: List[str] = []
+            on_path: Set[str] = set()
+            node = start
+            while node not in visited and node not in on_path:
+                path.append(node)
+                on_path.add(node)
+                node = by_id[node].parent_id
+            if node in on_path:
+                tree.cycles.append(path[path.index(node):])
+            visited.update(path)
+        in_cycle = {dept_id for cycle in tree.cycles for dept_id in cycle}
+        tree.blocked = [by_id[dept_id] for dept_id in remaining if dept_id not in in_cycle]
+        return tree
+
+    def fail_details(self) -> List[SyncFailDetail]:
+        """将孤儿部门和循环引用转为失败详情"""
+        details = [
+            SyncFailDetail(code=ORPHAN_CODE, message=f"上级部门不存在: {dept.dept_id} -> {dept.parent_id}")
+            for dept in self.orphans
+        ]
+        for cycle in self.cycles:
+            chain = " -> ".join(cycle + cycle[:1])
+            details.extend(
+                SyncFailDetail(code=CYCLE_CODE, message=f"部门循环引用: {dept_id}, {chain}") for dept_id in cycle
+            )
+        details.extend(
+            SyncFailDetail(code=CYCLE_CODE, message=f"上级部门存在循环引用: {dept.dept_id} -> {dept.parent_id}")
+            for dept in self.blocked
+        )
+        return details
@@ -0,0 +1,179 @@
+# HTTP transport with pooled keep-alive connections
+
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .config import config_manager
+    from ..utils.compression import RequestCompressor, get_request_compressor
+    from ..utils.logger import get_logger
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.utils.compression import RequestCompressor, get_request_compressor
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+# 记录所有存活的transport，fork后在子进程中统一重置
+_transports = weakref.WeakSet()
+
+
+class HttpTransport:
+    """
+    基于 requests.Session 的连接池传输层
+
+    - 同一进程内复用 TCP/TLS 连接，避免每次请求重新握手
+    - fork 之后（gunicorn/uvicorn 多 worker）子进程自动重建连接池，不与父进程共享 socket
+    - 配置了请求体压缩时，超过阈值的请求体以 Content-Encoding: gzip / deflate 流式压缩发送
+    """
+
+    def __init__(
+            self,
+            pool_connections: Optional[int] = None,
+            pool_maxsize: Optional[int] = None,
+            keep_alive: Optional[bool] = None,
+            connect_timeout: Optional[float] = None,
+            read_timeout: Optional[float] = None,
+            compressor: Optional[RequestCompressor] = None,
+    ):
+        self.pool_connections: int = pool_connections or config_manager.get("pool_connections")
+        self.pool_maxsize: int = pool_maxsize or config_manager.get("pool_maxsize")
+        self.keep_alive: bool = config_manager.get("keep_alive") if keep_alive is None else keep_alive
+        self.connect_timeout: float = connect_timeout or config_manager.get("connect_timeout")
+        self.read_timeout: float = read_timeout or config_manager.get("timeout")
+        # 请求体压缩，未指定时按 REQUEST_COMPRESSION 配置
+        self.compressor = compressor or get_request_compressor()
+
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._pid: Optional[int] = None
+        _transports.add(self)
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(连接超时, 读取超时)"""
+        return self.connect_timeout, self.read_timeout
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """获取当前进程的Session，进程号变化时重建"""
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self._lock:
+                if self._session is None or self._pid != pid:
+                    self._session = self._build_session()
+                    self._pid = pid
+        return self._session
+
+    def timeout_within(self, budget: Optional[float]) -> Tuple[float, float]:
+        """在剩余时间预算内的(连接超时, 读取超时)，budget 为 None 时不限制"""
+        if budget is None:
+            return self.timeout
+        return min(self.connect_timeout, budget), min(self.read_timeout, budget)
+
+    def will_compress(self, data) -> bool:
+        """data 是否会被压缩发送"""
+        return self.compressor is not None and self.compressor.should_compress(data)
+
+    def post(self, url: str, timeout=None, on_compressed: Optional[Callable[[int], None]] = None,
+             **kwargs) -> requests.Response:
+        """
+        发送POST请求，未指定超时时使用配置的(连接超时, 读取超时)
+
+        data 为 bytes 且达到压缩阈值时流式压缩发送，调用方按未压缩的 data 签名；
+        on_compressed 在压缩发送完成后以压缩后的字节数回调
+        """
+        data = kwargs.get("data")
+        if self.will_compress(data):
+            kwargs["data"] = self.compressor.stream(data, on_compressed)
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **self.compressor.headers}
+        return self.session.post(url, timeout=timeout or self.timeout, **kwargs)
+
+    def warm_up(self, url: Optional[str] = None, connections: Optional[int] = None) -> int:
+        """
+        预热连接池，提前与 AIFLOW_DOMAIN 建立连接并完成TLS握手
+
+        Returns:
+            成功建立的连接数
+        """
+        url = (url or config_manager.get("aiflow_domain")).strip().rstrip("/")
+        connections = min(connections or self.pool_maxsize, self.pool_maxsize)
+        if not url or connections <= 0:
+            return 0
+
+        def _touch(_) -> bool:
+            try:
+                # 只关心连接本身，响应状态码无所谓
+                self.session.head(url, timeout=self.timeout, allow_redirects=False).close()
+                return True
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"预热连接失败: {url}, 错误信息: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            warmed = sum(executor.map(_touch, range(connections)))
+        logger.debug(f"预热连接完成: {url}, 连接数: {warmed}/{connections}")
+        return warmed
+
+    def close(self):
+        """关闭连接池"""
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+            self._pid = None
+
+    def _reset_after_fork(self):
+        # 子进程中不能关闭父进程的连接，直接丢弃引用；锁可能在fork时被持有，需要重建
+        self._lock = threading.Lock()
+        self._session = None
+        self._pid = None
+
+
+_default_transport: Optional[HttpTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_default_transport() -> HttpTransport:
+    """获取进程内共享的默认transport"""
+    global _default_transport
+    if _default_transport is None:
+        with _default_lock:
+            if _default_transport is None:
+                _default_transport = HttpTransport()
+    return _default_transport
+
+
+def _after_fork_in_child():
+    global _default_lock
+    _default_lock = threading.Lock()
+    for transport in list(_transports):
+        transport._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,270 @@
+# Inbound X-A-Signature verification with a replay-window cache, plus ASGI / WSGI middleware
+
+import hmac
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from ..utils.sign import ASignature, get_signing_engine
+    from ..utils.logger import get_logger
+    from .config import config_manager
+    from .exceptions import SignatureVerificationError
+except ImportError:
+    import sys
+
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.utils.sign import ASignature, get_signing_engine
+    from aflow_client_python.utils.logger import get_logger
+    from aflow_client_python.core.config import config_manager
+    from aflow_client_python.core.exceptions import SignatureVerificationError
+
+logger = get_logger()
+
+# 校验通过后签名内容（enterpriseCode / appId / timestamp / cipher）保存在 ASGI scope / WSGI environ 的这个键下
+CLAIMS_KEY = "aflow.signature"
+
+SIGNATURE_HEADER = "X-A-Signature"
+
+
+class ReplayCache:
+    """
+    防重放缓存：记录时间窗口内已经接受过的签名，同一个签名第二次出现时拒绝
+
+    条目在 ttl 秒后过期（时间戳超出窗口的签名在校验时间戳时已被拒绝，不需要再记录），
+    最多 max_entries 个，超出时淘汰最早的条目；max_entries 应大于窗口内的请求数（每秒请求数 × ttl）
+    """
+
+    def __init__(self, ttl: float, max_entries: Optional[int] = None):
+        self.ttl = ttl
+        self.max_entries: int = max_entries or config_manager.get("verify_replay_max_entries")
+        self._lock = threading.Lock()
+        # 按加入顺序排列，过期时间单调递增，从最旧的一端清理
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """登记 key，第一次出现返回 True，窗口内重复出现返回 False"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entries = self._entries
+            while entries:
+                oldest, expires_at = next(iter(entries.items()))
+                if expires_at > now:
+                    break
+                del entries[oldest]
+            if key in entries:
+                return False
+            entries[key] = now + self.ttl
+            if len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self._evicted += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """当前条目数，以及未过期就因容量不足被淘汰的条目数（大于 0 时应调大 max_entries）"""
+        with self._lock:
+            return {"entries": len(self._entries), "evicted": self._evicted}
+
+
+class SignatureVerifier:
+    """
+    校验入站请求的 X-A-Signature
+
+    签名是 {"enterpriseCode","appId","timestamp","cipher"} 的十六进制编码。校验依次检查：
+    格式、appId / enterpriseCode 是否为已知凭证、timestamp 与本地时间相差不超过 window 秒、
+    按请求体和 timestamp 重新签名后与收到的签名一致（常量时间比较）、窗口内没有出现过。
+    重新签名使用 ASignature 的签名器（凭证只编码一次），默认使用纯 Python 签名实现：与加密库输出一致，
+    且没有 ctypes 调用的开销，小请求体的整个校验在 10 微秒左右（见 benchmarks/verify_middleware.py）。
+
+    Args:
+        credentials: 允许的凭证列表（app_id / enterprise_code / app_secret），默认使用 APP_ID 等环境变量
+        window: 允许的时间戳偏差（秒），默认读取 SIGNATURE_VERIFY_WINDOW
+        replay_cache: 防重放缓存，默认创建一个，保留 2 × window 秒（时间戳可能在窗口两侧）
+        signature: 签名工具，默认使用纯 Python 签名引擎的 ASignature
+    """
+
+    def __init__(self, credentials: Optional[Iterable[Dict[str, str]]] = None, window: Optional[float] = None,
+                 replay_cache: Optional[ReplayCache] = None, signature: Optional[ASignature] = None):
+        self.window: float = window or config_manager.get("verify_window")
+        self.replay_cache = replay_cache or ReplayCache(ttl=2 * self.window)
+        self.signature = signature or ASignature(get_signing_engine("python"))
+        if credentials is None:
+            credentials = [config_manager.get_credential()]
+        self._credentials: Dict[Tuple[str, str], Dict[str, str]] = {
+            (credential["app_id"], credential["enterprise_code"]): credential for credential in credentials
+        }
+        self._window_ms = self.window * 1000
+
+    def verify(self, body: bytes, signature: Optional[str], now_ms: Optional[float] = None) -> Dict[str, Any]:
+        """校验通过时返回签名内容，否则抛出 SignatureVerificationError"""
+        if not signature:
+            raise SignatureVerificationError("missing", f"缺少 {SIGNATURE_HEADER}")
+        try:
+            claims = json.loads(bytes.fromhex(signature))
+            app_id = claims["appId"]
+            enterprise_code = claims["enterpriseCode"]
+            timestamp = claims["timestamp"]
+            cipher = claims["cipher"]
+        except (ValueError, TypeError, KeyError):
+            raise SignatureVerificationError("malformed", "签名格式错误")
+        if type(timestamp) is not int or not all(isinstance(v, str) for v in (app_id, enterprise_code, cipher)):
+            raise SignatureVerificationError("malformed", "签名字段类型错误")
+
+        credential = self._credentials.get((app_id, enterprise_code))
+        if credential is None:
+            raise SignatureVerificationError("unknown_app", f"未知的应用: {enterprise_code}/{app_id}")
+
+        now_ms = time.time() * 1000 if now_ms is None else now_ms
+        if abs(now_ms - timestamp) > self._window_ms:
+            raise SignatureVerificationError("expired", f"时间戳超出允许范围: {timestamp}")
+
+        expected = self.signature.signer(credential).sign(body, timestamp)
+        if not hmac.compare_digest(expected, signature.upper()):
+            raise SignatureVerificationError("mismatch", "签名与请求体不一致")
+
+        if not self.replay_cache.add((app_id, enterprise_code, timestamp, cipher)):
+            raise SignatureVerificationError("replayed", "重复的请求")
+        return claims
+
+
+def _rejection(error: SignatureVerificationError) -> bytes:
+    logger.debug(str(error))
+    return json.dumps({"status": 401, "msg": str(error)}, ensure_ascii=False).encode("utf-8")
+
+
+class ASGISignatureMiddleware:
+    """
+    ASGI 中间件（FastAPI / Starlette 等）：校验 X-A-Signature，失败时直接返回 401
+
+    请求体读取一次后原样交给下游应用；签名内容保存在 scope["aflow.signature"]。
+    非 http 请求（lifespan、websocket）和 exclude_paths 开头的路径（如健康检查）不校验。
+
+    Example:
+        app.add_middleware(ASGISignatureMiddleware, exclude_paths=("/health",))
+    """
+
+    def __init__(self, app: Callable, verifier: Optional[SignatureVerifier] = None,
+                 exclude_paths: Iterable[str] = ()):
+        self.app = app
+        self.verifier = verifier or SignatureVerifier()
+        self.exclude_paths = tuple(exclude_paths)
+        self._header = SIGNATURE_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (self.exclude_paths and scope["path"].startswith(self.exclude_paths)):
+            await self.app(scope, receive, send)
+            return
+
+        signature = None
+        for name, value in scope["headers"]:
+            if name == self._header:
+                signature = value.decode("latin-1")
+                break
+
+        try:
+            body = await self._read_body(receive) if signature else b""
+            claims = self.verifier.verify(body, signature)
+        except SignatureVerificationError as e:
+            await self._reject(send, e)
+            return
+        except ConnectionError:
+            # 客户端在请求体发送完之前断开
+            return
+
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app({**scope, CLAIMS_KEY: claims}, replay_receive, send)
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ConnectionError("客户端已断开")
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    @staticmethod
+    async def _reject(send, error: SignatureVerificationError):
+        payload = _rejection(error)
+        await send({
+            "type": "http.response.start",
+            "status": 401,
+            "headers": [
+                (b"content-type", b"application/json; charset=utf-8"),
+                (b"content-length", str(len(payload)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+
+class WSGISignatureMiddleware:
+    """
+    WSGI 中间件（Flask / Django 等）：校验 X-A-Signature，失败时直接返回 401
+
+    请求体读取后替换 wsgi.input，下游应用可以照常读取；签名内容保存在 environ["aflow.signature"]。
+    exclude_paths 开头的路径（如健康检查）不校验。
+
+    Example:
+        app.wsgi_app = WSGISignatureMiddleware(app.wsgi_app, exclude_paths=("/health",))
+    """
+
+    def __init__(self, app: Callable, verifier: Optional[SignatureVerifier] = None,
+                 exclude_paths: Iterable[str] = ()):
+        self.app = app
+        self.verifier = verifier or SignatureVerifier()
+        self.exclude_paths = tuple(exclude_paths)
+        self._environ_key = "HTTP_" + SIGNATURE_HEADER.upper().replace("-", "_")
+
+    def __call__(self, environ, start_response):
+        if self.exclude_paths and environ.get("PATH_INFO", "").startswith(self.exclude_paths):
+            return self.app(environ, start_response)
+
+        signature = environ.get(self._environ_key)
+        try:
+            body = self._read_body(environ) if signature else b""
+            claims = self.verifier.verify(body, signature)
+        except SignatureVerificationError as e:
+            payload = _rejection(e)
+            start_response("401 Unauthorized", [
+                ("Content-Type", "application/json; charset=utf-8"),
+                ("Content-Length", str(len(payload))),
+            ])
+            return [payload]
+
+        environ["wsgi.input"] = io.BytesIO(body)
+        environ["CONTENT_LENGTH"] = str(len(body))
+        environ[CLAIMS_KEY] = claims
+        return self.app(environ, start_response)
+
+    @staticmethod
+    def _read_body(environ) -> bytes:
+        length = environ.get("CONTENT_LENGTH")
+        if not length:
+            # 没有 Content-Length 时只有服务器声明 wsgi.input_terminated 才能读到结尾
+            return environ["wsgi.input"].read() if environ.get("wsgi.input_terminated") else b""
+        try:
+            length = int(length)
+        except ValueError:
+            raise SignatureVerificationError("malformed", f"Content-Length 错误: {length}")
+        return environ["wsgi.input"].read(length) if length > 0 else b""
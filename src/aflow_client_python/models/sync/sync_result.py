@@ -5,7 +5,8 @@ class SyncFailDetail(BaseModel):
     """
     同步失败详情
     """
-    model_config = ConfigDict(populate_by_name=True)  # 允许通过字段名初始化
+    # 允许通过字段名初始化；保留服务端返回的其他字段（如 userId / deptId），用于映射回原始数据
+    model_config = ConfigDict(populate_by_name=True, extra="allow")
 
     code: str = Field(..., alias="code", description="错误代码")
     message: str = Field(..., alias="message", description="错误消息")
@@ -0,0 +1,120 @@
+# Pluggable JSON codecs used to serialize request bodies exactly once
+
+import hashlib
+import json
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+# orjson / msgspec 为可选依赖，安装后自动启用
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _default(obj: Any) -> Any:
+    """模型按别名输出，与 model_dump(by_alias=True) 一致"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(by_alias=True)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def fingerprint(item: BaseModel) -> str:
+    """按别名输出、键排序后计算摘要，与序列化使用的 JSON 库无关"""
+    canonical = json.dumps(item.model_dump(by_alias=True), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class JsonCodec:
+    """JSON 编解码器基类，dumps 直接输出 bytes，签名和发送使用同一份数据"""
+
+    name = ""
+
+    def dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class StdlibJsonCodec(JsonCodec):
+    """标准库 json，输出与 json.dumps(payload) 保持一致"""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=_default).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("未安装 orjson，请执行 pip install orjson")
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("未安装 msgspec，请执行 pip install msgspec")
+        self._encoder = msgspec.json.Encoder(enc_hook=_default)
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self._decoder.decode(data)
+
+
+_CODECS: Dict[str, Type[JsonCodec]] = {
+    StdlibJsonCodec.name: StdlibJsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+}
+
+
+def get_codec(name: Optional[str] = None) -> JsonCodec:
+    """
+    获取 JSON 编解码器
+
+    Args:
+        name: json / orjson / msgspec / auto，默认读取 JSON_CODEC 环境变量；
+              auto 时依次尝试 orjson、msgspec，都未安装则使用标准库
+    """
+    if name is None:
+        # 延迟导入，避免 utils 依赖 core
+        try:
+            from ..core.config import config_manager
+        except ImportError:
+            from aflow_client_python.core.config import config_manager
+        name = config_manager.get("json_codec")
+
+    name = (name or "auto").lower()
+    if name == "auto":
+        if orjson is not None:
+            return OrjsonCodec()
+        if msgspec is not None:
+            return MsgspecCodec()
+        return StdlibJsonCodec()
+    if name not in _CODECS:
+        raise ValueError(f"不支持的 JSON 编解码器: {name}，可选值: auto, {', '.join(_CODECS)}")
+    return _CODECS[name]()
@@ -0,0 +1,78 @@
+# Streaming gzip / deflate compression of request bodies
+
+import zlib
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional
+
+GZIP = "gzip"
+DEFLATE = "deflate"
+
+# HTTP 的 deflate 指 zlib 格式（RFC 1950），gzip 需要 zlib 的 gzip 头和校验
+_WBITS = {GZIP: 16 + zlib.MAX_WBITS, DEFLATE: zlib.MAX_WBITS}
+
+
+class RequestCompressor:
+    """
+    请求体压缩，超过 min_size 字节时按 chunk_size 分段流式压缩，以分块传输（chunked）发送
+
+    压缩后的数据边生成边发送，内存中不会同时保留原始和压缩后的完整请求体；
+    签名按未压缩的请求体计算（服务端解压后校验），每次尝试重新生成压缩流，重试时可以重复发送
+    """
+
+    def __init__(self, encoding: str = GZIP, min_size: int = 8192, level: int = 6, chunk_size: int = 64 * 1024):
+        if encoding not in _WBITS:
+            raise ValueError(f"不支持的压缩方式: {encoding}，可选值: {', '.join(_WBITS)}")
+        self.encoding = encoding
+        self.min_size = min_size
+        self.level = level
+        self.chunk_size = chunk_size
+
+    def should_compress(self, body) -> bool:
+        return isinstance(body, (bytes, bytearray)) and len(body) >= self.min_size
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Content-Encoding": self.encoding}
+
+    def stream(self, body: bytes, on_complete: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+        """按段压缩 body，依次产出压缩后的数据；on_complete 在压缩完成后以压缩后的总字节数回调（用于按实际发送的字节数限速）"""
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS[self.encoding])
+        view = memoryview(body)
+        size = 0
+        for offset in range(0, len(view), self.chunk_size):
+            compressed = compressor.compress(view[offset:offset + self.chunk_size])
+            if compressed:
+                size += len(compressed)
+                yield compressed
+        compressed = compressor.flush()
+        size += len(compressed)
+        yield compressed
+        if on_complete is not None:
+            on_complete(size)
+
+    async def stream_async(self, body: bytes,
+                           on_complete: Optional[Callable[[int], None]] = None) -> AsyncIterator[bytes]:
+        """stream 的异步版本，用于 aiohttp"""
+        for compressed in self.stream(body, on_complete):
+            yield compressed
+
+
+def get_request_compressor(encoding: Optional[str] = None) -> Optional[RequestCompressor]:
+    """
+    按配置创建请求体压缩器
+
+    Args:
+        encoding: gzip / deflate / none，默认读取 REQUEST_COMPRESSION 环境变量；none 时返回 None
+    """
+    # 延迟导入，避免 utils 依赖 core
+    try:
+        from ..core.config import config_manager
+    except ImportError:
+        from aflow_client_python.core.config import config_manager
+    encoding = (encoding or config_manager.get("request_compression") or "none").lower()
+    if encoding == "none":
+        return None
+    return RequestCompressor(
+        encoding,
+        min_size=config_manager.get("request_compression_min_size"),
+        level=config_manager.get("request_compression_level"),
+    )
@@ -1,24 +1,80 @@
 import ctypes
+import hashlib
 import json
+import threading
 import time
 import os
 import platform
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .logger import get_logger
+except ImportError:
+    import sys
 
-class ASignature:
-    def __init__(self,):
-        # 根据操作系统选择库文件
-        system = platform.system().lower()
+    sys.path.insert(
+        0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    )
+    from aflow_client_python.utils.logger import get_logger
+
+logger = get_logger()
+
+# sign_many 时每个线程至少分到的请求体数量，数量太少时线程切换的开销超过签名本身
+_MIN_BODIES_PER_WORKER = 16
+
+
+def _library_path() -> str:
+    """根据操作系统选择库文件"""
+    system = platform.system().lower()
+
+    if system == "linux":
+        lib_filename = "libencrypt.so"
+    elif system == "darwin":  # macOS
+        lib_filename = "libencrypt.dylib"
+    else:
+        lib_filename = "libencrypt.dll"
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, lib_filename)
+
+
+class BaseSigningEngine:
+    """签名引擎基类，子类实现 _generate（参数均已编码为 bytes）和 hex_to_string"""
+
+    backend = ""
+
+    def sign(self, app_id: str, enterprise_code: str, app_secret: str,
+             request_body: Union[str, bytes], timestamp: Optional[int] = None) -> str:
+        """生成十六进制格式的签名，request_body 为 bytes 时直接使用，需与实际发送的请求体一致"""
+        return self.bind(app_id, enterprise_code, app_secret).sign(request_body, timestamp)
+
+    def bind(self, app_id: str, enterprise_code: str, app_secret: str,
+             clock: Optional[Callable[[], int]] = None) -> "CredentialSigner":
+        """绑定一组凭证，凭证只编码一次；clock 返回签名使用的当前时间（毫秒），默认为本地时间"""
+        return CredentialSigner(self, app_id, enterprise_code, app_secret, clock)
+
+    def _generate(self, app_id: bytes, enterprise_code: bytes, app_secret: bytes,
+                  request_body: bytes, timestamp: int) -> str:
+        raise NotImplementedError
+
+    def hex_to_string(self, hex_str: str) -> str:
+        raise NotImplementedError
+
+
+class SigningEngine(BaseSigningEngine):
+    """
+    加密库的封装，每个进程只加载一次（见 get_signing_engine）
 
-        if system == "linux":
-            lib_filename = "libencrypt.so"
-        elif system == "darwin":  # macOS
-            lib_filename = "libencrypt.dylib"
-        else:
-            lib_filename = "libencrypt.dll"
+    C 函数返回的字符串由 malloc 分配：返回值声明为 c_void_p，复制为 Python 字符串后立即调用 free_string 释放，
+    不会随签名次数泄漏内存。C 端不使用全局状态，调用期间 ctypes 会释放 GIL，多个线程可以同时签名。
+    """
 
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        lib_path = os.path.join(base_dir, lib_filename)
+    backend = "native"
+
+    def __init__(self, lib_path: Optional[str] = None):
+        lib_path = lib_path or _library_path()
 
         # 检查库文件是否存在
         if not os.path.exists(lib_path):
@@ -26,12 +82,10 @@ class ASignature:
 
         try:
             self.lib = ctypes.CDLL(lib_path)
-
-
         except OSError as e:
             raise OSError(f"加载加密库失败: {e}")
 
-        # 定义函数签名
+        # 定义函数签名，返回值按指针接收，便于释放
         self.lib.generate_signature.argtypes = [
             ctypes.c_char_p,  # app_id
             ctypes.c_char_p,  # enterprise_code
@@ -39,66 +93,234 @@ class ASignature:
             ctypes.c_char_p,  # request_body
             ctypes.c_longlong  # timestamp
         ]
-        self.lib.generate_signature.restype = ctypes.c_char_p
+        self.lib.generate_signature.restype = ctypes.c_void_p
 
-        self.lib.free_string.argtypes = [ctypes.c_char_p]
+        self.lib.free_string.argtypes = [ctypes.c_void_p]
         self.lib.free_string.restype = None
 
         # 注册 hex_to_string 函数签名
         self.lib.hex_to_string.argtypes = [ctypes.c_char_p]
-        self.lib.hex_to_string.restype = ctypes.c_char_p
-
-    def generate_signature(self, credential: dict, request_body: str) -> str:
-        """生成十六进制格式的签名"""
-        app_id = credential.get("app_id", "")
-        enterprise_code = credential.get("enterprise_code", "")
-        app_secret = credential.get("app_secret", "")
-
-        timestamp = int(time.time() * 1000)
-
-        # 调用C函数
-        result = self.lib.generate_signature(
-            app_id.encode('utf-8'),
-            enterprise_code.encode('utf-8'),
-            app_secret.encode('utf-8'),
-            request_body.encode('utf-8'),
-            timestamp
+        self.lib.hex_to_string.restype = ctypes.c_void_p
+
+    def _take_string(self, pointer: Optional[int], func: str) -> str:
+        """复制 C 字符串并释放C端内存"""
+        if not pointer:
+            raise ValueError(f"加密库 {func} 返回空指针")
+        try:
+            return ctypes.string_at(pointer).decode("utf-8")
+        finally:
+            self.lib.free_string(pointer)
+
+    def _generate(self, app_id: bytes, enterprise_code: bytes, app_secret: bytes,
+                  request_body: bytes, timestamp: int) -> str:
+        pointer = self.lib.generate_signature(app_id, enterprise_code, app_secret, request_body, timestamp)
+        return self._take_string(pointer, "generate_signature")
+
+    def hex_to_string(self, hex_str: str) -> str:
+        """将十六进制字符串转换为字符串"""
+        return self._take_string(self.lib.hex_to_string(hex_str.encode('utf-8')), "hex_to_string")
+
+
+def _c_string(value: bytes) -> bytes:
+    """按 C 字符串处理：截断到第一个 NUL"""
+    end = value.find(b"\0")
+    return value if end < 0 else value[:end]
+
+
+class PythonSigningEngine(BaseSigningEngine):
+    """
+    纯 Python 实现的签名引擎，输出与加密库逐字节一致（见 benchmarks/sign_conformance.py），不需要加载动态库
+
+    cipher = md5(md5(enterprise_code + app_secret + request_body + timestamp))，均为小写十六进制；
+    与 enterpriseCode / appId / timestamp 拼接为 JSON（与加密库一致，不做转义），再整体转换为大写十六进制。
+    与加密库相同，各参数按 C 字符串处理，遇到 NUL 截断；timestamp 为 0 时使用当前时间（精确到秒）。
+    hashlib 计算较大数据的摘要时会释放 GIL，sign_many 同样可以并行
+    """
+
+    backend = "python"
+
+    def _generate(self, app_id: bytes, enterprise_code: bytes, app_secret: bytes,
+                  request_body: bytes, timestamp: int) -> str:
+        app_id, enterprise_code, app_secret = _c_string(app_id), _c_string(enterprise_code), _c_string(app_secret)
+        if timestamp == 0:
+            timestamp = int(time.time()) * 1000
+        ts = str(timestamp).encode("ascii")
+
+        digest = hashlib.md5(enterprise_code + app_secret)
+        digest.update(_c_string(request_body))
+        digest.update(ts)
+        cipher = hashlib.md5(digest.hexdigest().encode("ascii")).hexdigest().encode("ascii")
+
+        signature = (b'{"enterpriseCode":"' + enterprise_code + b'","appId":"' + app_id
+                     + b'","timestamp":' + ts + b',"cipher":"' + cipher + b'"}')
+        return signature.hex().upper()
+
+    def hex_to_string(self, hex_str: str) -> str:
+        """将十六进制字符串转换为字符串"""
+        return _c_string(bytes.fromhex(hex_str)).decode("utf-8")
+
+
+class CredentialSigner:
+    """
+    绑定一组凭证的签名器，凭证在创建时编码一次
+
+    sign_many 将请求体按顺序切分为连续的若干段，在进程内共享的线程池中并行签名（C 调用期间不持有 GIL），
+    返回的签名与 bodies 顺序一致
+    """
+
+    def __init__(self, engine: BaseSigningEngine, app_id: str, enterprise_code: str, app_secret: str,
+                 clock: Optional[Callable[[], int]] = None):
+        self.engine = engine
+        self.clock = clock
+        self._credential = (app_id.encode('utf-8'), enterprise_code.encode('utf-8'), app_secret.encode('utf-8'))
+
+    def sign(self, request_body: Union[str, bytes], timestamp: Optional[int] = None) -> str:
+        """生成十六进制格式的签名，request_body 为 bytes 时直接使用，需与实际发送的请求体一致"""
+        return self.engine._generate(
+            *self._credential,
+            request_body if isinstance(request_body, bytes) else request_body.encode('utf-8'),
+            self._now_ms() if timestamp is None else timestamp
+        )
+
+    def _now_ms(self) -> int:
+        return self.clock() if self.clock is not None else int(time.time() * 1000)
+
+    def sign_many(self, bodies: Sequence[Union[str, bytes]], max_workers: Optional[int] = None) -> List[str]:
+        """批量签名，max_workers 默认为 CPU 核数；数量较少时直接在当前线程签名"""
+        max_workers = max_workers or os.cpu_count() or 1
+        workers = min(max_workers, len(bodies) // _MIN_BODIES_PER_WORKER)
+        if workers <= 1:
+            return [self.sign(body) for body in bodies]
+        size = -(-len(bodies) // workers)
+        futures = [
+            _get_executor().submit(self._sign_slice, bodies[start:start + size])
+            for start in range(0, len(bodies), size)
+        ]
+        return [signature for future in futures for signature in future.result()]
+
+    def _sign_slice(self, bodies: Sequence[Union[str, bytes]]) -> List[str]:
+        return [self.sign(body) for body in bodies]
+
+
+_BACKENDS = {
+    SigningEngine.backend: SigningEngine,
+    PythonSigningEngine.backend: PythonSigningEngine,
+}
+
+_engines: Dict[str, BaseSigningEngine] = {}
+_engine_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """批量签名使用的线程池，fork 后在子进程中重建"""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _engine_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="aflow-sign")
+                _executor_pid = pid
+    return _executor
+
+
+def _create_engine(backend: str) -> BaseSigningEngine:
+    if backend == "auto":
+        try:
+            return SigningEngine()
+        except OSError as e:
+            logger.warning(f"{e}，使用纯 Python 签名实现")
+            return PythonSigningEngine()
+    if backend not in _BACKENDS:
+        raise ValueError(f"不支持的签名实现: {backend}，可选值: auto, {', '.join(_BACKENDS)}")
+    return _BACKENDS[backend]()
+
+
+def get_signing_engine(backend: Optional[str] = None) -> BaseSigningEngine:
+    """
+    进程内共享的签名引擎，每种实现第一次调用时创建
+
+    Args:
+        backend: native / python / auto，默认读取 SIGN_BACKEND 环境变量；
+                 auto 时优先使用加密库，加载失败（库文件缺失、平台不支持等）时使用纯 Python 实现
+    """
+    if backend is None:
+        # 延迟导入，避免 utils 依赖 core
+        try:
+            from ..core.config import config_manager
+        except ImportError:
+            from aflow_client_python.core.config import config_manager
+        backend = config_manager.get("sign_backend")
+    backend = (backend or "auto").lower()
+
+    engine = _engines.get(backend)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(backend)
+            if engine is None:
+                engine = _engines[backend] = _create_engine(backend)
+    return engine
+
+
+class ASignature:
+    """
+    签名工具，所有实例共享进程内的签名引擎（见 get_signing_engine），创建实例不会重复加载加密库
+
+    同一组凭证只编码一次；不传凭证时使用环境变量 APP_ID / ENTERPRISE_CODE / APP_SECRET，第一次签名时读取。
+    clock 返回签名时间戳（毫秒），客户端传入按服务端时钟偏差校正的时间（见 ClockSkewEstimator），默认为本地时间
+    """
+
+    def __init__(self, engine: Optional[BaseSigningEngine] = None, clock: Optional[Callable[[], int]] = None):
+        self.engine = engine or get_signing_engine()
+        self.clock = clock
+        # 纯 Python 实现没有加密库对象
+        self.lib = getattr(self.engine, "lib", None)
+        self._signers: Dict[Tuple[str, str, str], CredentialSigner] = {}
+        self._env_signer: Optional[CredentialSigner] = None
+
+    def signer(self, credential: dict, env_fallback: bool = False) -> CredentialSigner:
+        """按凭证获取（并缓存）签名器，env_fallback 为 True 时缺少的字段从环境变量读取"""
+        if env_fallback and not credential:
+            if self._env_signer is None:
+                self._env_signer = self.engine.bind(os.getenv("APP_ID", ""), os.getenv("ENTERPRISE_CODE", ""),
+                                                    os.getenv("APP_SECRET", ""), self.clock)
+            return self._env_signer
+        key = (
+            credential.get("app_id", os.getenv("APP_ID", "") if env_fallback else ""),
+            credential.get("enterprise_code", os.getenv("ENTERPRISE_CODE", "") if env_fallback else ""),
+            credential.get("app_secret", os.getenv("APP_SECRET", "") if env_fallback else ""),
         )
+        signer = self._signers.get(key)
+        if signer is None:
+            signer = self._signers[key] = self.engine.bind(*key, clock=self.clock)
+        return signer
 
-        # 复制结果并释放C端内存
-        signature_hex = result.decode('utf-8')
+    def generate_signature(self, credential: dict, request_body: Union[str, bytes]) -> str:
+        """生成十六进制格式的签名，request_body 为 bytes 时直接使用，需与实际发送的请求体一致"""
+        return self.signer(credential).sign(request_body)
 
-        return signature_hex
+    def generate_signatures(self, credential: dict, request_bodies: Sequence[Union[str, bytes]],
+                            max_workers: Optional[int] = None) -> List[str]:
+        """批量生成签名，顺序与 request_bodies 一致，见 CredentialSigner.sign_many"""
+        return self.signer(credential).sign_many(request_bodies, max_workers)
 
-    def create_signature(self, request_body: str, credential: dict={}) -> str:
+    def create_signature(self, request_body: Union[str, bytes], credential: dict={}) -> str:
         """
         该方法用于用户生成签名使用，自动从环境中加载变量信息
         """
-        app_id = credential.get("app_id", os.getenv("APP_ID", ""))
-        enterprise_code = credential.get("enterprise_code", os.getenv("ENTERPRISE_CODE", ""))
-        app_secret = credential.get("app_secret", os.getenv("APP_SECRET", ""))
-
-        timestamp = int(time.time() * 1000)
-
-        # 调用C函数
-        result = self.lib.generate_signature(
-            app_id.encode('utf-8'),
-            enterprise_code.encode('utf-8'),
-            app_secret.encode('utf-8'),
-            request_body.encode('utf-8'),
-            timestamp
-        )
-
-        # 复制结果并释放C端内存
-        signature_hex = result.decode('utf-8')
+        return self.signer(credential, env_fallback=True).sign(request_body)
 
-        return signature_hex
+    def create_signatures(self, request_bodies: Sequence[Union[str, bytes]], credential: dict={},
+                          max_workers: Optional[int] = None) -> List[str]:
+        """create_signature 的批量版本，顺序与 request_bodies 一致"""
+        return self.signer(credential, env_fallback=True).sign_many(request_bodies, max_workers)
 
     def hex_to_string(self, hex_str: str) -> str:
         """
         将十六进制字符串转换为字符串
         """
-        return self.lib.hex_to_string(hex_str.encode('utf-8')).decode("utf-8")
+        return self.engine.hex_to_string(hex_str)
 
 
 # 使用示例
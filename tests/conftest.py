@@ -0,0 +1,26 @@
+# Shared fixtures for the unit tests
+
+import os
+import sys
+
+import pytest
+
+# 未安装时直接从源码目录导入
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from aflow_client_python.models import ThirdPartyTaskSyncReq  # noqa: E402
+
+
+def make_task(order_id: int, result: str = "ing", update_time: str = "2024-01-01 00:00:00") -> ThirdPartyTaskSyncReq:
+    return ThirdPartyTaskSyncReq(
+        third_order_id=order_id,
+        order_result=result,
+        initiator="u1",
+        update_time=update_time,
+        tasks=[{"thirdTaskId": "t1", "taskName": "审批", "assigneeUserCode": ["u2"], "taskResult": "new"}],
+    )
+
+
+@pytest.fixture
+def task_factory():
+    return make_task
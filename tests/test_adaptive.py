@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from aflow_client_python.core import adaptive as adaptive_module
+from aflow_client_python.core.adaptive import AdaptiveBatchController
+from aflow_client_python.core.client import AFlowClient
+from aflow_client_python.models import UserSyncItem
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(adaptive_module.time, "monotonic", fake)
+    return fake
+
+
+def make_controller(**kwargs) -> AdaptiveBatchController:
+    options = dict(initial_size=100, min_size=10, max_size=200, initial_in_flight=2, max_in_flight=4,
+                   target_latency=1.0, step=10)
+    options.update(kwargs)
+    return AdaptiveBatchController(**options)
+
+
+def test_additive_increase_up_to_max():
+    controller = make_controller()
+    controller.on_success(0.0, 0.1)
+    assert controller.batch_size == 110
+    assert controller.in_flight == 2
+
+    for _ in range(20):
+        controller.on_success(0.0, 0.1)
+    assert controller.batch_size == 200
+    assert controller.in_flight == 4
+
+
+def test_slow_success_halves_batch_only(clock):
+    controller = make_controller()
+    controller.on_success(clock.now, 2.0)
+
+    assert controller.batch_size == 50
+    assert controller.in_flight == 2
+
+
+def test_error_halves_size_and_in_flight_once_per_congestion(clock):
+    controller = make_controller(initial_in_flight=4)
+    started_at = clock.now
+    clock.now += 1
+    controller.on_error(started_at)
+    # 同一时刻在途的请求随后失败，不再重复减小
+    controller.on_error(started_at)
+    assert (controller.batch_size, controller.in_flight) == (50, 2)
+
+    controller.on_error(clock.now)
+    assert (controller.batch_size, controller.in_flight) == (25, 1)
+    controller.on_error(clock.now)
+    assert (controller.batch_size, controller.in_flight) == (12, 1)
+    controller.on_error(clock.now)
+    assert controller.batch_size == 10
+
+
+def test_too_large_ceiling_can_go_below_min_size():
+    controller = make_controller()
+    controller.on_too_large(100)
+    assert controller.batch_size == 50
+    controller.on_too_large(8)
+    assert controller.batch_size == 4
+
+    # 之后的增加不会超过 413 学到的上限
+    controller.on_success(0.0, 0.1)
+    snapshot = controller.snapshot()
+    assert (snapshot["batch_size"], snapshot["ceiling"], snapshot["splits"]) == (4, 4, 2)
+
+
+def test_invalid_decrease_factor():
+    with pytest.raises(ValueError):
+        make_controller(decrease_factor=1.0)
+
+
+class FakeResponse:
+    def __init__(self, body: dict, status_code: int = 200):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+        self.headers = {}
+
+
+class LimitedTransport:
+    """单次超过 limit 条时返回 413"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.sizes = []
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        users = json.loads(data)["users"]
+        self.sizes.append(len(users))
+        if len(users) > self.limit:
+            return FakeResponse({"msg": "payload too large"}, status_code=413)
+        return FakeResponse({"status": 0, "msg": "success",
+                             "data": {"successCount": len(users), "failCount": 0, "failDetails": []}})
+
+
+def test_client_splits_on_413(monkeypatch):
+    monkeypatch.setenv("APP_ID", "app")
+    monkeypatch.setenv("APP_SECRET", "secret")
+    monkeypatch.setenv("ENTERPRISE_CODE", "ent")
+    transport = LimitedTransport(limit=2)
+    client = AFlowClient(base_url="http://aflow.test", transport=transport, clock_skew=None, adaptive=True,
+                         chunk_size=8, max_workers=1)
+    client._controllers["users"] = make_controller(initial_size=8, min_size=4, initial_in_flight=1)
+    users = [UserSyncItem(user_id=f"u{i}", user_name=f"user{i}", real_name=f"用户{i}",
+                          email=f"u{i}@example.com", mobile="13800000000", dept_id="d1") for i in range(8)]
+
+    outcome = client.sync_user(users)
+
+    assert outcome["status"] == 0
+    assert outcome["data"]["successCount"] == 8
+    assert transport.sizes[:3] == [8, 4, 2]
+    assert sum(size for size in transport.sizes if size <= 2) == 8
+    assert outcome["adaptive"]["ceiling"] == 2
@@ -0,0 +1,114 @@
+from aflow_client_python.core.batch import (
+    CHUNK_FAILED_CODE,
+    ChunkReport,
+    FailureCollector,
+    SyncOutcome,
+    chunked,
+    combine_chunk_reports,
+    merge_retry_outcome,
+    merge_sync_results,
+)
+from aflow_client_python.models import DepartmentSyncItem, SyncFailDetail, SyncResult
+
+
+def dept(dept_id: str, parent_id: str = None) -> DepartmentSyncItem:
+    return DepartmentSyncItem(dept_id=dept_id, dept_name=dept_id, parent_id=parent_id, order_num=1, status=1)
+
+
+def result(success: int, details=()) -> SyncResult:
+    return SyncResult(success_count=success, fail_count=len(details), fail_details=list(details))
+
+
+def test_chunked_reads_size_before_each_chunk():
+    sizes = iter([2, 3, 10, 10])
+    assert list(chunked(range(7), lambda: next(sizes))) == [[0, 1], [2, 3, 4], [5, 6]]
+
+
+def test_collector_maps_by_exact_key():
+    items = [dept("D1"), dept("D2", "D1"), dept("D3", "D1")]
+    collector = FailureCollector("dept_id")
+    details = [
+        SyncFailDetail.model_validate({"code": "E1", "message": "名称重复", "deptId": "D3"}),
+        SyncFailDetail(code="D2", message="上级部门 D1 已停用"),
+        SyncFailDetail(code="E2", message="D1: 编码重复"),
+    ]
+    collector(ChunkReport(index=0, size=3, elapsed_ms=1.0, success=True, result=result(0, details)), items)
+
+    assert [(failed.item.dept_id, failed.detail.code) for failed in collector.failed] == [
+        ("D3", "E1"), ("D2", "D2"), ("D1", "E2"),
+    ]
+    assert collector.unmapped == []
+
+
+def test_collector_does_not_attribute_mentioned_keys():
+    items = [dept("D1"), dept("D2", "D1")]
+    collector = FailureCollector("dept_id")
+    detail = SyncFailDetail(code="PARENT_INVALID", message="部门 D2 的上级 D1 不存在")
+    collector(ChunkReport(index=0, size=2, elapsed_ms=1.0, success=True, result=result(1, [detail])), items)
+
+    assert collector.failed == []
+    assert collector.unmapped == [detail]
+
+
+def test_collector_marks_whole_chunk_on_request_failure():
+    items = [dept("D1"), dept("D2")]
+    collector = FailureCollector("dept_id")
+    collector(ChunkReport(index=3, size=2, elapsed_ms=1.0, success=False), items)
+
+    assert [failed.item for failed in collector.failed] == items
+    assert all(failed.detail.code == CHUNK_FAILED_CODE for failed in collector.failed)
+
+
+def test_merge_reports_failure_status_when_items_fail():
+    detail = SyncFailDetail(code="E", message="bad")
+    reports = [
+        ChunkReport(index=1, size=2, elapsed_ms=1.0, success=True, result=result(1, [detail])),
+        ChunkReport(index=0, size=2, elapsed_ms=1.0, success=True, result=result(2)),
+    ]
+    merged = merge_sync_results(reports)
+
+    assert merged["status"] == -1
+    assert merged["data"]["successCount"] == 3
+    assert merged["data"]["failCount"] == 1
+    assert [chunk["index"] for chunk in merged["chunks"]] == [0, 1]
+
+
+def test_merge_counts_rejected_and_failed_chunks():
+    rejected = [SyncFailDetail(code="INVALID_ITEM", message="x")]
+    merged = merge_sync_results([ChunkReport(index=0, size=4, elapsed_ms=1.0, success=False)], rejected)
+
+    assert merged["status"] == -1
+    assert merged["data"]["failCount"] == 5
+
+
+def test_merge_success_status():
+    merged = merge_sync_results([ChunkReport(index=0, size=2, elapsed_ms=1.0, success=True, result=result(2))])
+    assert merged["status"] == 0
+
+
+def test_combine_chunk_reports_counts_failed_pieces():
+    combined = combine_chunk_reports(0, [
+        ChunkReport(index=0, size=2, elapsed_ms=1.0, success=True, result=result(2)),
+        ChunkReport(index=0, size=3, elapsed_ms=2.0, success=False),
+    ])
+    assert (combined.size, combined.success, combined.result.success_count, combined.result.fail_count) == (
+        5, False, 2, 3)
+
+
+def test_merge_retry_outcome_replaces_failures():
+    items = [dept("D1"), dept("D2")]
+    first_collector = FailureCollector("dept_id")
+    detail = SyncFailDetail(code="D2", message="busy")
+    report = ChunkReport(index=0, size=2, elapsed_ms=1.0, success=True, result=result(1, [detail]))
+    first_collector(report, items)
+    first = SyncOutcome(merge_sync_results([report]), first_collector.failed, first_collector.unmapped)
+    retry = SyncOutcome(merge_sync_results([
+        ChunkReport(index=0, size=1, elapsed_ms=1.0, success=True, result=result(1)),
+    ]))
+
+    merged = merge_retry_outcome(first, retry, 1)
+    assert merged["status"] == 0
+    assert (merged.result.success_count, merged.result.fail_count) == (2, 0)
+    assert merged.failed_items == []
+    assert merged.attempts == 2
+    assert merged["retries"] == [{"attempt": 1, "size": 1, "successCount": 1, "failCount": 0}]
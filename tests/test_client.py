@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from aflow_client_python.core.client import AFlowClient
+from aflow_client_python.core.ratelimit import RateLimit, RateLimiter
+
+
+class FakeResponse:
+    def __init__(self, body: dict, status_code: int = 200):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+        self.headers = {}
+
+
+class PostOnlyTransport:
+    """只实现 post 的自定义 transport"""
+
+    def __init__(self):
+        self.calls = []
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.calls.append((url, timeout))
+        return FakeResponse({"status": 0, "msg": "success", "data": None})
+
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("APP_ID", "app")
+    monkeypatch.setenv("APP_SECRET", "secret")
+    monkeypatch.setenv("ENTERPRISE_CODE", "ent")
+
+
+def test_post_only_transport_with_rate_limiter():
+    transport = PostOnlyTransport()
+    client = AFlowClient(base_url="http://aflow.test", transport=transport,
+                         rate_limiter=RateLimiter(default=RateLimit(1000, 10 ** 9)), clock_skew=None)
+    response = client._make_request("http://aflow.test/aflow/api/auth/bind", {"userId": "u1"}, raise_on_error=True)
+
+    assert response.get("status") == 0
+    assert len(transport.calls) == 1
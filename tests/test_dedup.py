@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from aflow_client_python.core import dedup as dedup_module
+from aflow_client_python.core.client import AFlowClient
+from aflow_client_python.core.dedup import DUPLICATE, STALE, TaskSyncDedupCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(dedup_module.time, "monotonic", fake)
+    return fake
+
+
+def test_admit_does_not_register(task_factory):
+    cache = TaskSyncDedupCache(max_entries=10, ttl=60)
+    task = task_factory(1)
+    # 未确认发送成功前，并发或重试的相同数据都放行
+    assert cache.admit(task) is None
+    assert cache.admit(task) is None
+    assert len(cache) == 0
+
+    cache.record(task)
+    assert cache.admit(task) == DUPLICATE
+    assert cache.stats()[DUPLICATE] == 1
+
+
+def test_stale_by_update_time(task_factory):
+    cache = TaskSyncDedupCache(max_entries=10, ttl=60)
+    cache.record(task_factory(1, "pass", "2024-01-02 00:00:00"))
+
+    assert cache.admit(task_factory(1, "ing", "2024-01-01 00:00:00")) == STALE
+    assert cache.admit(task_factory(1, "reject", "2024-01-03 00:00:00")) is None
+
+
+def test_record_keeps_newer_entry(task_factory):
+    cache = TaskSyncDedupCache(max_entries=10, ttl=60)
+    newer = task_factory(1, "pass", "2024-01-02 00:00:00")
+    cache.record(newer)
+    # 较旧的请求晚于较新的请求确认成功时不覆盖
+    cache.record(task_factory(1, "ing", "2024-01-01 00:00:00"))
+
+    assert cache.admit(newer) == DUPLICATE
+
+
+def test_ttl_expiry(task_factory, clock):
+    cache = TaskSyncDedupCache(max_entries=10, ttl=60)
+    task = task_factory(1)
+    cache.record(task)
+    clock.now += 59
+    assert cache.admit(task) == DUPLICATE
+    clock.now += 2
+    assert cache.admit(task) is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction(task_factory):
+    cache = TaskSyncDedupCache(max_entries=2, ttl=60)
+    first, second, third = task_factory(1), task_factory(2), task_factory(3)
+    cache.record(first)
+    cache.record(second)
+    # 重新登记使 1 成为最近使用
+    cache.record(first)
+    cache.record(third)
+
+    assert len(cache) == 2
+    assert cache.admit(first) == DUPLICATE
+    assert cache.admit(second) is None
+
+
+class FakeResponse:
+    def __init__(self, body: dict):
+        self.status_code = 200
+        self.content = json.dumps(body).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+        self.headers = {}
+
+
+class ScriptedTransport:
+    """按顺序返回预设的 status"""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.calls += 1
+        status = self.statuses.pop(0)
+        return FakeResponse({"status": status, "msg": "success" if status == 0 else "busy", "data": None})
+
+
+def test_client_only_records_successful_sends(task_factory, monkeypatch):
+    monkeypatch.setenv("APP_ID", "app")
+    monkeypatch.setenv("APP_SECRET", "secret")
+    monkeypatch.setenv("ENTERPRISE_CODE", "ent")
+    transport = ScriptedTransport([-1, 0])
+    client = AFlowClient(base_url="http://aflow.test", transport=transport, clock_skew=None,
+                         dedup=TaskSyncDedupCache(max_entries=10, ttl=60))
+    task = task_factory(1)
+
+    assert client._send_task(task, raise_on_error=False).get("status") == -1
+    assert client._send_task(task, raise_on_error=False).get("status") == 0
+    assert client._send_task(task, raise_on_error=False).get("skipped") == DUPLICATE
+    assert transport.calls == 2
@@ -0,0 +1,63 @@
+import pytest
+
+from aflow_client_python.core.batch import ChunkReport
+from aflow_client_python.core.delta import DeltaSyncer, FingerprintStore
+from aflow_client_python.models import SyncResult, UserSyncItem
+
+
+class FakeClient:
+    """按批次消费数据源，全部视为同步成功"""
+
+    base_url = "http://aflow.test"
+    chunk_size = 2
+
+    def __init__(self):
+        self.sent = []
+
+    def _sync_stream(self, url, key, model_cls, source, on_chunk=None, **kwargs):
+        items = [row for row in source if isinstance(row, model_cls)]
+        self.sent.append(items)
+        if on_chunk is not None and items:
+            on_chunk(ChunkReport(index=0, size=len(items), elapsed_ms=0.0, success=True,
+                                 result=SyncResult(success_count=len(items), fail_count=0, fail_details=[])), items)
+        return {"status": 0}
+
+
+def user(user_id: str, name: str = "n") -> dict:
+    return {"userId": user_id, "userName": name, "realName": "r", "email": "e", "mobile": "m",
+            "deptId": "d", "status": 1}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FingerprintStore(str(tmp_path / "fp.db"))
+    yield store
+    store.close()
+
+
+def test_only_changed_and_missing_items_are_sent(store):
+    client = FakeClient()
+    syncer = DeltaSyncer(client, store)
+    syncer.sync_users([user("u1"), user("u2"), user("u3")])
+    result = syncer.sync_users([user("u1"), user("u2", "changed")])
+
+    sent = {item.user_id: item.status for item in client.sent[-1]}
+    assert sent == {"u2": 1, "u3": 0}
+    assert result["delta"]["unchanged"] == 1
+
+
+def test_invalid_row_is_not_disabled(store):
+    client = FakeClient()
+    syncer = DeltaSyncer(client, store)
+    syncer.sync_users([user("u1"), user("u2")])
+    broken = {**user("u2"), "mobile": None}
+    result = syncer.sync_users([user("u1"), broken])
+
+    assert result["delta"]["invalid"] == 1
+    assert result["delta"]["removed"] == 0
+    assert all(isinstance(item, UserSyncItem) and item.status == 1 for item in client.sent[-1])
+
+
+def test_checkpoint_is_rejected(store):
+    with pytest.raises(ValueError):
+        DeltaSyncer(FakeClient(), store).sync_users([user("u1")], checkpoint="sync.checkpoint.json")
@@ -0,0 +1,153 @@
+import json
+import threading
+
+import pytest
+
+from aflow_client_python.core import outbox as outbox_module
+from aflow_client_python.core.client import AFlowClient
+from aflow_client_python.core.outbox import TaskOutbox
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = TaskOutbox(str(tmp_path / "outbox.db"))
+    yield box
+    box.close()
+
+
+class FakeClient:
+    """按订单号返回预设的 status，默认成功"""
+
+    def __init__(self, statuses=None):
+        self.statuses = statuses or {}
+        self.sent = []
+
+    def _send_task(self, request, raise_on_error=None):
+        self.sent.append((request.third_order_id, request.order_result))
+        return {"status": self.statuses.get(request.third_order_id, 0)}
+
+
+def test_concurrent_appends_are_persisted(outbox, task_factory):
+    ids = []
+    lock = threading.Lock()
+
+    def append(order_id):
+        row_id = outbox.append(task_factory(order_id))
+        with lock:
+            ids.append(row_id)
+
+    threads = [threading.Thread(target=append, args=(order_id,)) for order_id in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(ids)) == 50
+    assert sorted(entry.id for entry in outbox.pending()) == sorted(ids)
+
+
+def test_mark_done_removes_after_flush(outbox, task_factory):
+    first, second = outbox.append_many([task_factory(1), task_factory(2)])
+    outbox.mark_done([first])
+    outbox.flush()
+
+    assert [entry.id for entry in outbox.pending()] == [second]
+
+
+def test_replay_sends_latest_per_order(outbox, task_factory):
+    outbox.append_many([task_factory(1, "ing"), task_factory(2), task_factory(1, "pass")])
+    client = FakeClient(statuses={2: -1})
+
+    stats = outbox.replay(client)
+
+    assert stats == {"pending": 3, "sent": 1, "failed": 1, "skipped": 0}
+    assert sorted(client.sent) == [(1, "pass"), (2, "ing")]
+    remaining = outbox.pending()
+    assert [(entry.order_id, entry.attempts) for entry in remaining] == [(2, 1)]
+
+
+def test_replay_skips_orders_over_max_attempts(outbox, task_factory):
+    outbox.append(task_factory(1))
+    client = FakeClient(statuses={1: -1})
+    outbox.replay(client, max_attempts=1)
+
+    stats = outbox.replay(client, max_attempts=1)
+    assert stats["skipped"] == 1
+    assert len(client.sent) == 1
+
+
+def test_replay_once(outbox, task_factory):
+    outbox.append(task_factory(1))
+    client = FakeClient()
+
+    assert outbox.replay_once(client)["sent"] == 1
+    outbox.append(task_factory(2))
+    assert outbox.replay_once(client) is None
+    assert client.sent == [(1, "ing")]
+
+
+def test_failed_delete_is_requeued(outbox, task_factory, monkeypatch):
+    monkeypatch.setattr(outbox_module, "_COMMIT_RETRY_DELAY", 0.01)
+    row_id = outbox.append(task_factory(1))
+    commit = outbox._commit
+    failures = []
+
+    def flaky_commit(appends, dones):
+        if dones and not failures:
+            failures.append(dones)
+            raise RuntimeError("disk I/O error")
+        return commit(appends, dones)
+
+    monkeypatch.setattr(outbox, "_commit", flaky_commit)
+    outbox.mark_done([row_id])
+    with pytest.raises(RuntimeError):
+        outbox.flush()
+    outbox.flush()
+
+    assert failures == [[row_id]]
+    assert outbox.pending() == []
+
+
+class FakeResponse:
+    def __init__(self, body: dict):
+        self.status_code = 200
+        self.content = json.dumps(body).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+        self.headers = {}
+
+
+class RecordingTransport:
+    def __init__(self):
+        self.bodies = []
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.bodies.append(json.loads(data))
+        return FakeResponse({"status": 0, "msg": "success", "data": None})
+
+
+def test_client_replays_outbox_on_start(outbox, task_factory, monkeypatch):
+    monkeypatch.setenv("APP_ID", "app")
+    monkeypatch.setenv("APP_SECRET", "secret")
+    monkeypatch.setenv("ENTERPRISE_CODE", "ent")
+    outbox.append(task_factory(7))
+
+    transport = RecordingTransport()
+    AFlowClient(base_url="http://aflow.test", transport=transport, outbox=outbox, clock_skew=None)
+    AFlowClient(base_url="http://aflow.test", transport=transport, outbox=outbox, clock_skew=None)
+
+    assert [body["thirdOrderId"] for body in transport.bodies] == [7]
+    outbox.flush()
+    assert outbox.pending() == []
+
+
+def test_client_replay_can_be_disabled(outbox, task_factory, monkeypatch):
+    monkeypatch.setenv("APP_ID", "app")
+    monkeypatch.setenv("APP_SECRET", "secret")
+    monkeypatch.setenv("ENTERPRISE_CODE", "ent")
+    outbox.append(task_factory(7))
+
+    transport = RecordingTransport()
+    client = AFlowClient(base_url="http://aflow.test", transport=transport, outbox=outbox, clock_skew=None,
+                         replay_on_start=False)
+    assert transport.bodies == []
+    assert client.replay_outbox()["sent"] == 1
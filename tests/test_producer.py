@@ -0,0 +1,61 @@
+import threading
+
+from aflow_client_python.core.producer import TaskSyncProducer
+
+
+class FakeClient:
+    """记录发送的订单，可以在发送时阻塞"""
+
+    def __init__(self, gate: threading.Event = None):
+        self.outbox = None
+        self.sent = []
+        self.gate = gate
+        self._lock = threading.Lock()
+
+    def _send_task(self, request, raise_on_error=None):
+        if self.gate is not None:
+            self.gate.wait(5)
+        with self._lock:
+            self.sent.append((request.third_order_id, request.order_result))
+        return {"status": 0, "msg": "success"}
+
+
+def test_coalesces_same_order_within_batch(task_factory):
+    client = FakeClient()
+    producer = TaskSyncProducer(client, workers=1, batch_size=10, linger_ms=10000, max_queue_size=100)
+    futures = [producer.enqueue(task_factory(1, result)) for result in ("ing", "pass")]
+    futures.append(producer.enqueue(task_factory(2)))
+    assert producer.flush(timeout=5)
+    producer.close()
+
+    assert client.sent == [(1, "pass"), (2, "ing")]
+    assert all(future.result(timeout=1)["status"] == 0 for future in futures)
+    assert producer.stats()["coalesced"] == 1
+
+
+def test_cancelled_future_is_not_sent_and_worker_survives(task_factory):
+    client = FakeClient()
+    producer = TaskSyncProducer(client, workers=1, batch_size=10, linger_ms=10000, max_queue_size=100)
+    cancelled = producer.enqueue(task_factory(1))
+    assert cancelled.cancel()
+    kept = producer.enqueue(task_factory(2))
+    assert producer.flush(timeout=5)
+
+    later = producer.enqueue(task_factory(3))
+    assert producer.flush(timeout=5)
+    producer.close()
+
+    assert client.sent == [(2, "ing"), (3, "ing")]
+    assert kept.result(timeout=1)["status"] == 0
+    assert later.result(timeout=1)["status"] == 0
+    assert producer.stats()["cancelled"] == 1
+
+
+def test_partition_preserves_order_without_coalescing(task_factory):
+    client = FakeClient()
+    producer = TaskSyncProducer(client, workers=2, batch_size=2, linger_ms=0, max_queue_size=100, coalesce=False)
+    for result in ("new", "ing", "pass"):
+        producer.enqueue(task_factory(7, result))
+    producer.close()
+
+    assert [result for order_id, result in client.sent if order_id == 7] == ["new", "ing", "pass"]
@@ -0,0 +1,76 @@
+# PythonSigningEngine must produce byte-for-byte the same output as libencrypt
+
+import json
+import random
+
+import pytest
+
+from aflow_client_python.utils.sign import PythonSigningEngine, SigningEngine
+
+_ALPHABETS = [
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-",
+    "人事部研发中心张三李四王五审批流程测试",
+    "àéîõüßøπΩЖжשׁ😀🚀 \t\"\\/{}[]:,",
+]
+
+
+@pytest.fixture(scope="module")
+def native():
+    try:
+        return SigningEngine()
+    except (OSError, FileNotFoundError) as e:
+        pytest.skip(f"加密库无法加载: {e}")
+
+
+@pytest.fixture(scope="module")
+def python_engine():
+    return PythonSigningEngine()
+
+
+def _text(rng: random.Random, size: int) -> str:
+    alphabet = rng.choice(_ALPHABETS)
+    return "".join(rng.choice(alphabet) for _ in range(size))
+
+
+def _cases(count: int = 300, seed: int = 20240601):
+    rng = random.Random(seed)
+    bodies = [
+        lambda: b"",
+        lambda: _text(rng, rng.randint(1, 256)).encode("utf-8"),
+        lambda: json.dumps({"users": [{"userId": f"u{i}", "realName": _text(rng, 3)} for i in range(20)]},
+                           ensure_ascii=rng.random() < 0.5).encode("utf-8"),
+        lambda: bytes(rng.randrange(1, 256) for _ in range(rng.randint(1, 512))),
+        lambda: _text(rng, 16).encode("utf-8") + b"\0" + _text(rng, 16).encode("utf-8"),
+        lambda: b'{"userId":"u1","realName":"n"},' * rng.randint(1, 4000),
+    ]
+    timestamps = [lambda: 1700000000000, lambda: rng.randrange(1, 10 ** 13),
+                  lambda: rng.randrange(-(2 ** 63), 2 ** 63), lambda: 1, lambda: -1]
+    for _ in range(count):
+        credential = tuple(_text(rng, rng.randint(0, 40)) for _ in range(3))
+        yield credential, rng.choice(bodies)(), rng.choice(timestamps)()
+
+
+def test_signatures_match_native(native, python_engine):
+    mismatches = []
+    for credential, body, timestamp in _cases():
+        expected = native.sign(*credential, body, timestamp)
+        actual = python_engine.sign(*credential, body, timestamp)
+        if expected != actual:
+            mismatches.append((credential, body[:40], timestamp))
+    assert not mismatches, mismatches[:5]
+
+
+def test_hex_to_string_matches_native(native, python_engine):
+    for credential, body, timestamp in _cases(count=50, seed=7):
+        signature = native.sign(*credential, body, timestamp)
+        assert python_engine.hex_to_string(signature) == native.hex_to_string(signature)
+
+
+def test_current_time_signatures_match_native(native, python_engine):
+    # timestamp 为 0 时两种实现都取当前时间（精确到秒），跨秒时重试一次
+    results = [native.sign("a", "e", "s", b"{}", 0) == python_engine.sign("a", "e", "s", b"{}", 0) for _ in range(2)]
+    assert any(results)
+
+
+def test_body_is_truncated_at_nul(python_engine):
+    assert python_engine.sign("a", "e", "s", b"{}\0tail", 1) == python_engine.sign("a", "e", "s", b"{}", 1)
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from aflow_client_python.core.client import AFlowClient
+from aflow_client_python.core.exceptions import DepartmentTopologyError
+from aflow_client_python.core.topology import CYCLE_CODE, ORPHAN_CODE, PARENT_FAILED_CODE, DepartmentTree
+from aflow_client_python.models import DepartmentSyncItem
+
+
+def dept(dept_id: str, parent_id: str = None) -> DepartmentSyncItem:
+    return DepartmentSyncItem(dept_id=dept_id, dept_name=dept_id, parent_id=parent_id, order_num=1, status=1)
+
+
+def ids(items):
+    return [item.dept_id for item in items]
+
+
+def test_levels_parents_first():
+    # 输入顺序与层级无关
+    tree = DepartmentTree.build([dept("C", "B"), dept("B", "A"), dept("A"), dept("D", "A")])
+
+    assert [ids(level) for level in tree.levels] == [["A"], ["B", "D"], ["C"]]
+    assert tree.valid
+
+
+def test_known_parents_are_roots():
+    tree = DepartmentTree.build([dept("B", "EXISTING"), dept("C", "B")], known_parent_ids=["EXISTING"])
+
+    assert [ids(level) for level in tree.levels] == [["B"], ["C"]]
+
+
+def test_orphans_include_descendants():
+    tree = DepartmentTree.build([dept("A"), dept("X", "MISSING"), dept("Y", "X")])
+
+    assert [ids(level) for level in tree.levels] == [["A"]]
+    assert ids(tree.orphans) == ["X", "Y"]
+    assert not tree.valid
+    assert [detail.code for detail in tree.fail_details()] == [ORPHAN_CODE, ORPHAN_CODE]
+
+
+def test_cycles_and_blocked():
+    tree = DepartmentTree.build([dept("A", "B"), dept("B", "A"), dept("C", "A"), dept("R")])
+
+    assert [ids(level) for level in tree.levels] == [["R"]]
+    assert [sorted(cycle) for cycle in tree.cycles] == [["A", "B"]]
+    assert ids(tree.blocked) == ["C"]
+    assert [detail.code for detail in tree.fail_details()] == [CYCLE_CODE] * 3
+
+
+class FakeResponse:
+    def __init__(self, body: dict):
+        self.status_code = 200
+        self.content = json.dumps(body).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+        self.headers = {}
+
+
+class DeptTransport:
+    """记录每次发送的部门ID，fail 中的部门返回失败详情"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.batches = []
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        sent = [item["deptId"] for item in json.loads(data)["departments"]]
+        self.batches.append(sent)
+        failed = [dept_id for dept_id in sent if dept_id in self.fail]
+        return FakeResponse({"status": 0, "msg": "success", "data": {
+            "successCount": len(sent) - len(failed),
+            "failCount": len(failed),
+            "failDetails": [{"code": "E", "message": "bad", "deptId": dept_id} for dept_id in failed],
+        }})
+
+
+@pytest.fixture
+def make_client(monkeypatch):
+    monkeypatch.setenv("APP_ID", "app")
+    monkeypatch.setenv("APP_SECRET", "secret")
+    monkeypatch.setenv("ENTERPRISE_CODE", "ent")
+
+    def make(transport):
+        return AFlowClient(base_url="http://aflow.test", transport=transport, clock_skew=None,
+                           circuit_breakers=None, outbox=None)
+
+    return make
+
+
+def test_sync_tree_strict_rejects_before_sending(make_client):
+    transport = DeptTransport()
+    with pytest.raises(DepartmentTopologyError):
+        make_client(transport).sync_department_tree([dept("A"), dept("X", "MISSING")])
+    assert transport.batches == []
+
+
+def test_sync_tree_skips_children_of_failed_parents(make_client):
+    transport = DeptTransport(fail=["B"])
+    departments = [dept("A"), dept("B", "A"), dept("C", "B"), dept("D", "C"), dept("E", "A")]
+
+    outcome = make_client(transport).sync_department_tree(departments, max_workers=1)
+
+    assert transport.batches == [["A"], ["B", "E"]]
+    assert outcome["levels"] == [1, 2, 1, 1]
+    assert outcome["status"] == -1
+    assert [(failed.item.dept_id, failed.detail.code) for failed in outcome.failed_items] == [
+        ("B", "E"), ("C", PARENT_FAILED_CODE), ("D", PARENT_FAILED_CODE),
+    ]